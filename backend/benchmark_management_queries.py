@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Compare per-row lookups with the $lookup pipelines behind /api/groups/manage
+and /api/moderators/permissions on a local MongoDB
+
+Seeds a throwaway database (dropped afterwards) at several sizes and reports
+median latency for both approaches. Requires a reachable MongoDB at --mongo-url.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "rahu_escrow_benchmark")
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from server import GROUP_MANAGEMENT_PIPELINE, MODERATOR_PERMISSIONS_PIPELINE
+
+async def legacy_group_management(db):
+    """Previous implementation: one deals.find_one per occupied group"""
+    groups = await db.groups.find({}).sort("group_number", 1).to_list(None)
+    group_list = []
+    for group in groups:
+        current_deal = None
+        if group.get("current_deal_id"):
+            deal = await db.deals.find_one({"id": group["current_deal_id"]})
+            if deal:
+                current_deal = deal.get("escrow_id")
+        group_list.append({
+            "id": group["id"],
+            "group_number": group["group_number"],
+            "status": group["status"],
+            "current_deal": current_deal,
+            "participant_count": len(group.get("participant_ids", [])),
+            "expires_at": group.get("expires_at"),
+            "telegram_chat_id": group.get("telegram_chat_id")
+        })
+    return group_list
+
+async def legacy_moderator_permissions(db):
+    """Previous implementation: one moderator_permissions.find_one per moderator"""
+    moderators = await db.users.find({"is_moderator": True}).to_list(None)
+    permissions_list = []
+    for mod in moderators:
+        custom_perms = await db.moderator_permissions.find_one({"user_id": mod["user_id"]})
+        permissions_list.append({
+            "user_id": mod["user_id"],
+            "username": mod.get("username", f"User_{mod['user_id']}"),
+            "display_name": mod.get("display_name", mod.get("first_name", "Unknown")),
+            "can_ban": custom_perms.get("can_ban", True) if custom_perms else True,
+            "can_freeze": custom_perms.get("can_freeze", True) if custom_perms else True,
+            "can_broadcast": custom_perms.get("can_broadcast", False) if custom_perms else False,
+            "can_edit_fees": custom_perms.get("can_edit_fees", False) if custom_perms else False,
+            "deals_handled": mod.get("deals_count", 0)
+        })
+    return permissions_list
+
+async def seed(db, groups: int, moderators: int):
+    """Groups (two thirds occupied), their deals, and moderators (half with overrides)"""
+    await db.client.drop_database(db.name)
+
+    # Same indexes DatabaseManager.create_indexes builds
+    await db.groups.create_index("group_number", unique=True)
+    await db.deals.create_index("id", unique=True)
+    await db.users.create_index("is_moderator")
+    await db.moderator_permissions.create_index("user_id", unique=True)
+
+    now = datetime.utcnow()
+    group_docs, deal_docs = [], []
+    for n in range(1, groups + 1):
+        group = {"id": str(uuid.uuid4()), "group_number": n, "status": "Available", "participant_ids": []}
+        if n % 3:
+            deal_id = str(uuid.uuid4())
+            deal_docs.append({"id": deal_id, "escrow_id": f"ESCROW-{n:06d}", "group_id": group["id"], "status": "Funded"})
+            group.update(status="Occupied", current_deal_id=deal_id, participant_ids=[n, n + 1],
+                         expires_at=now + timedelta(hours=2), telegram_chat_id=-100000 - n)
+        group_docs.append(group)
+    # Unrelated deals so lookups search a realistic collection
+    deal_docs += [{"id": str(uuid.uuid4()), "escrow_id": f"ESCROW-H{i:06d}", "status": "Completed"} for i in range(groups * 20)]
+
+    user_docs = [{"user_id": 1000 + i, "username": f"mod{i}", "first_name": "Mod", "is_moderator": True, "deals_count": i}
+                 for i in range(moderators)]
+    user_docs += [{"user_id": 10_000_000 + i, "first_name": "User", "is_moderator": False} for i in range(moderators * 20)]
+    override_docs = [{"user_id": 1000 + i, "can_ban": False, "can_broadcast": True} for i in range(0, moderators, 2)]
+
+    await db.groups.insert_many(group_docs)
+    await db.deals.insert_many(deal_docs)
+    await db.users.insert_many(user_docs)
+    if override_docs:
+        await db.moderator_permissions.insert_many(override_docs)
+
+async def median_ms(fn, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+async def run_benchmark(mongo_url: str, sizes, rounds: int):
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[f"rahu_benchmark_{uuid.uuid4().hex[:8]}"]
+
+    print("🔎 Management endpoint queries: per-row lookups vs $lookup pipelines")
+    print("=" * 72)
+    print(f"{'rows':>6}  {'groups N+1':>11}  {'groups $lookup':>15}  {'mods N+1':>9}  {'mods $lookup':>13}")
+
+    try:
+        for size in sizes:
+            await seed(db, size, size)
+
+            legacy_groups = await legacy_group_management(db)
+            piped_groups = await db.groups.aggregate(GROUP_MANAGEMENT_PIPELINE).to_list(None)
+            assert piped_groups == legacy_groups, "group pipeline output differs"
+
+            legacy_mods = await legacy_moderator_permissions(db)
+            piped_mods = await db.users.aggregate(MODERATOR_PERMISSIONS_PIPELINE).to_list(None)
+            assert sorted(piped_mods, key=lambda m: m["user_id"]) == sorted(legacy_mods, key=lambda m: m["user_id"]), \
+                "moderator pipeline output differs"
+
+            results = [
+                await median_ms(lambda: legacy_group_management(db), rounds),
+                await median_ms(lambda: db.groups.aggregate(GROUP_MANAGEMENT_PIPELINE).to_list(None), rounds),
+                await median_ms(lambda: legacy_moderator_permissions(db), rounds),
+                await median_ms(lambda: db.users.aggregate(MODERATOR_PERMISSIONS_PIPELINE).to_list(None), rounds),
+            ]
+            print(f"{size:>6}  {results[0]:>9.1f}ms  {results[1]:>13.1f}ms  {results[2]:>7.1f}ms  {results[3]:>11.1f}ms")
+    finally:
+        await client.drop_database(db.name)
+        client.close()
+
+    print("=" * 72)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=os.environ["MONGO_URL"])
+    parser.add_argument("--sizes", default="50,200,1000", help="comma-separated group/moderator counts")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.mongo_url, [int(size) for size in args.sizes.split(",")], args.rounds))
@@ -1,9 +1,19 @@
-from fastapi import FastAPI, APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import DESCENDING
+from pymongo.errors import OperationFailure, PyMongoError
+from bson import ObjectId
+from bson.errors import InvalidId
 import os
+import re
+import gzip
+import time
+import heapq
+import hashlib
+import asyncio
 import logging
 import zipfile
 import io
@@ -11,9 +21,9 @@ import csv
 import json
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, AsyncIterator, Callable
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 
 ROOT_DIR = Path(__file__).parent
@@ -86,6 +96,10 @@ class ManualPayout(BaseModel):
     amount: float
     reason: str
 
+class BroadcastRequest(BaseModel):
+    message: str
+    dry_run: bool = False
+
 class AuditLogEntry(BaseModel):
     id: str
     admin_id: str
@@ -94,6 +108,555 @@ class AuditLogEntry(BaseModel):
     timestamp: datetime
     reason: Optional[str] = None
 
+# ===================== EXPORT HELPERS =====================
+
+EXPORT_COLLECTIONS = ["users", "deals", "groups", "audit_logs"]
+EXPORT_BATCH_SIZE = 1000
+# CSV column holding, as JSON, fields that first appear after the header was written
+EXPORT_EXTRA_COLUMN = "extra_fields"
+
+class ZipStreamSink:
+    """Write-only sink collecting ZIP output until the response drains it"""
+    
+    def __init__(self):
+        self.chunks: List[bytes] = []
+    
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+async def iter_batches(cursor: AsyncIterator[dict], batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[List[dict]]:
+    """Group an async cursor into lists of at most batch_size documents"""
+    batch = []
+    async for document in cursor:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def export_row(document: dict, columns: set) -> dict:
+    """CSV row for a document; fields outside the header are kept as JSON"""
+    row = {key: value for key, value in document.items() if key in columns}
+    extra = {key: value for key, value in document.items() if key not in columns}
+    if extra:
+        row[EXPORT_EXTRA_COLUMN] = json.dumps(extra, default=str)
+    return row
+
+async def stream_export_zip(open_cursor: Callable[[str], AsyncIterator[dict]], collections: List[str],
+                            include_json: bool = True) -> AsyncIterator[bytes]:
+    """Stream a ZIP of one CSV per collection (plus a JSON copy) in constant memory"""
+    sink = ZipStreamSink()
+    
+    # An unseekable sink makes zipfile emit data descriptors instead of seeking back
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for name in collections:
+            with io.TextIOWrapper(zip_file.open(f'{name}.csv', 'w', force_zip64=True), encoding='utf-8', newline='') as entry:
+                csv_writer = None
+                async for batch in iter_batches(open_cursor(name)):
+                    if csv_writer is None:
+                        # Header from the first batch; later fields land in the extra column
+                        fieldnames = list(dict.fromkeys(key for document in batch for key in document))
+                        columns = set(fieldnames)
+                        csv_writer = csv.DictWriter(entry, fieldnames=fieldnames + [EXPORT_EXTRA_COLUMN])
+                        csv_writer.writeheader()
+                    csv_writer.writerows(export_row(document, columns) for document in batch)
+                    entry.flush()
+                    yield sink.drain()
+            yield sink.drain()
+        
+        if include_json:
+            counts = {}
+            with io.TextIOWrapper(zip_file.open('complete_data.json', 'w', force_zip64=True), encoding='utf-8') as entry:
+                entry.write('{')
+                for name in collections:
+                    entry.write(f'\n  "{name}": [')
+                    count = 0
+                    async for batch in iter_batches(open_cursor(name)):
+                        for document in batch:
+                            entry.write(('\n    ' if count == 0 else ',\n    ') + json.dumps(document, default=str))
+                            count += 1
+                        entry.flush()
+                        yield sink.drain()
+                    entry.write('\n  ],')
+                    counts[name] = count
+                
+                metadata = {"timestamp": datetime.utcnow().isoformat()}
+                metadata.update({f"total_{'logs' if name == 'audit_logs' else name}": count for name, count in counts.items()})
+                entry.write(f'\n  "export_metadata": {json.dumps(metadata)}\n}}\n')
+            yield sink.drain()
+    
+    # Central directory
+    yield sink.drain()
+
+# Field holding each collection's last-change time for delta exports
+EXPORT_DELTA_FIELDS = {"users": "updated_at", "deals": "updated_at", "groups": "updated_at", "audit_logs": "timestamp"}
+# Upper watermark trails now so writes still in flight land in the next delta
+EXPORT_WATERMARK_LAG = timedelta(seconds=5)
+
+def delta_query(field: str, since: Optional[datetime], until: datetime) -> Dict:
+    """Documents changed in (since, until]"""
+    window = {"$lte": until} if since is None else {"$gt": since, "$lte": until}
+    if field == "timestamp":
+        return {field: window}
+    
+    # Documents written before updated_at tracking fall back to created_at
+    return {"$or": [{field: window}, {field: None, "created_at": window}]}
+
+async def stream_delta_ndjson(open_cursor: Callable[[str, Dict, str], AsyncIterator[dict]], since: Optional[datetime],
+                              until: datetime, on_complete: Optional[Callable] = None) -> AsyncIterator[bytes]:
+    """Stream changed documents as NDJSON, ending with a watermark record"""
+    counts = {}
+    for name, field in EXPORT_DELTA_FIELDS.items():
+        counts[name] = 0
+        async for batch in iter_batches(open_cursor(name, delta_query(field, since, until), field)):
+            counts[name] += len(batch)
+            yield "".join(json.dumps({"collection": name, "doc": document}, default=str) + "\n" for document in batch).encode()
+    
+    yield (json.dumps({
+        "collection": "_watermark",
+        "since": since.isoformat() if since else None,
+        "until": until.isoformat(),
+        "counts": counts
+    }) + "\n").encode()
+    
+    # Only advance a stored cursor once the whole delta has been sent
+    if on_complete:
+        await on_complete()
+
+# ===================== DASHBOARD STATS =====================
+
+ACTIVE_DEAL_STATUSES = ["Pending", "Addresses Set", "Escrow Generated", "Funding Seen", "Funded"]
+REVENUE_DEAL_STATUSES = ["Completed"]
+DASHBOARD_CACHE_TTL = 10  # seconds
+# Collections each dashboard section is read from; writes to them invalidate it
+DASHBOARD_SECTION_SOURCES = {
+    "stats": ["users", "deals", "groups"],
+    "moderators": ["users", "moderator_permissions"],
+    "messages": ["bot_config"],
+    "fees": ["bot_config"],
+    "groups": ["groups", "deals"],
+}
+DASHBOARD_COLLECTIONS = sorted({name for sources in DASHBOARD_SECTION_SOURCES.values() for name in sources})
+
+# One round trip: deal facets, then user and available-group counts unioned in
+DASHBOARD_STATS_PIPELINE = [
+    {"$match": {"status": {"$in": ACTIVE_DEAL_STATUSES + REVENUE_DEAL_STATUSES}}},
+    {"$facet": {
+        "active": [
+            {"$match": {"status": {"$in": ACTIVE_DEAL_STATUSES}}},
+            {"$group": {"_id": {"status": "$status", "network": "$network"}, "count": {"$sum": 1}}}
+        ],
+        "revenue": [
+            {"$match": {"status": {"$in": REVENUE_DEAL_STATUSES}, "fee_amount": {"$gt": 0}}},
+            {"$group": {
+                "_id": "$network",
+                "fees": {"$sum": "$fee_amount"},
+                # Fees are in the deal's coin; price them at the deal's own USD rate
+                "fees_usd": {"$sum": {"$cond": [
+                    {"$gt": ["$amount", 0]},
+                    {"$multiply": ["$fee_amount", {"$divide": [{"$ifNull": ["$amount_usd", 0]}, "$amount"]}]},
+                    0
+                ]}}
+            }}
+        ]
+    }},
+    {"$unionWith": {"coll": "users", "pipeline": [{"$count": "users"}]}},
+    {"$unionWith": {"coll": "groups", "pipeline": [{"$match": {"status": "Available"}}, {"$count": "groups"}]}}
+]
+
+class DashboardSectionCache:
+    """Short-TTL dashboard section shared by every open God Mode dashboard"""
+    
+    def __init__(self, loader: Callable, ttl: float = DASHBOARD_CACHE_TTL):
+        self.loader = loader
+        self.ttl = ttl
+        self.value: Optional[Dict] = None
+        self.etag: Optional[str] = None
+        self.expires_at = 0.0
+        self.generation = 0  # bumped by every invalidation
+        self._lock = asyncio.Lock()
+    
+    def invalidate(self):
+        self.generation += 1
+        self.expires_at = 0.0
+    
+    async def get(self) -> Dict:
+        if self.value is not None and time.monotonic() < self.expires_at:
+            return self.value
+        
+        # Concurrent refreshes share a single aggregation
+        async with self._lock:
+            if self.value is None or time.monotonic() >= self.expires_at:
+                started, generation = time.monotonic(), self.generation
+                self.value = await self.loader()
+                # Content hash, so a refresh that changed nothing keeps its ETag
+                self.etag = hashlib.sha1(json.dumps(self.value, sort_keys=True, default=str).encode()).hexdigest()[:16]
+                # Invalidated mid-load: the result may predate the change, so the next get reloads
+                if self.generation == generation:
+                    self.expires_at = started + self.ttl
+        return self.value
+
+async def compute_dashboard_stats() -> Dict:
+    """Run the dashboard aggregation and shape its output"""
+    stats = {
+        "users": 0,
+        "deals": 0,
+        "groups": 0,
+        "revenue": 0,
+        "deals_by_status": {},
+        "deals_by_network": {},
+        "revenue_by_network": {}
+    }
+    revenue_usd = 0.0
+    
+    async for result in db.deals.aggregate(DASHBOARD_STATS_PIPELINE):
+        if "users" in result:
+            stats["users"] = result["users"]
+        elif "groups" in result:
+            stats["groups"] = result["groups"]
+        else:
+            for bucket in result["active"]:
+                status = bucket["_id"].get("status")
+                network = bucket["_id"].get("network") or "Unassigned"
+                stats["deals"] += bucket["count"]
+                stats["deals_by_status"][status] = stats["deals_by_status"].get(status, 0) + bucket["count"]
+                stats["deals_by_network"][network] = stats["deals_by_network"].get(network, 0) + bucket["count"]
+            for bucket in result["revenue"]:
+                stats["revenue_by_network"][bucket["_id"] or "Unassigned"] = bucket["fees"]
+                revenue_usd += bucket["fees_usd"]
+    
+    stats["revenue"] = int(revenue_usd)
+    return stats
+
+dashboard_stats_cache = DashboardSectionCache(compute_dashboard_stats)
+# Remaining sections are registered next to their endpoints
+dashboard_sections: Dict[str, DashboardSectionCache] = {"stats": dashboard_stats_cache}
+
+def invalidate_dashboard(*sections: str):
+    for section in sections:
+        if section in dashboard_sections:
+            dashboard_sections[section].invalidate()
+
+# ===================== DASHBOARD FEED =====================
+
+DASHBOARD_FEED_QUEUE_SIZE = 256
+DASHBOARD_FEED_HEARTBEAT = 15  # seconds between SSE keepalives
+DASHBOARD_STATS_PUSH_DELAY = 1.0  # seconds; bursts of writes share one stats push
+DASHBOARD_WATCH_MIN_BACKOFF = 1.0  # seconds before reopening a failed change stream, doubling
+DASHBOARD_WATCH_MAX_BACKOFF = 60.0
+# Server errors after which the resume token is useless (oplog rolled past it, fatal stream error)
+CHANGE_STREAM_LOST_CODES = {280, 286}
+
+# Fields that matter to the dashboard; users.last_active churn on every command is ignored
+DASHBOARD_USER_FIELDS = ["username", "display_name", "is_banned", "is_moderator", "deals_count"]
+DASHBOARD_DELTA_FIELDS = {
+    "deals": ["id", "escrow_id", "group_id", "status", "network", "is_frozen"],
+    "groups": ["id", "group_number", "status", "current_deal_id", "expires_at"],
+    "users": ["user_id"] + DASHBOARD_USER_FIELDS,
+    "audit_logs": ["action", "username", "target", "deal_id", "group_id", "timestamp"],
+}
+DASHBOARD_EVENT_TYPES = {"deals": "deal", "groups": "group", "users": "user", "audit_logs": "audit"}
+# Always sent so clients can find the row; other fields only when they changed
+DASHBOARD_DELTA_KEYS = {"deals": ["id", "escrow_id"], "groups": ["id", "group_number"], "users": ["user_id"]}
+
+# One watcher for cache invalidation and the live feed, whatever the number of admins
+DASHBOARD_WATCH_PIPELINE = [
+    {"$match": {"$or": [
+        {"ns.coll": {"$in": [name for name in DASHBOARD_COLLECTIONS if name != "users"]}},
+        {"ns.coll": "users", "operationType": {"$ne": "update"}},
+        {"ns.coll": "users", "$or": [
+            {f"updateDescription.updatedFields.{field}": {"$exists": True}} for field in DASHBOARD_USER_FIELDS
+        ]},
+        # Monthly partitions appear on their own; only new entries are streamed
+        {"ns.coll": {"$regex": "^audit_logs"}, "operationType": "insert"}
+    ]}},
+    {"$project": {
+        "operationType": 1,
+        "ns": 1,
+        "updateDescription.updatedFields": 1,
+        **{f"fullDocument.{field}": 1 for fields in DASHBOARD_DELTA_FIELDS.values() for field in fields}
+    }}
+]
+
+def dashboard_delta(change: Dict) -> Optional[Dict]:
+    """Compact feed event for a change, or None when nothing visible changed"""
+    collection = change["ns"]["coll"]
+    kind = "audit_logs" if collection.startswith("audit_logs") else collection
+    if kind not in DASHBOARD_DELTA_FIELDS:
+        return None
+    
+    document = change.get("fullDocument") or {}
+    fields = DASHBOARD_DELTA_FIELDS[kind]
+    if change["operationType"] == "update":
+        changed = set(change.get("updateDescription", {}).get("updatedFields", {}))
+        # Deals are updated often (confirmations, amounts); stream visible moves only
+        if not changed & set(fields) - set(DASHBOARD_DELTA_KEYS.get(kind, [])):
+            return None
+        fields = [field for field in fields if field in changed or field in DASHBOARD_DELTA_KEYS.get(kind, [])]
+    
+    delta = {field: document.get(field) for field in fields if field in document}
+    if not delta:
+        return None
+    return {"type": DASHBOARD_EVENT_TYPES[kind], "op": change["operationType"], **delta}
+
+class DashboardFeed:
+    """Fans one change stream out to every connected God Mode dashboard"""
+    
+    def __init__(self, queue_size: int = DASHBOARD_FEED_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.subscribers: set = set()
+        self.live = False
+        self._stats_push: Optional[asyncio.Task] = None
+        self._stats_etag: Optional[str] = None
+    
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        return queue
+    
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+    
+    def set_live(self, live: bool):
+        """Tell connected dashboards when the change stream drops (poll) or is back (stop polling)"""
+        if live != self.live:
+            self.live = live
+            self.publish({"type": "live", "live": live})
+    
+    def publish(self, event: Dict):
+        for queue in self.subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A client this far behind reloads everything instead of replaying
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync"})
+    
+    def schedule_stats(self):
+        """Push fresh counters once a burst of writes settles"""
+        if self.subscribers and (self._stats_push is None or self._stats_push.done()):
+            self._stats_push = asyncio.create_task(self._push_stats())
+    
+    async def _push_stats(self):
+        await asyncio.sleep(DASHBOARD_STATS_PUSH_DELAY)
+        try:
+            stats = await dashboard_stats_cache.get()
+        except Exception as e:
+            logger.error(f"Failed to refresh dashboard stats for feed: {e}")
+            return
+        if dashboard_stats_cache.etag != self._stats_etag:
+            self._stats_etag = dashboard_stats_cache.etag
+            self.publish({"type": "stats", "etag": self._stats_etag, "stats": stats})
+
+dashboard_feed = DashboardFeed()
+
+def apply_dashboard_change(change: Dict):
+    """Invalidate the sections a change touches and push it to live dashboards"""
+    collection = change["ns"]["coll"]
+    sections = [section for section, sources in DASHBOARD_SECTION_SOURCES.items() if collection in sources]
+    invalidate_dashboard(*sections)
+    
+    delta = dashboard_delta(change)
+    if delta:
+        dashboard_feed.publish(delta)
+    elif sections and collection not in DASHBOARD_EVENT_TYPES:
+        # Config edits by another admin: clients refetch those sections
+        dashboard_feed.publish({"type": "invalidate", "sections": sections})
+    if "stats" in sections:
+        dashboard_feed.schedule_stats()
+
+async def watch_dashboard_changes():
+    """Invalidate cached dashboard sections and feed live dashboards on writes
+    
+    A failed stream is reopened with backoff after the last change seen, so no
+    write is missed; meanwhile dashboards poll and cached sections fall back to
+    their TTL. When the stream cannot resume, everything is reloaded.
+    """
+    resume_token = None
+    backoff = DASHBOARD_WATCH_MIN_BACKOFF
+    try:
+        while True:
+            try:
+                async with db.watch(DASHBOARD_WATCH_PIPELINE, full_document="updateLookup",
+                                    resume_after=resume_token) as stream:
+                    dashboard_feed.set_live(True)
+                    backoff = DASHBOARD_WATCH_MIN_BACKOFF
+                    async for change in stream:
+                        apply_dashboard_change(change)
+                        resume_token = stream.resume_token
+            except PyMongoError as e:
+                # Change streams need a replica set; the TTL still bounds staleness
+                logger.warning(f"Dashboard change stream unavailable, retrying in {backoff:.0f}s: {e}")
+                if isinstance(e, OperationFailure) and e.code in CHANGE_STREAM_LOST_CODES and resume_token:
+                    resume_token = None
+                    invalidate_dashboard(*dashboard_sections)
+                    dashboard_feed.publish({"type": "resync"})
+            
+            dashboard_feed.set_live(False)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, DASHBOARD_WATCH_MAX_BACKOFF)
+    finally:
+        dashboard_feed.live = False
+
+# ===================== MANAGEMENT PIPELINES =====================
+
+# Moderators joined to their God Mode overrides (users.is_moderator, moderator_permissions.user_id)
+MODERATOR_PERMISSIONS_PIPELINE = [
+    {"$match": {"is_moderator": True}},
+    {"$lookup": {
+        "from": "moderator_permissions",
+        "localField": "user_id",
+        "foreignField": "user_id",
+        "as": "permissions"
+    }},
+    {"$project": {
+        "_id": 0,
+        "user_id": 1,
+        "username": {"$ifNull": ["$username", {"$concat": ["User_", {"$toString": "$user_id"}]}]},
+        "display_name": {"$ifNull": ["$display_name", {"$ifNull": ["$first_name", "Unknown"]}]},
+        "deals_count": 1,
+        "permissions": {"$arrayElemAt": ["$permissions", 0]}
+    }},
+    {"$project": {
+        "user_id": 1,
+        "username": 1,
+        "display_name": 1,
+        "can_ban": {"$ifNull": ["$permissions.can_ban", True]},
+        "can_freeze": {"$ifNull": ["$permissions.can_freeze", True]},
+        "can_broadcast": {"$ifNull": ["$permissions.can_broadcast", False]},
+        "can_edit_fees": {"$ifNull": ["$permissions.can_edit_fees", False]},
+        "deals_handled": {"$ifNull": ["$deals_count", 0]}
+    }}
+]
+
+# Groups joined to their current deal's escrow ID (groups.group_number, deals.id)
+GROUP_MANAGEMENT_PIPELINE = [
+    {"$sort": {"group_number": 1}},
+    {"$lookup": {
+        "from": "deals",
+        "localField": "current_deal_id",
+        "foreignField": "id",
+        "as": "current_deal"
+    }},
+    {"$project": {
+        "_id": 0,
+        "id": 1,
+        "group_number": 1,
+        "status": 1,
+        "current_deal": {"$ifNull": [{"$arrayElemAt": ["$current_deal.escrow_id", 0]}, None]},
+        "participant_count": {"$size": {"$ifNull": ["$participant_ids", []]}},
+        "expires_at": {"$ifNull": ["$expires_at", None]},
+        "telegram_chat_id": {"$ifNull": ["$telegram_chat_id", None]}
+    }}
+]
+
+# ===================== AUDIT LOG PAGING =====================
+
+# Newest first; _id breaks timestamp ties (matches the bot's audit_logs indexes)
+AUDIT_LOG_SORT = [("timestamp", DESCENDING), ("_id", DESCENDING)]
+AUDIT_LOG_MAX_PAGE = 500
+
+# Audit logs live in monthly collections (audit_logs_YYYY_MM, indexed by the bot);
+# the unpartitioned legacy collection is read until the bot's retention job migrates it
+AUDIT_PARTITION_PATTERN = re.compile(r"^audit_logs_(\d{4})_(\d{2})$")
+LEGACY_AUDIT_COLLECTION = "audit_logs"
+
+def audit_partition_name(timestamp: datetime) -> str:
+    return f"audit_logs_{timestamp:%Y_%m}"
+
+async def insert_audit_log(entry: Dict):
+    """Write a God Mode audit entry to its month's collection"""
+    # log_id is uniquely indexed, so entries without one would collide on null
+    entry.setdefault("log_id", entry.get("id") or str(uuid.uuid4()))
+    await db[audit_partition_name(entry["timestamp"])].insert_one(entry)
+
+async def list_audit_partitions(start: Optional[datetime] = None, end: Optional[datetime] = None,
+                                ascending: bool = False) -> List[str]:
+    """Monthly audit collections overlapping [start, end), in paging order"""
+    names = await db.list_collection_names(filter={"name": {"$regex": "^audit_logs_"}})
+    partitions = []
+    for name in names:
+        match = AUDIT_PARTITION_PATTERN.match(name)
+        if not match:
+            continue
+        year, month = int(match.group(1)), int(match.group(2))
+        month_start = datetime(year, month, 1)
+        month_end = datetime(year + month // 12, month % 12 + 1, 1)
+        if (end is None or month_start < end) and (start is None or month_end > start):
+            partitions.append(name)
+    return sorted(partitions, reverse=not ascending)
+
+async def open_audit_cursor(query: Dict, sort: List, start: Optional[datetime] = None) -> AsyncIterator[dict]:
+    """Matching audit entries from the legacy collection, then each partition from start's month"""
+    for name in [LEGACY_AUDIT_COLLECTION] + await list_audit_partitions(start, ascending=True):
+        async for document in db[name].find(query).sort(sort).batch_size(EXPORT_BATCH_SIZE):
+            yield document
+
+def encode_log_cursor(log: Dict) -> str:
+    """Opaque keyset cursor pointing just past a log entry"""
+    return f"{log['timestamp'].isoformat()}|{log['_id']}"
+
+def keyset_after(cursor: str, ascending: bool = False) -> Dict:
+    """Condition selecting entries that sort after a cursor"""
+    try:
+        timestamp, _, object_id = cursor.partition("|")
+        timestamp, object_id = datetime.fromisoformat(timestamp), ObjectId(object_id)
+    except (ValueError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    beyond = "$gt" if ascending else "$lt"
+    return {"$or": [
+        {"timestamp": {beyond: timestamp}},
+        {"timestamp": timestamp, "_id": {beyond: object_id}}
+    ]}
+
+async def fetch_log_page(query: Dict, limit: int, cursor: Optional[str] = None, ascending: bool = False,
+                         start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict:
+    """One page of audit logs plus the cursor for the next one"""
+    limit = max(1, min(limit, AUDIT_LOG_MAX_PAGE))
+    if cursor:
+        query = {"$and": [query, keyset_after(cursor, ascending)]}
+        # Months wholly behind the cursor cannot hold the next page
+        cursor_time = datetime.fromisoformat(cursor.partition("|")[0])
+        if ascending:
+            start = max(start, cursor_time) if start else cursor_time
+        else:
+            bound = cursor_time + timedelta(microseconds=1)
+            end = min(end, bound) if end else bound
+    
+    # Same indexes walked backwards give chronological order
+    sort = [(field, -direction) for field, direction in AUDIT_LOG_SORT] if ascending else AUDIT_LOG_SORT
+    
+    # Months are disjoint, so partitions in paging order fill the page in order;
+    # fetch one extra entry to learn whether another page exists
+    logs = []
+    for name in await list_audit_partitions(start, end, ascending):
+        logs += await db[name].find(query).sort(sort).limit(limit + 1 - len(logs)).to_list(None)
+        if len(logs) > limit:
+            break
+    
+    legacy = await db[LEGACY_AUDIT_COLLECTION].find(query).sort(sort).limit(limit + 1).to_list(None)
+    if legacy:
+        logs = list(heapq.merge(logs, legacy, key=lambda log: (log["timestamp"], log["_id"]), reverse=not ascending))[:limit + 1]
+    
+    next_cursor = encode_log_cursor(logs[limit - 1]) if len(logs) > limit else None
+    logs = logs[:limit]
+    for log in logs:
+        del log["_id"]
+    
+    return {"total_logs": len(logs), "logs": logs, "next_cursor": next_cursor}
+
 # ===================== PHASE 1 ENDPOINTS =====================
 
 @api_router.get("/")
@@ -118,20 +681,7 @@ async def get_status_checks():
 async def get_dashboard_stats():
     """Get real dashboard statistics from MongoDB"""
     try:
-        # Get real counts from database
-        users_count = await db.users.count_documents({})
-        deals_count = await db.deals.count_documents({"status": {"$in": ["Pending", "Addresses Set", "Escrow Generated", "Funded"]}})
-        groups_count = await db.groups.count_documents({"status": "Available"})
-        
-        # Calculate total revenue (demo calculation)
-        total_revenue = deals_count * 15.5  # Average fee per deal
-        
-        return {
-            "users": users_count,
-            "deals": deals_count, 
-            "groups": groups_count,
-            "revenue": int(total_revenue)
-        }
+        return await dashboard_stats_cache.get()
     except Exception as e:
         logger.error(f"Failed to get dashboard stats: {e}")
         # Return demo data if database fails
@@ -146,23 +696,8 @@ async def get_dashboard_stats():
 async def get_moderator_permissions():
     """Get all moderators with their individual permissions"""
     try:
-        moderators = await db.users.find({"is_moderator": True}).to_list(None)
-        
-        permissions_list = []
-        for mod in moderators:
-            # Get custom permissions (default to basic permissions)
-            custom_perms = await db.moderator_permissions.find_one({"user_id": mod["user_id"]})
-            
-            permissions_list.append({
-                "user_id": mod["user_id"],
-                "username": mod.get("username", f"User_{mod['user_id']}"),
-                "display_name": mod.get("display_name", mod.get("first_name", "Unknown")),
-                "can_ban": custom_perms.get("can_ban", True) if custom_perms else True,
-                "can_freeze": custom_perms.get("can_freeze", True) if custom_perms else True,
-                "can_broadcast": custom_perms.get("can_broadcast", False) if custom_perms else False,
-                "can_edit_fees": custom_perms.get("can_edit_fees", False) if custom_perms else False,
-                "deals_handled": mod.get("deals_count", 0)
-            })
+        # Custom permissions default to basic moderator permissions
+        permissions_list = await db.users.aggregate(MODERATOR_PERMISSIONS_PIPELINE).to_list(None)
         
         return {"moderators": permissions_list}
         
@@ -190,7 +725,7 @@ async def update_moderator_permissions(permissions: ModeratorPermissions):
         )
         
         # Log the action
-        await db.audit_logs.insert_one({
+        await insert_audit_log({
             "id": str(uuid.uuid4()),
             "admin_id": "god_mode",
             "action": "update_moderator_permissions",
@@ -199,6 +734,7 @@ async def update_moderator_permissions(permissions: ModeratorPermissions):
             "details": f"Updated permissions: ban={permissions.can_ban}, freeze={permissions.can_freeze}, broadcast={permissions.can_broadcast}, edit_fees={permissions.can_edit_fees}"
         })
         
+        invalidate_dashboard("moderators")
         return {"success": True, "message": f"Permissions updated for {permissions.username}"}
         
     except Exception as e:
@@ -245,12 +781,12 @@ async def update_bot_messages(messages: BotMessages):
                 "rules_message": messages.rules_message,
                 "error_messages": messages.error_messages,
                 "updated_at": datetime.utcnow()
-            }},
+            }, "$inc": {"version": 1}},  # Bots poll this when change streams are unavailable
             upsert=True
         )
         
         # Log the action
-        await db.audit_logs.insert_one({
+        await insert_audit_log({
             "id": str(uuid.uuid4()),
             "admin_id": "god_mode",
             "action": "update_bot_messages",
@@ -259,6 +795,7 @@ async def update_bot_messages(messages: BotMessages):
             "details": "Updated welcome, rules, and error messages"
         })
         
+        invalidate_dashboard("messages")
         return {"success": True, "message": "Bot messages updated successfully"}
         
     except Exception as e:
@@ -301,12 +838,12 @@ async def update_fee_config(fees: List[NetworkFees]):
                 "type": "fees",
                 "networks": fee_data,
                 "updated_at": datetime.utcnow()
-            }},
+            }, "$inc": {"version": 1}},  # Bots poll this when change streams are unavailable
             upsert=True
         )
         
         # Log the action
-        await db.audit_logs.insert_one({
+        await insert_audit_log({
             "id": str(uuid.uuid4()),
             "admin_id": "god_mode",
             "action": "update_fee_config",
@@ -315,6 +852,7 @@ async def update_fee_config(fees: List[NetworkFees]):
             "details": f"Updated fees for {len(fees)} networks"
         })
         
+        invalidate_dashboard("fees")
         return {"success": True, "message": "Fee configuration updated successfully"}
         
     except Exception as e:
@@ -335,7 +873,7 @@ async def create_custom_command(command: CustomCommand):
         })
         
         # Log the action
-        await db.audit_logs.insert_one({
+        await insert_audit_log({
             "id": str(uuid.uuid4()),
             "admin_id": "god_mode",
             "action": "create_custom_command",
@@ -354,26 +892,7 @@ async def create_custom_command(command: CustomCommand):
 async def get_group_management():
     """Get all groups for management"""
     try:
-        groups = await db.groups.find({}).sort("group_number", 1).to_list(None)
-        
-        group_list = []
-        for group in groups:
-            # Get current deal if any
-            current_deal = None
-            if group.get("current_deal_id"):
-                deal = await db.deals.find_one({"id": group["current_deal_id"]})
-                if deal:
-                    current_deal = deal.get("escrow_id")
-            
-            group_list.append({
-                "id": group["id"],
-                "group_number": group["group_number"],
-                "status": group["status"],
-                "current_deal": current_deal,
-                "participant_count": len(group.get("participant_ids", [])),
-                "expires_at": group.get("expires_at"),
-                "telegram_chat_id": group.get("telegram_chat_id")
-            })
+        group_list = await db.groups.aggregate(GROUP_MANAGEMENT_PIPELINE).to_list(None)
         
         return {"groups": group_list}
         
@@ -381,6 +900,76 @@ async def get_group_management():
         logger.error(f"Failed to get groups: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch groups")
 
+dashboard_sections.update({
+    "moderators": DashboardSectionCache(get_moderator_permissions),
+    "messages": DashboardSectionCache(get_bot_messages),
+    "fees": DashboardSectionCache(get_fee_config),
+    "groups": DashboardSectionCache(get_group_management),
+})
+
+@api_router.get("/dashboard/bootstrap")
+async def get_dashboard_bootstrap(request: Request, etags: Optional[str] = None):
+    """Every dashboard section in one round trip, loaded concurrently
+    
+    etags lists the client's copies as section:etag pairs, comma separated;
+    sections still matching are sent back as unchanged instead of in full.
+    """
+    try:
+        known = dict(pair.split(":", 1) for pair in etags.split(",") if ":" in pair) if etags else {}
+        names = list(dashboard_sections)
+        results = await asyncio.gather(*(dashboard_sections[name].get() for name in names), return_exceptions=True)
+        
+        sections, errors = {}, []
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                # One failing section should not blank the whole dashboard
+                logger.error(f"Failed to load dashboard section {name}: {result}")
+                errors.append(name)
+                continue
+            etag = dashboard_sections[name].etag
+            sections[name] = {"etag": etag, "unchanged": True} if known.get(name) == etag else {"etag": etag, "data": result}
+        
+        etag = '"' + hashlib.sha1(",".join(f"{name}:{section['etag']}" for name, section in sections.items()).encode()).hexdigest()[:16] + '"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding"}
+        if request.headers.get("if-none-match") == etag and not errors:
+            return Response(status_code=304, headers=headers)
+        
+        body = json.dumps({"sections": sections, "errors": errors}, default=str).encode()
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+        return Response(content=body, media_type="application/json", headers=headers)
+        
+    except Exception as e:
+        logger.error(f"Failed to get dashboard bootstrap: {e}")
+        raise HTTPException(status_code=500, detail="Failed to load dashboard")
+
+@api_router.get("/dashboard/stream")
+async def stream_dashboard(request: Request):
+    """Live dashboard deltas as server-sent events"""
+    queue = dashboard_feed.subscribe()
+    
+    def sse(event: str, data: Dict) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+    
+    async def events():
+        try:
+            # live=false tells the client to fall back to refreshing the bootstrap
+            yield sse("ready", {"live": dashboard_feed.live})
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), DASHBOARD_FEED_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse(event["type"], event)
+        finally:
+            dashboard_feed.unsubscribe(queue)
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @api_router.post("/groups/{group_id}/reset")
 async def reset_group(group_id: str):
     """Reset specific group"""
@@ -395,12 +984,14 @@ async def reset_group(group_id: str):
                 "expires_at": None,
                 "cooldown_until": None,
                 "creator_user_id": None,
-                "participant_ids": []
+                "participant_ids": [],
+                "updated_at": datetime.utcnow()
             }}
         )
+        invalidate_dashboard("stats", "groups")
         
         # Log the action
-        await db.audit_logs.insert_one({
+        await insert_audit_log({
             "id": str(uuid.uuid4()),
             "admin_id": "god_mode", 
             "action": "reset_group",
@@ -423,7 +1014,7 @@ async def export_all_keys():
         deals = await db.deals.find({"escrow_private_key": {"$exists": True}}).to_list(None)
         
         # Log key access (CRITICAL SECURITY LOG)
-        await db.audit_logs.insert_one({
+        await insert_audit_log({
             "id": str(uuid.uuid4()),
             "admin_id": "god_mode",
             "action": "EXPORT_ALL_PRIVATE_KEYS",
@@ -485,7 +1076,7 @@ async def get_deal_key(deal_id: str):
             raise HTTPException(status_code=404, detail="Deal not found")
         
         # Log key access
-        await db.audit_logs.insert_one({
+        await insert_audit_log({
             "id": str(uuid.uuid4()),
             "admin_id": "god_mode",
             "action": "VIEW_DEAL_PRIVATE_KEY",
@@ -510,30 +1101,39 @@ async def get_deal_key(deal_id: str):
         raise HTTPException(status_code=500, detail="Failed to retrieve private key")
 
 @api_router.get("/deals/{deal_id}/logs")
-async def get_deal_logs(deal_id: str):
-    """Get all messages/logs for a specific deal"""
+async def get_deal_logs(deal_id: str, limit: int = 200, cursor: Optional[str] = None):
+    """Get messages/logs for a specific deal in chronological pages"""
     try:
         # Get deal info
-        deal = await db.deals.find_one({"id": deal_id})
+        deal = await db.deals.find_one({"id": deal_id}, {"_id": 0, "escrow_id": 1, "group_id": 1, "created_at": 1})
         if not deal:
             raise HTTPException(status_code=404, detail="Deal not found")
         
-        # Get all audit logs for this deal
-        logs = await db.audit_logs.find({"deal_id": deal_id}).sort("timestamp", 1).to_list(None)
+        clauses = [{"deal_id": deal_id}]
         
-        # Get group-related logs if available
+        # Groups are reused, so group logs only count while this deal held the group
         if deal.get("group_id"):
-            group_logs = await db.audit_logs.find({"group_id": deal["group_id"]}).sort("timestamp", 1).to_list(None)
-            logs.extend(group_logs)
+            group_clause = {"group_id": deal["group_id"]}
+            if deal.get("created_at"):
+                window = {"$gte": deal["created_at"]}
+                next_deal = await db.deals.find_one(
+                    {"group_id": deal["group_id"], "created_at": {"$gt": deal["created_at"]}},
+                    {"_id": 0, "created_at": 1},
+                    sort=[("created_at", 1)]
+                )
+                if next_deal:
+                    window["$lt"] = next_deal["created_at"]
+                group_clause["timestamp"] = window
+            clauses.append(group_clause)
         
-        # Sort by timestamp
-        logs.sort(key=lambda x: x.get('timestamp', datetime.min))
+        # One $or query: each branch uses its (field, timestamp, _id) index and is merge-sorted
+        # Entries about a deal are written after it exists, so older months are skipped
+        page = await fetch_log_page({"$or": clauses}, limit, cursor, ascending=True, start=deal.get("created_at"))
         
         return {
             "deal_id": deal_id,
             "escrow_id": deal.get('escrow_id'),
-            "total_logs": len(logs),
-            "logs": logs
+            **page
         }
         
     except HTTPException:
@@ -543,11 +1143,11 @@ async def get_deal_logs(deal_id: str):
         raise HTTPException(status_code=500, detail="Failed to retrieve deal logs")
 
 @api_router.get("/export/data")
-async def export_all_data():
-    """Export all system data as ZIP file"""
+async def export_all_data(include_json: bool = True):
+    """Export all system data as a streamed ZIP file"""
     try:
         # Log data export
-        await db.audit_logs.insert_one({
+        await insert_audit_log({
             "id": str(uuid.uuid4()),
             "admin_id": "god_mode",
             "action": "EXPORT_ALL_DATA",
@@ -556,66 +1156,13 @@ async def export_all_data():
             "details": "Complete data export via God Mode"
         })
         
-        # Create ZIP file
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            
-            # Export Users
-            users = await db.users.find({}).to_list(None)
-            users_csv = io.StringIO()
-            if users:
-                csv_writer = csv.DictWriter(users_csv, fieldnames=users[0].keys())
-                csv_writer.writeheader()
-                csv_writer.writerows(users)
-            zip_file.writestr('users.csv', users_csv.getvalue())
-            
-            # Export Deals
-            deals = await db.deals.find({}).to_list(None)
-            deals_csv = io.StringIO()
-            if deals:
-                csv_writer = csv.DictWriter(deals_csv, fieldnames=deals[0].keys())
-                csv_writer.writeheader()
-                csv_writer.writerows(deals)
-            zip_file.writestr('deals.csv', deals_csv.getvalue())
-            
-            # Export Groups
-            groups = await db.groups.find({}).to_list(None)
-            groups_csv = io.StringIO()
-            if groups:
-                csv_writer = csv.DictWriter(groups_csv, fieldnames=groups[0].keys())
-                csv_writer.writeheader()
-                csv_writer.writerows(groups)
-            zip_file.writestr('groups.csv', groups_csv.getvalue())
-            
-            # Export Audit Logs
-            audit_logs = await db.audit_logs.find({}).to_list(None)
-            logs_csv = io.StringIO()
-            if audit_logs:
-                csv_writer = csv.DictWriter(logs_csv, fieldnames=audit_logs[0].keys())
-                csv_writer.writeheader()
-                csv_writer.writerows(audit_logs)
-            zip_file.writestr('audit_logs.csv', logs_csv.getvalue())
-            
-            # Export as JSON too
-            all_data = {
-                "users": users,
-                "deals": deals, 
-                "groups": groups,
-                "audit_logs": audit_logs,
-                "export_metadata": {
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "total_users": len(users),
-                    "total_deals": len(deals),
-                    "total_groups": len(groups),
-                    "total_logs": len(audit_logs)
-                }
-            }
-            zip_file.writestr('complete_data.json', json.dumps(all_data, default=str, indent=2))
-        
-        zip_buffer.seek(0)
+        def open_cursor(name: str):
+            if name == "audit_logs":
+                return open_audit_cursor({}, [("timestamp", 1), ("_id", 1)])
+            return db[name].find({}).batch_size(EXPORT_BATCH_SIZE)
         
         return StreamingResponse(
-            io.BytesIO(zip_buffer.getvalue()),
+            stream_export_zip(open_cursor, EXPORT_COLLECTIONS, include_json),
             media_type="application/zip",
             headers={"Content-Disposition": f"attachment; filename=rahu_complete_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"}
         )
@@ -624,6 +1171,51 @@ async def export_all_data():
         logger.error(f"Failed to export data: {e}")
         raise HTTPException(status_code=500, detail="Failed to export system data")
 
+@api_router.get("/export/delta")
+async def export_delta(since: Optional[datetime] = None, consumer: Optional[str] = None):
+    """Export documents changed since a watermark as NDJSON"""
+    try:
+        # A stored per-consumer cursor stands in for an explicit watermark
+        if since is None and consumer:
+            export_cursor = await db.export_cursors.find_one({"consumer": consumer})
+            if export_cursor:
+                since = export_cursor["watermark"]
+        
+        until = datetime.utcnow() - EXPORT_WATERMARK_LAG
+        if since is not None and since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        
+        await insert_audit_log({
+            "id": str(uuid.uuid4()),
+            "admin_id": "god_mode",
+            "action": "EXPORT_DELTA",
+            "target": consumer or "system_database",
+            "timestamp": datetime.utcnow(),
+            "details": f"Delta export from {since.isoformat() if since else 'beginning'} to {until.isoformat()}"
+        })
+        
+        def open_cursor(name: str, query: Dict, field: str):
+            if name == "audit_logs":
+                return open_audit_cursor(query, [(field, 1), ("_id", 1)], since)
+            return db[name].find(query).sort([(field, 1), ("_id", 1)]).batch_size(EXPORT_BATCH_SIZE)
+        
+        async def advance_cursor():
+            await db.export_cursors.update_one(
+                {"consumer": consumer},
+                {"$set": {"consumer": consumer, "watermark": until, "updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+        
+        return StreamingResponse(
+            stream_delta_ndjson(open_cursor, since, until, advance_cursor if consumer else None),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": f"attachment; filename=rahu_delta_{until.strftime('%Y%m%d_%H%M%S')}.ndjson"}
+        )
+        
+    except Exception as e:
+        logger.error(f"Failed to export delta: {e}")
+        raise HTTPException(status_code=500, detail="Failed to export delta")
+
 @api_router.post("/payout/manual")
 async def manual_payout(payout: ManualPayout):
     """Execute manual payout (DANGEROUS OPERATION)"""
@@ -634,7 +1226,7 @@ async def manual_payout(payout: ManualPayout):
             raise HTTPException(status_code=404, detail="Deal not found")
         
         # Log the manual payout (CRITICAL)
-        await db.audit_logs.insert_one({
+        await insert_audit_log({
             "id": str(uuid.uuid4()),
             "admin_id": "god_mode",
             "action": "MANUAL_PAYOUT_EXECUTED",
@@ -651,9 +1243,11 @@ async def manual_payout(payout: ManualPayout):
                 "manual_payout_address": payout.recipient_address,
                 "manual_payout_amount": payout.amount,
                 "manual_payout_reason": payout.reason,
-                "manual_payout_timestamp": datetime.utcnow()
+                "manual_payout_timestamp": datetime.utcnow(),
+                "updated_at": datetime.utcnow()
             }}
         )
+        invalidate_dashboard("stats", "groups")
         
         # In production, this would trigger actual blockchain transaction
         # For now, we simulate the payout
@@ -671,21 +1265,99 @@ async def manual_payout(payout: ManualPayout):
         logger.error(f"Failed to execute manual payout: {e}")
         raise HTTPException(status_code=500, detail="Failed to execute manual payout")
 
-@api_router.get("/audit/logs")
-async def get_audit_logs(limit: int = 100, action_filter: Optional[str] = None):
-    """Get audit logs for God Mode dashboard"""
+@api_router.post("/broadcast")
+async def create_broadcast(request: BroadcastRequest):
+    """Queue a broadcast; the bot's broadcast engine streams recipients and delivers it"""
     try:
-        query = {}
-        if action_filter:
-            query["action"] = {"$regex": action_filter, "$options": "i"}
+        broadcast_id = str(uuid.uuid4())
         
-        logs = await db.audit_logs.find(query).sort("timestamp", -1).limit(limit).to_list(None)
+        await db.broadcasts.insert_one({
+            "id": broadcast_id,
+            "message": request.message,
+            "created_by": 0,  # God Mode
+            "status": "Queued",
+            "dry_run": request.dry_run,
+            "created_at": datetime.utcnow(),
+            "started_at": None,
+            "completed_at": None,
+            "last_user_id": 0,
+            "sent_count": 0,
+            "failed_count": 0,
+            "blocked_count": 0
+        })
+        
+        recipients = await db.users.count_documents({
+            "is_banned": {"$ne": True},
+            "is_blocked": {"$ne": True}
+        })
+        
+        # Log the action
+        await insert_audit_log({
+            "id": str(uuid.uuid4()),
+            "admin_id": "god_mode",
+            "action": "queue_broadcast",
+            "target": broadcast_id,
+            "timestamp": datetime.utcnow(),
+            "details": f"Queued {'dry-run ' if request.dry_run else ''}broadcast to ~{recipients} users"
+        })
         
         return {
-            "total_logs": len(logs),
-            "logs": logs
+            "success": True,
+            "broadcast_id": broadcast_id,
+            "estimated_recipients": recipients
         }
         
+    except Exception as e:
+        logger.error(f"Failed to queue broadcast: {e}")
+        raise HTTPException(status_code=500, detail="Failed to queue broadcast")
+
+@api_router.get("/broadcast/{broadcast_id}")
+async def get_broadcast_status(broadcast_id: str):
+    """Get delivery progress for a broadcast"""
+    try:
+        broadcast = await db.broadcasts.find_one({"id": broadcast_id}, {"_id": 0, "message": 0})
+        
+        if not broadcast:
+            raise HTTPException(status_code=404, detail="Broadcast not found")
+        
+        return broadcast
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to get broadcast status: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve broadcast status")
+
+@api_router.get("/audit/logs")
+async def get_audit_logs(limit: int = 100, cursor: Optional[str] = None, action: Optional[str] = None,
+                         action_prefix: Optional[str] = None, user_id: Optional[int] = None,
+                         deal_id: Optional[str] = None, group_id: Optional[str] = None,
+                         start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Get audit logs for God Mode dashboard, one keyset page at a time"""
+    try:
+        query = {}
+        if action:
+            query["action"] = action
+        elif action_prefix:
+            # Anchored and case-sensitive so it scans a range of the action index
+            query["action"] = {"$regex": f"^{re.escape(action_prefix)}"}
+        if user_id is not None:
+            query["user_id"] = user_id
+        if deal_id:
+            query["deal_id"] = deal_id
+        if group_id:
+            query["group_id"] = group_id
+        if start or end:
+            query["timestamp"] = {}
+            if start:
+                query["timestamp"]["$gte"] = start
+            if end:
+                query["timestamp"]["$lt"] = end
+        
+        return await fetch_log_page(query, limit, cursor, start=start, end=end)
+        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to get audit logs: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve audit logs")
@@ -693,6 +1365,45 @@ async def get_audit_logs(limit: int = 100, action_filter: Optional[str] = None):
 # Include the router in the main app
 app.include_router(api_router)
 
+# Optional blockchain webhook receiver; the monitor it feeds runs in this process and
+# its lifecycle events are delivered by the bot replicas' event buses. It refuses to
+# start while a bot process serves WEBHOOK_PORT itself
+if os.environ.get('WEBHOOK_RECEIVER_ENABLED', '').lower() == 'true':
+    import sys
+    sys.path.insert(0, os.environ.get('BOT_DIR', str(ROOT_DIR.parent / 'phase1' / 'bot')))
+    from webhooks import create_webhook_router, API_RECEIVER_ROLE, RECEIVER_ROLE
+    from models import db_manager as bot_db_manager
+    from monitoring import start_monitoring_service, stop_monitoring_service
+    from cluster import coordinator
+    from supervisor import supervisor as bot_supervisor
+    from events import event_bus as bot_event_bus
+
+    app.include_router(create_webhook_router(), prefix="/api")
+
+    # Joins the bot replicas' cluster, so this monitor checks only its share of addresses,
+    # and follows their escrow events to watch addresses created after startup
+    @app.on_event("startup")
+    async def start_webhook_monitor():
+        await bot_db_manager.connect()
+        receivers = await coordinator.members_with(RECEIVER_ROLE)
+        if receivers:
+            raise RuntimeError(
+                f"WEBHOOK_RECEIVER_ENABLED but {', '.join(receivers)} already serve webhooks; "
+                "disable one of the two receivers"
+            )
+        coordinator.roles.add(API_RECEIVER_ROLE)
+        await coordinator.start()
+        await start_monitoring_service()
+        await bot_event_bus.start(durable=False)
+
+    @app.on_event("shutdown")
+    async def stop_webhook_monitor():
+        await bot_event_bus.stop()
+        await stop_monitoring_service()
+        await bot_supervisor.shutdown()
+        await coordinator.stop()
+        await bot_db_manager.disconnect()
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -701,6 +1412,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def start_dashboard_watcher():
+    app.state.dashboard_watcher = asyncio.create_task(watch_dashboard_changes())
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    app.state.dashboard_watcher.cancel()
     client.close()
\ No newline at end of file
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test that dashboard section caches never keep a value loaded before an invalidation
+
+A write invalidates its sections while a refresh may already be aggregating;
+that refresh's result must not be cached for the full TTL.
+"""
+
+import asyncio
+import os
+
+# server reads these at import; nothing connects until a query runs
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "rahu_dashboard_cache_test")
+
+import server
+
+async def run_cache():
+    loads = []
+    release = asyncio.Event()
+
+    async def loader():
+        loads.append(len(loads))
+        if len(loads) == 1:
+            await release.wait()
+        return {"loads": len(loads)}
+
+    cache = server.DashboardSectionCache(loader, ttl=60)
+
+    # A write lands while the first refresh is still aggregating
+    refresh = asyncio.create_task(cache.get())
+    await asyncio.sleep(0)
+    cache.invalidate()
+    release.set()
+    assert await refresh == {"loads": 1}
+    print("✅ Refresh in flight returned to its waiters")
+
+    assert await cache.get() == {"loads": 2}
+    assert await cache.get() == {"loads": 2}
+    assert len(loads) == 2
+    print("✅ Invalidated mid-refresh: reloaded once, then cached")
+
+def test_dashboard_cache():
+    print("🧪 Testing Dashboard Section Cache...")
+    print("=" * 60)
+
+    asyncio.run(run_cache())
+
+    print("\n✨ Dashboard Section Cache Test Complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_dashboard_cache()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test the /api/dashboard/stream SSE feed against a local MongoDB replica set
+
+Change streams need a replica set; a single-node one is enough:
+    mongod --replSet rs0 --dbpath /tmp/rs0 && mongosh --eval "rs.initiate()"
+
+The server runs in-process against a throwaway database (dropped afterwards),
+several admins connect, and writes to deals, groups, users and audit logs
+must reach every one of them through the single shared watcher.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from datetime import datetime
+
+import httpx
+import uvicorn
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def listen(url: str, events: list, ready: asyncio.Event):
+    """Collect (event, data) pairs from one SSE connection"""
+    async with httpx.AsyncClient(timeout=None) as client:
+        async with client.stream("GET", url) as response:
+            assert response.status_code == 200, response.status_code
+            event = None
+            async for line in response.aiter_lines():
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    data = json.loads(line[len("data: "):])
+                    events.append((event, data))
+                    if event == "ready":
+                        assert data["live"], "change stream not running; is MongoDB a replica set?"
+                        ready.set()
+
+async def wait_for(condition, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for dashboard events"
+        await asyncio.sleep(0.05)
+
+async def test_dashboard_stream(clients: int = 20):
+    # server reads MONGO_URL and DB_NAME at import
+    import server
+
+    print("🧪 Testing Dashboard Stream...")
+    print("=" * 60)
+
+    port = free_port()
+    uvicorn_server = uvicorn.Server(uvicorn.Config(server.app, host="127.0.0.1", port=port, log_level="warning"))
+    serve_task = asyncio.create_task(uvicorn_server.serve())
+    await wait_for(lambda: uvicorn_server.started)
+    # The watcher starts with the app; give it a moment to open the stream
+    await wait_for(lambda: server.dashboard_feed.live)
+
+    url = f"http://127.0.0.1:{port}/api/dashboard/stream"
+    inboxes = [[] for _ in range(clients)]
+    readies = [asyncio.Event() for _ in range(clients)]
+    listeners = [asyncio.create_task(listen(url, inbox, ready)) for inbox, ready in zip(inboxes, readies)]
+
+    try:
+        await asyncio.wait_for(asyncio.gather(*(ready.wait() for ready in readies)), 10)
+        assert len(server.dashboard_feed.subscribers) == clients
+        print(f"✅ {clients} admins connected to one change-stream watcher")
+
+        db = server.db
+        group_id, deal_id = str(uuid.uuid4()), str(uuid.uuid4())
+        await db.users.insert_one({"user_id": 4242, "username": "trader", "first_name": "T", "is_banned": False})
+        await db.groups.insert_one({"id": group_id, "group_number": 1, "status": "Available", "current_deal_id": None})
+        await db.deals.insert_one({"id": deal_id, "escrow_id": "ESCROW-TEST01", "group_id": group_id, "status": "Pending"})
+        await db.groups.update_one({"id": group_id}, {"$set": {"status": "Occupied", "current_deal_id": deal_id}})
+        # Confirmation churn and last_active updates are not dashboard-visible
+        await db.deals.update_one({"id": deal_id}, {"$set": {"confirmations": 1}})
+        await db.users.update_one({"user_id": 4242}, {"$set": {"last_active": datetime.utcnow()}})
+        await db.deals.update_one({"id": deal_id}, {"$set": {"status": "Funded"}})
+        await db.users.update_one({"user_id": 4242}, {"$set": {"is_banned": True}})
+        await server.insert_audit_log({
+            "id": str(uuid.uuid4()),
+            "admin_id": "god_mode",
+            "action": "stream_test",
+            "target": "ESCROW-TEST01",
+            "deal_id": deal_id,
+            "timestamp": datetime.utcnow()
+        })
+
+        def received(inbox, event, **fields):
+            return any(name == event and all(data.get(k) == v for k, v in fields.items()) for name, data in inbox)
+
+        expected = [
+            ("group", {"id": group_id, "op": "insert", "status": "Available"}),
+            ("deal", {"id": deal_id, "op": "insert", "status": "Pending"}),
+            ("group", {"id": group_id, "op": "update", "status": "Occupied", "current_deal_id": deal_id}),
+            ("deal", {"id": deal_id, "op": "update", "status": "Funded"}),
+            ("user", {"user_id": 4242, "op": "update", "is_banned": True}),
+            ("audit", {"action": "stream_test", "deal_id": deal_id}),
+        ]
+        await wait_for(lambda: all(received(inbox, event, **fields) for inbox in inboxes for event, fields in expected))
+        print("✅ Deal, group, user and audit deltas reached every admin")
+
+        # Counters follow once the burst settles
+        await wait_for(lambda: all(received(inbox, "stats") for inbox in inboxes))
+        stats = next(data for name, data in inboxes[0] if name == "stats")["stats"]
+        assert stats["users"] == 1 and stats["deals"] == 1, stats
+        print(f"✅ Stats pushed: {stats['users']} users, {stats['deals']} active deals")
+
+        for inbox in inboxes:
+            deal_updates = [data for name, data in inbox if name == "deal" and data["op"] == "update"]
+            assert len(deal_updates) == 1, deal_updates
+            user_events = [data for name, data in inbox if name == "user"]
+            assert all("last_active" not in data for data in user_events), user_events
+            assert len(user_events) == 2, user_events
+        print("✅ Confirmation and last_active churn filtered out")
+
+        # Each delta is compact: no full documents on the wire
+        sizes = [len(json.dumps(data)) for name, data in inboxes[0] if name in ("deal", "group", "user", "audit")]
+        print(f"📦 Largest delta: {max(sizes)} bytes")
+        assert max(sizes) < 512
+
+    finally:
+        for listener in listeners:
+            listener.cancel()
+        await asyncio.gather(*listeners, return_exceptions=True)
+        await server.client.drop_database(os.environ["DB_NAME"])
+        uvicorn_server.should_exit = True
+        await serve_task
+
+    print("\n✨ Dashboard Stream Test Complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017/?replicaSet=rs0")
+    parser.add_argument("--clients", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ["MONGO_URL"] = args.mongo_url
+    os.environ["DB_NAME"] = f"rahu_stream_test_{uuid.uuid4().hex[:8]}"
+    asyncio.run(test_dashboard_stream(args.clients))
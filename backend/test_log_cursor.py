@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test that audit log cursors from the API and from the bot are interchangeable
+
+Both page the same partitions with the same keyset, so a cursor handed out by
+one must resume at the same entry in the other. No database is needed.
+"""
+
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+# server reads these at import; nothing connects until a query runs
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "rahu_cursor_test")
+sys.path.insert(0, os.environ.get("BOT_DIR", str(Path(__file__).resolve().parent.parent / "phase1" / "bot")))
+
+import server
+import models
+
+def test_log_cursor():
+    print("🧪 Testing Audit Log Cursors...")
+    print("=" * 60)
+
+    entries = [
+        {"timestamp": datetime(2026, 3, 31, 23, 59, 59, 999999), "_id": ObjectId()},
+        {"timestamp": datetime(2026, 4, 1), "_id": ObjectId()},
+        {"timestamp": datetime(2026, 4, 1, 12, 30, 0, 500), "_id": ObjectId()},
+    ]
+
+    for log in entries:
+        cursor = server.encode_log_cursor(log)
+        assert cursor == models.encode_log_cursor(log)
+        assert models.decode_log_cursor(cursor) == (log["timestamp"], log["_id"])
+    print("✅ Both sides encode the same cursor and the bot decodes the API's")
+
+    # Same keyset condition, so either side resumes right after the cursor entry
+    for log in entries:
+        cursor = server.encode_log_cursor(log)
+        assert models.build_audit_log_query(cursor=cursor) == {"$and": [{}, server.keyset_after(cursor)]}
+        assert models.AUDIT_LOG_SORT == server.AUDIT_LOG_SORT
+    print("✅ Both sides resume from a cursor with the same keyset query")
+
+    # Malformed cursors are refused on both sides
+    for bad in ("", "not-a-date|abc", f"{datetime(2026, 4, 1).isoformat()}|not-an-object-id"):
+        try:
+            models.decode_log_cursor(bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"bot accepted {bad!r}")
+        try:
+            server.keyset_after(bad)
+        except HTTPException as e:
+            assert e.status_code == 400
+        else:
+            raise AssertionError(f"API accepted {bad!r}")
+    print("✅ Malformed cursors refused by both")
+
+    print("\n✨ Audit Log Cursor Test Complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_log_cursor()
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import './App.css';
 import { BrowserRouter, Routes, Route, Navigate, useNavigate } from 'react-router-dom';
 import axios from 'axios';
@@ -37,6 +37,8 @@ import {
 } from 'lucide-react';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || 'https://escrow-control-hub.preview.emergentagent.com';
+// Audit entries kept in the live activity list
+const LIVE_ACTIVITY_LIMIT = 20;
 
 // Login Component
 const Login = ({ onLogin }) => {
@@ -136,36 +138,112 @@ const Dashboard = () => {
   });
   const [fees, setFees] = useState([]);
   const [groups, setGroups] = useState([]);
+  const [activity, setActivity] = useState([]);
   const [loading, setLoading] = useState(false);
   const [successMessage, setSuccessMessage] = useState('');
   const [godModeActive, setGodModeActive] = useState(true);
+  // ETag of each dashboard section we already hold
+  const sectionEtags = useRef({});
 
   // Fetch real data from backend
   useEffect(() => {
     fetchDashboardData();
   }, []);
 
+  // Live updates pushed by the backend's change-stream feed
+  useEffect(() => {
+    const source = new EventSource(`${BACKEND_URL}/api/dashboard/stream`);
+    let pollTimer = null;
+    let connected = false;
+    let received = 0;
+
+    // Without a running change stream on the server, fall back to periodic refreshes
+    const setLive = (live) => {
+      if (!live && !pollTimer) {
+        pollTimer = setInterval(fetchDashboardData, 30000);
+      } else if (live && pollTimer) {
+        clearInterval(pollTimer);
+        pollTimer = null;
+        fetchDashboardData();
+      }
+    };
+
+    source.addEventListener('ready', (e) => {
+      // EventSource reconnects on its own; deltas sent while it was away are lost
+      if (connected) {
+        fetchDashboardData();
+      }
+      connected = true;
+      setLive(JSON.parse(e.data).live);
+    });
+    source.addEventListener('live', (e) => setLive(JSON.parse(e.data).live));
+    source.addEventListener('stats', (e) => {
+      const event = JSON.parse(e.data);
+      setStats(event.stats);
+      sectionEtags.current.stats = event.etag;
+    });
+    source.addEventListener('group', (e) => {
+      const event = JSON.parse(e.data);
+      setGroups(prev => prev.map(g => g.id === event.id ? {
+        ...g,
+        status: event.status ?? g.status,
+        expires_at: event.expires_at ?? g.expires_at
+      } : g));
+      if ('current_deal_id' in event) {
+        fetchDashboardData();
+      }
+    });
+    source.addEventListener('deal', (e) => {
+      // A new deal shows up in the group list; status moves only change counters, pushed as 'stats'
+      if (JSON.parse(e.data).op === 'insert') {
+        fetchDashboardData();
+      }
+    });
+    source.addEventListener('audit', (e) => {
+      const entry = { ...JSON.parse(e.data), seq: ++received };
+      setActivity(prev => [entry, ...prev].slice(0, LIVE_ACTIVITY_LIMIT));
+    });
+    source.addEventListener('user', (e) => {
+      // Moderator flags or names changed
+      fetchDashboardData();
+    });
+    source.addEventListener('invalidate', () => fetchDashboardData());
+    source.addEventListener('resync', () => fetchDashboardData());
+
+    return () => {
+      source.close();
+      if (pollTimer) {
+        clearInterval(pollTimer);
+      }
+    };
+  }, []);
+
   const fetchDashboardData = async () => {
     try {
-      // Fetch real stats
-      const statsRes = await axios.get(`${BACKEND_URL}/api/dashboard/stats`);
-      setStats(statsRes.data);
-
-      // Fetch moderators
-      const moderatorsRes = await axios.get(`${BACKEND_URL}/api/moderators/permissions`);
-      setModerators(moderatorsRes.data.moderators || []);
-
-      // Fetch bot messages
-      const messagesRes = await axios.get(`${BACKEND_URL}/api/bot/messages`);
-      setBotMessages(messagesRes.data);
-
-      // Fetch fees
-      const feesRes = await axios.get(`${BACKEND_URL}/api/fees/config`);
-      setFees(feesRes.data.networks || []);
+      // One round trip for every section; sections we hold unchanged come back without data
+      const etags = Object.entries(sectionEtags.current).map(([name, etag]) => `${name}:${etag}`).join(',');
+      const res = await axios.get(`${BACKEND_URL}/api/dashboard/bootstrap`, {
+        params: etags ? { etags } : {}
+      });
+      const { sections, errors } = res.data;
+
+      const apply = {
+        stats: (data) => setStats(data),
+        moderators: (data) => setModerators(data.moderators || []),
+        messages: (data) => setBotMessages(data),
+        fees: (data) => setFees(data.networks || []),
+        groups: (data) => setGroups(data.groups || [])
+      };
+      Object.entries(sections).forEach(([name, section]) => {
+        if (!section.unchanged && apply[name]) {
+          apply[name](section.data);
+        }
+        sectionEtags.current[name] = section.etag;
+      });
 
-      // Fetch groups
-      const groupsRes = await axios.get(`${BACKEND_URL}/api/groups/manage`);
-      setGroups(groupsRes.data.groups || []);
+      if (errors.length) {
+        console.error('Failed to load dashboard sections:', errors);
+      }
 
     } catch (error) {
       console.error('Failed to fetch dashboard data:', error);
@@ -372,6 +450,37 @@ const Dashboard = () => {
           </Card>
         </div>
 
+        {/* Live Activity - audit entries pushed by the dashboard stream */}
+        <Card className="bg-black/30 backdrop-blur-sm border border-amber-500/20">
+          <CardHeader>
+            <CardTitle className="text-amber-200 flex items-center">
+              <Activity className="w-5 h-5 mr-2 text-amber-400" />
+              Live Activity
+              <Badge className="ml-2 bg-green-900/30 text-green-300 border-green-500/30">LIVE</Badge>
+            </CardTitle>
+            <CardDescription className="text-amber-200/60">Audit entries as they are written</CardDescription>
+          </CardHeader>
+          <CardContent>
+            <div className="space-y-2 max-h-64 overflow-y-auto">
+              {activity.length === 0 ? (
+                <p className="text-amber-200/60 text-center py-4">No activity since the dashboard opened</p>
+              ) : (
+                activity.map((entry) => (
+                  <div key={entry.seq} className="flex items-center justify-between p-3 bg-black/20 rounded-lg border border-amber-500/10">
+                    <div>
+                      <span className="text-amber-200 font-medium">{entry.action}</span>
+                      {entry.target && <span className="text-amber-200/60 text-sm ml-2">{entry.target}</span>}
+                    </div>
+                    <span className="text-amber-200/60 text-sm">
+                      {entry.username && `${entry.username} · `}{String(entry.timestamp).slice(11, 19)}
+                    </span>
+                  </div>
+                ))
+              )}
+            </div>
+          </CardContent>
+        </Card>
+
         {/* God Mode Features */}
         <div className="grid grid-cols-1 lg:grid-cols-2 gap-8">
           {/* Permission Matrix - Individual Moderator Control */}
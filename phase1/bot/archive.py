@@ -0,0 +1,137 @@
+"""
+Audit Log Archiver for Rahu Escrow Bot
+Moves cold monthly audit partitions out of MongoDB into compressed files
+"""
+
+import os
+import gzip
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from bson import json_util
+from pymongo import ASCENDING
+
+from models import (
+    DatabaseManager, db_manager, audit_partition_name, audit_partition_month, next_month,
+    LEGACY_AUDIT_COLLECTION
+)
+
+logger = logging.getLogger(__name__)
+
+AUDIT_LOG_RETENTION_DAYS = int(os.getenv("AUDIT_LOG_RETENTION_DAYS", "365"))
+AUDIT_ARCHIVE_DIR = os.getenv("AUDIT_ARCHIVE_DIR", "audit_archive")
+ARCHIVE_BATCH_SIZE = 5000
+
+class AuditArchiver:
+    """Retention for partitioned audit logs: months past the cutoff become gzip NDJSON"""
+
+    def __init__(self, store: DatabaseManager = db_manager, directory: str = AUDIT_ARCHIVE_DIR,
+                 retention_days: int = AUDIT_LOG_RETENTION_DAYS):
+        self.store = store
+        self.directory = directory
+        self.retention_days = retention_days
+
+    def archive_path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.ndjson.gz")
+
+    async def migrate_legacy(self) -> int:
+        """Move entries from the unpartitioned audit_logs collection into monthly partitions"""
+        legacy = self.store.db[LEGACY_AUDIT_COLLECTION]
+        moved = 0
+
+        while True:
+            batch = await legacy.find({}).sort("_id", ASCENDING).limit(ARCHIVE_BATCH_SIZE).to_list(None)
+            if not batch:
+                break
+
+            by_partition = {}
+            for entry in batch:
+                by_partition.setdefault(audit_partition_name(entry["timestamp"]), []).append(entry)
+
+            for entries in by_partition.values():
+                collection = await self.store.audit_partition(entries[0]["timestamp"])
+                try:
+                    await collection.insert_many(entries, ordered=False)
+                except Exception as e:
+                    # Entries copied by an interrupted run are already there
+                    codes = {error.get("code") for error in getattr(e, "details", {}).get("writeErrors", [])}
+                    if not codes or codes != {11000}:
+                        raise
+
+            # Only delete once every entry in the batch exists in its partition
+            await legacy.delete_many({"_id": {"$in": [entry["_id"] for entry in batch]}})
+            moved += len(batch)
+
+        if moved:
+            logger.info(f"📦 Migrated {moved} legacy audit entries into monthly partitions")
+        return moved
+
+    def cold_partitions(self, names: List[str], now: Optional[datetime] = None) -> List[str]:
+        """Partitions whose whole month ended before the retention cutoff"""
+        cutoff = (now or datetime.utcnow()) - timedelta(days=self.retention_days)
+        return [name for name in names if next_month(audit_partition_month(name)) <= cutoff]
+
+    async def archive_partition(self, name: str) -> int:
+        """Write one partition to <dir>/<name>.ndjson.gz, verify it, then drop the collection"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.archive_path(name)
+        temp_path = path + ".tmp"
+        collection = self.store.db[name]
+
+        expected = await collection.count_documents({})
+        written = 0
+        out = await asyncio.to_thread(gzip.open, temp_path, "wt", encoding="utf-8")
+        try:
+            cursor = collection.find({}).sort([("timestamp", ASCENDING), ("_id", ASCENDING)]).batch_size(ARCHIVE_BATCH_SIZE)
+            lines = []
+            async for entry in cursor:
+                lines.append(json_util.dumps(entry) + "\n")
+                if len(lines) >= ARCHIVE_BATCH_SIZE:
+                    await asyncio.to_thread(out.writelines, lines)
+                    written += len(lines)
+                    lines = []
+            if lines:
+                await asyncio.to_thread(out.writelines, lines)
+                written += len(lines)
+        finally:
+            await asyncio.to_thread(out.close)
+
+        if written != expected:
+            os.remove(temp_path)
+            raise RuntimeError(f"Archive of {name} wrote {written} of {expected} entries")
+
+        os.replace(temp_path, path)
+        await collection.drop()
+        self.store._indexed_partitions.discard(name)
+        self.store._partitions_listed_at = 0.0
+        logger.info(f"🗄️ Archived {written} audit entries from {name} to {path}")
+        return written
+
+    async def restore_partition(self, name: str) -> int:
+        """Load an archived month back into MongoDB for investigation"""
+        path = self.archive_path(name)
+        def read_lines():
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return f.readlines()
+
+        lines = await asyncio.to_thread(read_lines)
+        entries = [json_util.loads(line) for line in lines]
+        if entries:
+            collection = await self.store.audit_partition(entries[0]["timestamp"])
+            for start in range(0, len(entries), ARCHIVE_BATCH_SIZE):
+                await collection.insert_many(entries[start:start + ARCHIVE_BATCH_SIZE], ordered=False)
+        return len(entries)
+
+    async def run_retention(self) -> int:
+        """Migrate legacy entries, then archive every cold month"""
+        await self.migrate_legacy()
+
+        archived = 0
+        for name in self.cold_partitions(await self.store.list_audit_partitions()):
+            archived += await self.archive_partition(name)
+        return archived
+
+# Global archiver
+audit_archiver = AuditArchiver()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Dry-run benchmark of the broadcast engine against a fake Telegram Bot API server
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from aiohttp import web
+from telegram import Bot
+from telegram.request import HTTPXRequest
+
+from models import Broadcast, BroadcastStatus
+from broadcast import BroadcastEngine
+
+logging.basicConfig(level=logging.WARNING)
+
+FAKE_TOKEN = "123456:FAKE-BENCHMARK-TOKEN"
+
+class FakeBotAPI:
+    """Minimal Bot API: every 50th chat has blocked the bot, one 429 early on"""
+
+    def __init__(self):
+        self.delivered = []
+        self.flood_sent = False
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+
+        if method == "getMe":
+            return web.json_response({"ok": True, "result": {
+                "id": 123456, "is_bot": True, "first_name": "Fake", "username": "FakeBot"
+            }})
+
+        params = dict(await request.post()) if request.can_read_body else {}
+        chat_id = int(params.get("chat_id", 0))
+
+        if len(self.delivered) == 200 and not self.flood_sent:
+            self.flood_sent = True
+            return web.json_response({
+                "ok": False, "error_code": 429,
+                "description": "Too Many Requests: retry after 1",
+                "parameters": {"retry_after": 1}
+            }, status=429)
+
+        if chat_id % 50 == 0:
+            return web.json_response({
+                "ok": False, "error_code": 403,
+                "description": "Forbidden: bot was blocked by the user"
+            }, status=403)
+
+        self.delivered.append(chat_id)
+        return web.json_response({"ok": True, "result": {
+            "message_id": len(self.delivered), "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"}, "text": params.get("text", "")
+        }})
+
+class InMemoryBroadcastStore:
+    """Stands in for DatabaseManager's broadcast operations"""
+
+    def __init__(self, user_count: int):
+        self.user_ids = list(range(1, user_count + 1))
+        self.blocked = set()
+        self.checkpoints = 0
+
+    async def iter_broadcast_recipients(self, after_user_id: int = 0, batch_size: int = 500):
+        batch = []
+        for user_id in self.user_ids:
+            if user_id <= after_user_id or user_id in self.blocked:
+                continue
+            batch.append(user_id)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def checkpoint_broadcast(self, broadcast_id, last_user_id, sent, failed, blocked):
+        self.checkpoints += 1
+        self.broadcast.last_user_id = last_user_id
+        self.broadcast.sent_count += sent
+        self.broadcast.failed_count += failed
+        self.broadcast.blocked_count += blocked
+        return True
+
+    async def mark_user_unreachable(self, user_id, reason):
+        self.blocked.add(user_id)
+        return True
+
+    async def finish_broadcast(self, broadcast_id, status, error=None):
+        self.broadcast.status = status
+        return True
+
+async def run_benchmark(users: int, rate: float, batch_size: int):
+    """Run a broadcast, interrupt it, resume it and report throughput"""
+    fake_api = FakeBotAPI()
+    app = web.Application()
+    app.router.add_post("/bot{token}/{method}", fake_api.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    bot = Bot(
+        FAKE_TOKEN,
+        base_url=f"http://127.0.0.1:{port}/bot",
+        request=HTTPXRequest(connection_pool_size=128)
+    )
+    await bot.initialize()
+
+    store = InMemoryBroadcastStore(users)
+    store.broadcast = Broadcast(message="📣 Benchmark announcement", created_by=0)
+    engine = BroadcastEngine(bot, store=store, rate_limit=rate, batch_size=batch_size)
+
+    print(f"📣 Broadcasting to {users} users at {rate:.0f} msg/s (batch {batch_size})")
+    print("=" * 60)
+
+    # First run: interrupt roughly halfway through
+    started = time.perf_counter()
+    first_run = asyncio.create_task(engine.run_broadcast(store.broadcast))
+    await asyncio.sleep(users / rate / 2)
+    first_run.cancel()
+    try:
+        await first_run
+    except asyncio.CancelledError:
+        pass
+    print(f"⏸️  Interrupted at checkpoint user_id={store.broadcast.last_user_id}")
+
+    # Second run: resume from checkpoint
+    totals = await engine.run_broadcast(store.broadcast)
+    elapsed = time.perf_counter() - started
+
+    expected_blocked = users // 50
+    resent = len(fake_api.delivered) - len(set(fake_api.delivered))
+
+    print(f"✅ Sent: {totals['sent']}  Unreachable: {totals['blocked']}  Failed: {totals['failed']}")
+    print(f"⏱️  Elapsed: {elapsed:.2f}s  Throughput: {len(fake_api.delivered) / elapsed:.1f} msg/s")
+    print(f"💾 Checkpoints written: {store.checkpoints}")
+    print(f"🔁 Duplicates after resume: {resent} (bounded by batch size {batch_size})")
+    print(f"🚫 Recorded unreachable users: {len(store.blocked)} (expected {expected_blocked})")
+    print(f"📋 Final status: {store.broadcast.status}")
+
+    assert set(fake_api.delivered) == {u for u in range(1, users + 1) if u % 50}
+    assert store.broadcast.status == BroadcastStatus.COMPLETED
+    assert resent <= batch_size
+
+    await bot.shutdown()
+    await runner.cleanup()
+    print("=" * 60)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--rate", type=float, default=1000.0)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.users, args.rate, args.batch_size))
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark hot-path reads: full Pydantic models vs projected __slots__ records
+
+Documents are shaped like stored users and deals, so the run measures the
+per-call decode cost after MongoDB has answered (model validation vs record
+construction) plus the payload each query would transfer.
+"""
+
+import argparse
+import time
+import uuid
+from datetime import datetime
+
+from bson import BSON
+
+from models import User, Deal, UserAccess, DealSummary, NetworkType, DealStatus
+
+def stored_user(i: int) -> dict:
+    return User(user_id=100000 + i, username=f"trader{i}", display_name=f"Trader {i}", first_name="Trader",
+                is_moderator=i % 10 == 0).dict()
+
+def stored_deal(i: int) -> dict:
+    return Deal(
+        escrow_id=f"ESCROW-{i:06d}", group_id=str(uuid.uuid4()), buyer_user_id=100000 + i, seller_user_id=200000 + i,
+        buyer_address="bc1qxy2kgdygjrsqtzq2n0yrf2493p83kkfjhx0wlh", seller_address="bc1qar0srrr7xfkvy5l643lydnw9re59gtzzwf5mdq",
+        network=NetworkType.BTC, escrow_address="bc1q9d4ywgfnd8h43da5tpcxcn6ajv590cg6d3tg6axemvljvt2k76zs50tv4q",
+        escrow_private_key="gAAAAAB" + "x" * 180, amount=0.05, amount_usd=3100.0, fee_amount=0.0005,
+        status=DealStatus.FUNDED, funded_at=datetime.utcnow(), confirmations=3
+    ).dict()
+
+def projected(document: dict, record_type) -> dict:
+    """What find_one returns with the record's projection"""
+    return {field: document[field] for field in record_type.__slots__ if field in document}
+
+def per_call_us(fn, documents, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for document in documents:
+            fn(document)
+    return (time.perf_counter() - started) / (rounds * len(documents)) * 1e6
+
+def run_benchmark(documents: int, rounds: int):
+    print(f"🏎️ Read-path benchmark: {documents} documents x {rounds} rounds")
+    print("=" * 60)
+
+    for label, stored, model, record in [
+        ("users → check_user_permissions", stored_user, User, UserAccess),
+        ("deals → funding/notification", stored_deal, Deal, DealSummary),
+    ]:
+        full_docs = [stored(i) for i in range(documents)]
+        slim_docs = [projected(document, record) for document in full_docs]
+
+        model_us = per_call_us(lambda document: model(**document), full_docs, rounds)
+        record_us = per_call_us(record, slim_docs, rounds)
+        full_bytes = len(BSON.encode(full_docs[0]))
+        slim_bytes = len(BSON.encode(slim_docs[0]))
+
+        print(f"• {label}")
+        print(f"    {model.__name__}(**doc): {model_us:6.2f} µs/call   {full_bytes} B/doc")
+        print(f"    {record.__name__}(doc):  {record_us:6.2f} µs/call   {slim_bytes} B/doc")
+        print(f"    ⚡ {model_us / record_us:.1f}x faster decode, {full_bytes / slim_bytes:.1f}x less data")
+
+        # Records expose the same values the models would
+        sample_model, sample_record = model(**full_docs[1]), record(slim_docs[1])
+        for field in record.__slots__:
+            assert getattr(sample_record, field) == getattr(sample_model, field), field
+        assert record_us < model_us, "records should decode faster than models"
+
+    print("=" * 60)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    run_benchmark(args.documents, args.rounds)
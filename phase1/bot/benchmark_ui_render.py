@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark message and keyboard rendering: per-call builds vs the template layer
+
+Each case renders N times the way the handlers do and keeps every result (as
+queued replies would), so the run shows both time per render and how much
+memory the results pin when they are rebuilt vs shared. Per-render peaks are
+sampled over 1,000 renders with tracemalloc; timings run untraced.
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import ui
+from ui import LuxuryFormatter, KeyboardBuilder, MessageTemplate, compile_template
+
+def uncached(fn):
+    """The function underneath an lru_cache: builds a fresh result every call"""
+    return getattr(fn, "__wrapped__", fn)
+
+CASES = [
+    ("welcome (per-call compile)",
+     lambda: MessageTemplate(LuxuryFormatter.WELCOME_TEMPLATE.source).render(greeting="Welcome", user_name="trader_one"),
+     lambda: LuxuryFormatter.format_welcome_message("trader_one")),
+    ("rules",
+     lambda: uncached(ui._render_rules)(ui.config_cache.config),
+     LuxuryFormatter.format_rules_message),
+    ("error message",
+     lambda: uncached(ui._render_error)(ui.config_cache.config, "invalid_address", "BTC"),
+     lambda: LuxuryFormatter.format_error_message("invalid_address", "BTC")),
+    ("configured text",
+     lambda: MessageTemplate("Hello {user_name}, welcome to *Rahu*").render(user_name="trader_one"),
+     lambda: compile_template("Hello {user_name}, welcome to *Rahu*").render(user_name="trader_one")),
+    ("main menu keyboard",
+     uncached(KeyboardBuilder.build_main_menu),
+     KeyboardBuilder.build_main_menu),
+    ("network keyboard",
+     lambda: uncached(KeyboardBuilder.build_network_selection)("buyer"),
+     lambda: KeyboardBuilder.build_network_selection("buyer")),
+]
+
+def measure(render, renders: int):
+    """Seconds for N renders, bytes still held by the results, distinct results, peak bytes per render"""
+    started = time.perf_counter()
+    for _ in range(renders):
+        render()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    peak = 0
+    for _ in range(1000):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        result = render()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+        del result
+    results = [render() for _ in range(renders)]
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, retained, len({id(result) for result in results}), peak
+
+def run_benchmark(renders: int):
+    print(f"🏎️ UI render benchmark: {renders:,} renders per case")
+    print("=" * 60)
+
+    for label, before, after in CASES:
+        assert before() == after(), label
+        before_s, before_bytes, before_objects, before_peak = measure(before, renders)
+        after_s, after_bytes, after_objects, after_peak = measure(after, renders)
+
+        print(f"• {label}")
+        print(f"    per call: {before_s / renders * 1e6:6.2f} µs  {before_peak / 1024:6.1f} KB/render peak  "
+              f"{before_bytes / 1e6:6.1f} MB held  {before_objects:,} objects")
+        print(f"    template: {after_s / renders * 1e6:6.2f} µs  {after_peak / 1024:6.1f} KB/render peak  "
+              f"{after_bytes / 1e6:6.1f} MB held  {after_objects:,} objects")
+        print(f"    ⚡ {before_s / after_s:.1f}x faster, {before_peak / max(after_peak, 1):.1f}x less per-render allocation")
+        assert after_s < before_s and after_peak < before_peak, f"{label}: template path should be cheaper"
+
+    print("=" * 60)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=100_000)
+    args = parser.parse_args()
+
+    run_benchmark(args.renders)
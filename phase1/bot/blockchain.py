@@ -21,9 +21,42 @@ import base58
 import binascii
 
 from models import NetworkType
+from blocks import normalize_address
 
 logger = logging.getLogger(__name__)
 
+# Confirmations required before a deposit counts as final
+CONFIRMATION_THRESHOLDS = {
+    NetworkType.BTC: 3,
+    NetworkType.LTC: 6,
+    NetworkType.ETH: 12,
+    NetworkType.USDT_BEP20: 15,
+    NetworkType.USDT_TRC20: 19
+}
+
+# Average block time per network in seconds
+BLOCK_TIMES = {
+    NetworkType.BTC: 600,
+    NetworkType.LTC: 150,
+    NetworkType.ETH: 12,
+    NetworkType.USDT_BEP20: 3,
+    NetworkType.USDT_TRC20: 3
+}
+
+# ERC-20/BEP-20 transfer(address,uint256) selector
+TRANSFER_SELECTOR = "0xa9059cbb"
+
+def get_tx_hash(tx: dict) -> Optional[str]:
+    """Extract the transaction hash from any provider's transaction record"""
+    return tx.get("tx_hash") or tx.get("hash") or tx.get("transaction_id")
+
+def pays_address(network: NetworkType, tx: dict, address: str) -> bool:
+    """Whether a provider's transaction record is a deposit to address"""
+    if network in [NetworkType.BTC, NetworkType.LTC]:
+        # BlockCypher txrefs: spends from the address carry tx_output_n -1
+        return tx.get("tx_output_n", -1) >= 0
+    return normalize_address(network, tx.get("to") or "") == normalize_address(network, address)
+
 class BlockchainAPI:
     """Real blockchain API integration with free services"""
     
@@ -216,41 +249,108 @@ class BlockchainAPI:
             logger.error(f"Failed to get transactions for {network}: {e}")
             return []
     
-    async def check_transaction(self, network: NetworkType, tx_hash: str) -> dict:
-        """Check specific transaction status"""
+    async def check_transaction(self, network: NetworkType, tx_hash: str, address: Optional[str] = None) -> dict:
+        """Check specific transaction status
+        
+        confirmed means final and successful, failed that it can never be (reverted
+        or double-spent); "to" and "amount" describe what the transaction paid, to
+        address when one is given for UTXO chains.
+        """
         try:
+            threshold = CONFIRMATION_THRESHOLDS[network]
+            
             if network in [NetworkType.BTC, NetworkType.LTC]:
                 data = await self._make_request(network, f"txs/{tx_hash}")
+                confirmations = data.get("confirmations", 0)
+                
+                to_address, value = None, data.get("total", 0)
+                if address:
+                    paid = [output for output in data.get("outputs", []) if address in (output.get("addresses") or [])]
+                    to_address = address if paid else None
+                    value = sum(output.get("value", 0) for output in paid)
+                
                 return {
-                    "confirmed": data.get("confirmations", 0) >= 3,
-                    "confirmations": data.get("confirmations", 0),
-                    "amount": Decimal(data.get("total", 0)) / Decimal("100000000"),
+                    "confirmed": confirmations >= threshold and not data.get("double_spend", False),
+                    "failed": data.get("double_spend", False),
+                    "confirmations": confirmations,
+                    "amount": Decimal(value) / Decimal("100000000"),
+                    "to": to_address,
                     "timestamp": data.get("confirmed", "")
                 }
                 
-            elif network == NetworkType.ETH:
+            elif network in [NetworkType.ETH, NetworkType.USDT_BEP20]:
                 params = {
                     "module": "proxy",
                     "action": "eth_getTransactionByHash",
                     "txhash": tx_hash
                 }
                 data = await self._make_request(network, "", params)
-                result = data.get("result", {})
+                result = data.get("result") or {}
+                
+                confirmations, status = 0, None
+                if result.get("blockNumber"):
+                    head = await self._make_request(network, "", {"module": "proxy", "action": "eth_blockNumber"})
+                    confirmations = int(head.get("result", "0x0"), 16) - int(result["blockNumber"], 16) + 1
+                    # A mined transaction can still have reverted
+                    receipt = await self._make_request(network, "", {
+                        "module": "proxy",
+                        "action": "eth_getTransactionReceipt",
+                        "txhash": tx_hash
+                    })
+                    status = (receipt.get("result") or {}).get("status")
+                
+                to_address, amount = None, Decimal("0")
+                if network == NetworkType.ETH:
+                    to_address = result.get("to")
+                    amount = Decimal(int(result.get("value", "0x0"), 16)) / Decimal("1000000000000000000")
+                elif (result.get("to") or "").lower() == self.APIS[network]["contract"].lower():
+                    # Token transfer: recipient and amount live in the call data
+                    call_data = result.get("input", "")
+                    if call_data.startswith(TRANSFER_SELECTOR) and len(call_data) >= 138:
+                        to_address = "0x" + call_data[34:74]
+                        amount = Decimal(int(call_data[74:138], 16)) / Decimal("1000000000000000000")
                 
                 return {
-                    "confirmed": result.get("blockNumber") is not None,
-                    "amount": Decimal(int(result.get("value", "0"), 16)) / Decimal("1000000000000000000"),
-                    "to": result.get("to"),
+                    "confirmed": confirmations >= threshold and status == "0x1",
+                    "failed": status == "0x0",
+                    "confirmations": confirmations,
+                    "amount": amount,
+                    "to": to_address,
                     "from": result.get("from")
                 }
                 
-            elif network in [NetworkType.USDT_BEP20, NetworkType.USDT_TRC20]:
-                # Similar implementation for token transactions
-                return {"confirmed": False, "amount": Decimal("0")}
+            elif network == NetworkType.USDT_TRC20:
+                info = await self._make_request(network, "wallet/gettransactioninfobyid", {"value": tx_hash})
+                
+                confirmations = 0
+                if info.get("blockNumber"):
+                    head = await self._make_request(network, "wallet/getnowblock")
+                    head_number = head.get("block_header", {}).get("raw_data", {}).get("number", 0)
+                    confirmations = head_number - info["blockNumber"] + 1
+                
+                # Token transfer: recipient and amount live in the call data
+                tx = await self._make_request(network, "wallet/gettransactionbyid", {"value": tx_hash})
+                contracts = tx.get("raw_data", {}).get("contract") or [{}]
+                call = contracts[0].get("parameter", {}).get("value", {})
+                call_data = call.get("data", "")
+                to_address, amount = None, Decimal("0")
+                if (call.get("contract_address", "").lower() == normalize_address(network, self.APIS[network]["contract"])
+                        and call_data.startswith(TRANSFER_SELECTOR[2:]) and len(call_data) >= 136):
+                    to_address = "41" + call_data[32:72].lower()
+                    amount = Decimal(int(call_data[72:136], 16)) / Decimal("1000000")  # USDT has 6 decimals
+                
+                result = info.get("receipt", {}).get("result", "SUCCESS")
+                return {
+                    "confirmed": confirmations >= threshold and result == "SUCCESS",
+                    "failed": result != "SUCCESS",
+                    "confirmations": confirmations,
+                    "amount": amount,
+                    "to": to_address
+                }
                 
         except Exception as e:
             logger.error(f"Failed to check transaction {tx_hash}: {e}")
-            return {"confirmed": False, "amount": Decimal("0")}
+            return {"confirmed": False, "failed": False, "confirmations": 0, "amount": Decimal("0")}
 
 class RealWalletGenerator:
     """Production-grade wallet generation with real cryptography"""
@@ -477,7 +577,7 @@ class RealEscrowWalletManager:
                                 "tx_hash": tx.get("tx_hash"),
                                 "amount": amount,
                                 "confirmations": tx.get("confirmations", 0),
-                                "confirmed": tx.get("confirmations", 0) >= 3
+                                "confirmed": tx.get("confirmations", 0) >= CONFIRMATION_THRESHOLDS[network]
                             })
                     elif network == NetworkType.ETH:
                         if tx.get("to", "").lower() == address.lower():
@@ -485,7 +585,29 @@ class RealEscrowWalletManager:
                             recent_deposits.append({
                                 "tx_hash": tx.get("hash"),
                                 "amount": amount,
-                                "confirmed": True  # Etherscan only returns confirmed txs
+                                "confirmations": int(tx.get("confirmations", 0)),
+                                "confirmed": int(tx.get("confirmations", 0)) >= CONFIRMATION_THRESHOLDS[network]
+                            })
+                    elif network == NetworkType.USDT_BEP20:
+                        if tx.get("to", "").lower() == address.lower():
+                            decimals = int(tx.get("tokenDecimal", 18))
+                            amount = Decimal(tx.get("value", "0")) / (Decimal(10) ** decimals)
+                            recent_deposits.append({
+                                "tx_hash": tx.get("hash"),
+                                "amount": amount,
+                                "confirmations": int(tx.get("confirmations", 0)),
+                                "confirmed": int(tx.get("confirmations", 0)) >= CONFIRMATION_THRESHOLDS[network]
+                            })
+                    elif network == NetworkType.USDT_TRC20:
+                        if tx.get("to") == address:
+                            decimals = int(tx.get("token_info", {}).get("decimals", 6))
+                            amount = Decimal(tx.get("value", "0")) / (Decimal(10) ** decimals)
+                            recent_deposits.append({
+                                "tx_hash": tx.get("transaction_id"),
+                                "amount": amount,
+                                # TronGrid history has no confirmation count; the tracker resolves it
+                                "confirmations": 0,
+                                "confirmed": False
                             })
                 
                 return {
@@ -0,0 +1,200 @@
+"""
+Block Sources for Rahu Escrow Bot
+Per-chain block followers that turn new blocks into address credits
+"""
+
+import os
+import logging
+from decimal import Decimal
+from typing import Dict, List
+
+import aiohttp
+import base58
+
+from models import NetworkType
+
+logger = logging.getLogger(__name__)
+
+# keccak256("Transfer(address,address,uint256)")
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+TRC20_TRANSFER_SELECTOR = "a9059cbb"
+
+USDT_BEP20_CONTRACT = "0x55d398326f99059fF775485246999027B3197955"
+USDT_TRC20_CONTRACT = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+
+def normalize_address(network: NetworkType, address: str) -> str:
+    """Canonical form used for address-set lookups"""
+    address = address.strip()
+
+    if network in [NetworkType.ETH, NetworkType.USDT_BEP20]:
+        return address.lower()
+
+    if network == NetworkType.USDT_TRC20:
+        # Blocks carry hex (41...) addresses; convert base58 once at watch time
+        if address.startswith("T"):
+            return base58.b58decode_check(address).hex()
+        return address.lower()
+
+    # Bech32 is case-insensitive, base58 is not
+    if address.lower().startswith(("bc1", "ltc1")):
+        return address.lower()
+    return address
+
+class BitcoinRPCSource:
+    """Bitcoin Core / Litecoin Core JSON-RPC block source"""
+
+    def __init__(self, url: str):
+        self.url = url
+
+    async def _call(self, session: aiohttp.ClientSession, method: str, params: list):
+        payload = {"jsonrpc": "1.0", "id": "rahu", "method": method, "params": params}
+        async with session.post(self.url, json=payload) as response:
+            data = await response.json(content_type=None)
+            if data.get("error"):
+                raise RuntimeError(f"{method} failed: {data['error']}")
+            return data["result"]
+
+    async def get_head(self, session: aiohttp.ClientSession) -> int:
+        return await self._call(session, "getblockcount", [])
+
+    async def get_credits(self, session: aiohttp.ClientSession, height: int) -> List[Dict]:
+        block_hash = await self._call(session, "getblockhash", [height])
+        block = await self._call(session, "getblock", [block_hash, 2])
+        return self.parse_block(block)
+
+    @staticmethod
+    def parse_block(block: Dict) -> List[Dict]:
+        """Extract every output of a verbosity-2 block"""
+        credits = []
+        for tx in block.get("tx", []):
+            for output in tx.get("vout", []):
+                script = output.get("scriptPubKey", {})
+                address = script.get("address") or (script.get("addresses") or [None])[0]
+                if not address:
+                    continue
+                credits.append({
+                    "address": normalize_address(NetworkType.BTC, address),
+                    "amount": Decimal(str(output.get("value", 0))),
+                    "tx_hash": tx.get("txid")
+                })
+        return credits
+
+class EVMRPCSource:
+    """Ethereum-compatible JSON-RPC source for native or token transfers"""
+
+    def __init__(self, url: str, token_contract: str = None, decimals: int = 18):
+        self.url = url
+        self.token_contract = token_contract
+        self.unit = Decimal(10) ** decimals
+
+    async def _call(self, session: aiohttp.ClientSession, method: str, params: list):
+        payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+        async with session.post(self.url, json=payload) as response:
+            data = await response.json(content_type=None)
+            if data.get("error"):
+                raise RuntimeError(f"{method} failed: {data['error']}")
+            return data["result"]
+
+    async def get_head(self, session: aiohttp.ClientSession) -> int:
+        return int(await self._call(session, "eth_blockNumber", []), 16)
+
+    async def get_credits(self, session: aiohttp.ClientSession, height: int) -> List[Dict]:
+        if self.token_contract:
+            logs = await self._call(session, "eth_getLogs", [{
+                "fromBlock": hex(height),
+                "toBlock": hex(height),
+                "address": self.token_contract,
+                "topics": [TRANSFER_TOPIC]
+            }])
+            return self.parse_logs(logs)
+
+        block = await self._call(session, "eth_getBlockByNumber", [hex(height), True])
+        return self.parse_block(block or {})
+
+    def parse_block(self, block: Dict) -> List[Dict]:
+        """Extract native value transfers"""
+        credits = []
+        for tx in block.get("transactions", []):
+            value = int(tx.get("value", "0x0"), 16)
+            if value and tx.get("to"):
+                credits.append({
+                    "address": tx["to"].lower(),
+                    "amount": Decimal(value) / self.unit,
+                    "tx_hash": tx.get("hash")
+                })
+        return credits
+
+    def parse_logs(self, logs: List[Dict]) -> List[Dict]:
+        """Extract token Transfer events"""
+        credits = []
+        for log in logs:
+            topics = log.get("topics", [])
+            if len(topics) < 3 or topics[0] != TRANSFER_TOPIC:
+                continue
+            credits.append({
+                "address": "0x" + topics[2][-40:].lower(),
+                "amount": Decimal(int(log.get("data", "0x0"), 16)) / self.unit,
+                "tx_hash": log.get("transactionHash")
+            })
+        return credits
+
+class TronBlockSource:
+    """TRON full-node HTTP source for TRC20 transfers"""
+
+    def __init__(self, url: str, token_contract: str = USDT_TRC20_CONTRACT, decimals: int = 6, api_key: str = None):
+        self.url = url.rstrip("/")
+        self.contract_hex = normalize_address(NetworkType.USDT_TRC20, token_contract)
+        self.unit = Decimal(10) ** decimals
+        self.headers = {"TRON-PRO-API-KEY": api_key} if api_key else {}
+
+    async def _post(self, session: aiohttp.ClientSession, path: str, payload: dict) -> Dict:
+        async with session.post(f"{self.url}/{path}", json=payload, headers=self.headers) as response:
+            return await response.json(content_type=None)
+
+    async def get_head(self, session: aiohttp.ClientSession) -> int:
+        block = await self._post(session, "wallet/getnowblock", {})
+        return block["block_header"]["raw_data"]["number"]
+
+    async def get_credits(self, session: aiohttp.ClientSession, height: int) -> List[Dict]:
+        block = await self._post(session, "wallet/getblockbynum", {"num": height})
+        return self.parse_block(block)
+
+    def parse_block(self, block: Dict) -> List[Dict]:
+        """Extract successful transfer() calls to the token contract"""
+        credits = []
+        for tx in block.get("transactions", []):
+            if tx.get("ret", [{}])[0].get("contractRet", "SUCCESS") != "SUCCESS":
+                continue
+            for contract in tx.get("raw_data", {}).get("contract", []):
+                if contract.get("type") != "TriggerSmartContract":
+                    continue
+                value = contract.get("parameter", {}).get("value", {})
+                data = value.get("data", "")
+                if value.get("contract_address", "").lower() != self.contract_hex or not data.startswith(TRC20_TRANSFER_SELECTOR):
+                    continue
+                credits.append({
+                    "address": "41" + data[32:72].lower(),
+                    "amount": Decimal(int(data[72:136] or "0", 16)) / self.unit,
+                    "tx_hash": tx.get("txID")
+                })
+        return credits
+
+def build_block_sources() -> Dict[NetworkType, object]:
+    """Block sources for every chain with a configured node endpoint"""
+    sources = {}
+
+    if os.getenv("BTC_RPC_URL"):
+        sources[NetworkType.BTC] = BitcoinRPCSource(os.getenv("BTC_RPC_URL"))
+    if os.getenv("LTC_RPC_URL"):
+        sources[NetworkType.LTC] = BitcoinRPCSource(os.getenv("LTC_RPC_URL"))
+    if os.getenv("ETH_RPC_URL"):
+        sources[NetworkType.ETH] = EVMRPCSource(os.getenv("ETH_RPC_URL"))
+    if os.getenv("BSC_RPC_URL"):
+        sources[NetworkType.USDT_BEP20] = EVMRPCSource(os.getenv("BSC_RPC_URL"), USDT_BEP20_CONTRACT)
+
+    sources[NetworkType.USDT_TRC20] = TronBlockSource(
+        os.getenv("TRON_NODE_URL", "https://api.trongrid.io"),
+        api_key=os.getenv("TRONGRID_API_KEY")
+    )
+
+    return sources
@@ -0,0 +1,188 @@
+"""
+Broadcast Engine for Rahu Escrow Bot
+Rate-limited, resumable announcements to the entire premium user base
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import timedelta
+from typing import Dict, Optional
+
+from telegram import Bot
+from telegram.error import BadRequest, Forbidden, RetryAfter, TelegramError
+
+from models import Broadcast, BroadcastStatus, db_manager
+
+logger = logging.getLogger(__name__)
+
+# Telegram allows roughly 30 messages per second for bulk notifications
+BROADCAST_RATE_LIMIT = float(os.getenv("BROADCAST_RATE_LIMIT", "30"))
+BROADCAST_BATCH_SIZE = int(os.getenv("BROADCAST_BATCH_SIZE", "100"))
+BROADCAST_POLL_INTERVAL = 5  # seconds between queue checks
+BROADCAST_MAX_ATTEMPTS = 3
+
+class RateLimiter:
+    """Token bucket shared by every concurrent send"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a send slot is available"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+
+                elapsed = max(0.0, now - self.updated)
+                self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Halt all sends after a flood-control response"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.updated = self.paused_until
+        self.tokens = 0.0
+
+class BroadcastEngine:
+    """Streams recipients from MongoDB and delivers at the maximum safe rate"""
+
+    def __init__(self, bot: Bot, store=db_manager, rate_limit: float = BROADCAST_RATE_LIMIT,
+                 batch_size: int = BROADCAST_BATCH_SIZE):
+        self.bot = bot
+        self.store = store
+        self.limiter = RateLimiter(rate_limit)
+        self.batch_size = batch_size
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start picking up queued broadcasts"""
+        if self.running:
+            return
+
+        self.running = True
+
+        # Anything still marked running was interrupted by a restart
+        requeued = await self.store.requeue_running_broadcasts()
+        if requeued:
+            logger.info(f"📣 Resuming {requeued} interrupted broadcasts from checkpoint")
+
+        self._task = asyncio.create_task(self._job_loop())
+        logger.info("📣 Started premium broadcast engine")
+
+    async def stop(self):
+        """Stop the engine; an in-flight broadcast resumes on next start"""
+        self.running = False
+
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+        logger.info("🛑 Stopped premium broadcast engine")
+
+    async def _job_loop(self):
+        """Claim and run queued broadcasts one at a time"""
+        while self.running:
+            try:
+                broadcast = await self.store.claim_next_broadcast()
+                if broadcast:
+                    await self.run_broadcast(broadcast)
+                    continue
+
+                await asyncio.sleep(BROADCAST_POLL_INTERVAL)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in broadcast loop: {e}")
+                await asyncio.sleep(60)
+
+    async def run_broadcast(self, broadcast: Broadcast) -> Dict[str, int]:
+        """Deliver a broadcast, checkpointing after every batch"""
+        logger.info(f"📣 Running broadcast {broadcast.id} from user_id > {broadcast.last_user_id}")
+
+        totals = {
+            "sent": broadcast.sent_count,
+            "failed": broadcast.failed_count,
+            "blocked": broadcast.blocked_count
+        }
+
+        try:
+            async for batch in self.store.iter_broadcast_recipients(broadcast.last_user_id, self.batch_size):
+                results = await asyncio.gather(*(self._deliver(user_id, broadcast) for user_id in batch))
+
+                sent = results.count("sent")
+                failed = results.count("failed")
+                blocked = results.count("blocked")
+
+                # A restart re-sends at most this batch
+                await self.store.checkpoint_broadcast(broadcast.id, batch[-1], sent, failed, blocked)
+
+                totals["sent"] += sent
+                totals["failed"] += failed
+                totals["blocked"] += blocked
+
+        except Exception as e:
+            # Not left Running forever; delivery stopped at the last checkpoint
+            logger.error(f"❌ Broadcast {broadcast.id} failed after {totals['sent']} sent: {e}")
+            await self.store.finish_broadcast(broadcast.id, BroadcastStatus.FAILED, error=str(e))
+            raise
+
+        await self.store.finish_broadcast(broadcast.id, BroadcastStatus.COMPLETED)
+        logger.info(
+            f"✅ Broadcast {broadcast.id} complete: {totals['sent']} sent, "
+            f"{totals['blocked']} unreachable, {totals['failed']} failed"
+        )
+        return totals
+
+    async def _deliver(self, user_id: int, broadcast: Broadcast) -> str:
+        """Send to one recipient, returning sent, blocked or failed"""
+        for attempt in range(BROADCAST_MAX_ATTEMPTS):
+            await self.limiter.acquire()
+
+            if broadcast.dry_run:
+                return "sent"
+
+            try:
+                await self.bot.send_message(chat_id=user_id, text=broadcast.message)
+                return "sent"
+
+            except RetryAfter as e:
+                delay = e.retry_after
+                if isinstance(delay, timedelta):
+                    delay = delay.total_seconds()
+                logger.warning(f"Flood control hit, pausing broadcast for {delay}s")
+                self.limiter.pause(delay)
+
+            except Forbidden as e:
+                # Bot blocked by the user or account deactivated
+                await self.store.mark_user_unreachable(user_id, str(e))
+                return "blocked"
+
+            except BadRequest as e:
+                if "chat not found" in str(e).lower():
+                    await self.store.mark_user_unreachable(user_id, str(e))
+                    return "blocked"
+                logger.error(f"Broadcast to {user_id} rejected: {e}")
+                return "failed"
+
+            except TelegramError as e:
+                logger.warning(f"Broadcast to {user_id} failed (attempt {attempt + 1}): {e}")
+
+        return "failed"
@@ -0,0 +1,218 @@
+"""
+Replica Coordination for Rahu Escrow Bot
+Mongo leases for singleton jobs and consistent-hash sharding of monitored addresses
+"""
+
+import os
+import time
+import uuid
+import socket
+import asyncio
+import bisect
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Iterable, List, Optional
+
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from models import db_manager
+from supervisor import TaskSupervisor, supervisor as default_supervisor
+
+logger = logging.getLogger(__name__)
+
+REPLICA_ID = os.getenv("REPLICA_ID") or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+LEASE_TTL = float(os.getenv("LEASE_TTL", "30"))  # seconds
+HASH_RING_VNODES = 64
+
+def ring_hash(value: str) -> int:
+    """Stable 64-bit hash; Python's hash() differs between processes"""
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+class HashRing:
+    """Consistent hash ring: a replica joining or leaving moves only its share of keys"""
+
+    def __init__(self, members: Iterable[str], vnodes: int = HASH_RING_VNODES):
+        self.members = frozenset(members)
+        points = sorted((ring_hash(f"{member}#{i}"), member) for member in self.members for i in range(vnodes))
+        self._hashes = [point for point, _ in points]
+        self._owners = [member for _, member in points]
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self._hashes:
+            return None
+        return self._owners[bisect.bisect(self._hashes, ring_hash(key)) % len(self._hashes)]
+
+class ReplicaCoordinator:
+    """Membership heartbeats, leases and key ownership for one bot replica
+
+    Both collections hold TTL documents: replicas/<id> is renewed every ttl/3 and
+    defines the ring; leases/<name> is held by whoever renewed it last. Local
+    expiry is measured from before each write, so a replica always considers a
+    lease or its membership lost before the rest of the cluster does.
+    """
+
+    def __init__(self, store=db_manager, replica_id: str = REPLICA_ID, ttl: float = LEASE_TTL,
+                 supervisor: TaskSupervisor = default_supervisor):
+        self.store = store
+        self.supervisor = supervisor
+        self.replica_id = replica_id
+        self.ttl = ttl
+        self.renew_interval = ttl / 3
+        self.ring = HashRing([replica_id])
+        self.leases = {}  # lease name -> local (monotonic) expiry
+        self.member_until = 0.0
+        self.started = False
+        self.listeners: List[Callable[[], Awaitable]] = []
+        self.roles: set = set()  # advertised with every heartbeat, e.g. "webhooks"
+
+    async def start(self):
+        """Join the cluster and keep membership and held leases renewed"""
+        await self.store.db.replicas.create_index("expires_at", expireAfterSeconds=0)
+        await self.store.db.leases.create_index("expires_at", expireAfterSeconds=0)
+
+        await self.heartbeat()
+        self.started = True
+        self.supervisor.spawn("replica_heartbeat", self._heartbeat_loop, stall_after=self.ttl)
+        logger.info(f"🛰️ Replica {self.replica_id} joined {len(self.ring.members)}-replica cluster")
+
+    async def stop(self):
+        """Leave the cluster so the others rebalance without waiting for the TTL"""
+        await self.supervisor.cancel("replica_heartbeat")
+        for name in list(self.leases):
+            await self.release(name)
+        try:
+            await self.store.db.replicas.delete_one({"_id": self.replica_id})
+        except PyMongoError as e:
+            logger.warning(f"Failed to deregister replica: {e}")
+        self.member_until = 0.0
+        logger.info(f"🛑 Replica {self.replica_id} left the cluster")
+
+    def on_rebalance(self, listener: Callable[[], Awaitable]):
+        """Call listener() whenever ring membership changes"""
+        self.listeners.append(listener)
+
+    # Membership
+
+    async def heartbeat(self):
+        """Renew membership and held leases, then rebuild the ring if replicas came or went"""
+        started = time.monotonic()
+        now = datetime.utcnow()
+        await self.store.db.replicas.update_one(
+            {"_id": self.replica_id},
+            {"$set": {"heartbeat_at": now, "expires_at": now + timedelta(seconds=self.ttl),
+                      "roles": sorted(self.roles)}},
+            upsert=True
+        )
+        self.member_until = started + self.ttl
+
+        for name in list(self.leases):
+            if not await self.acquire(name):
+                logger.warning(f"⚠️ Lost lease {name}")
+
+        members = await self.store.db.replicas.find({"expires_at": {"$gt": now}}, {"_id": 1}).to_list(None)
+        member_ids = {member["_id"] for member in members} | {self.replica_id}
+        if member_ids != self.ring.members:
+            logger.info(f"🛰️ Cluster membership changed: {len(self.ring.members)} → {len(member_ids)} replicas")
+            self.ring = HashRing(member_ids)
+            for listener in self.listeners:
+                try:
+                    await listener()
+                except Exception as e:
+                    logger.error(f"Rebalance listener failed: {e}")
+
+    async def members_with(self, role: str) -> List[str]:
+        """Other live replicas advertising role"""
+        members = await self.store.db.replicas.find(
+            {"roles": role, "expires_at": {"$gt": datetime.utcnow()}}, {"_id": 1}
+        ).to_list(None)
+        return [member["_id"] for member in members if member["_id"] != self.replica_id]
+
+    async def _heartbeat_loop(self):
+        while True:
+            with self.supervisor.iteration("replica_heartbeat"):
+                try:
+                    await self.heartbeat()
+                except PyMongoError as e:
+                    logger.error(f"Replica heartbeat failed: {e}")
+            await asyncio.sleep(self.renew_interval)
+
+    def owns(self, key: str) -> bool:
+        """Whether this replica is responsible for key (an address or deal ID)
+
+        Once our membership may have lapsed the others have taken our keys over,
+        so nothing is owned until the next successful heartbeat. A process that
+        never joined a cluster (scripts, tests) runs alone and owns everything.
+        """
+        if not self.started:
+            return True
+        if time.monotonic() >= self.member_until:
+            return False
+        return self.ring.owner(key) == self.replica_id
+
+    # Leases
+
+    async def acquire(self, name: str) -> bool:
+        """Take or renew a lease; False while another replica holds it"""
+        started = time.monotonic()
+        now = datetime.utcnow()
+        try:
+            await self.store.db.leases.update_one(
+                {"_id": name, "$or": [{"holder": self.replica_id}, {"expires_at": {"$lte": now}}]},
+                {"$set": {"holder": self.replica_id, "renewed_at": now,
+                          "expires_at": now + timedelta(seconds=self.ttl)}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # The upsert lost to a live lease held elsewhere
+            self.leases.pop(name, None)
+            return False
+        except PyMongoError as e:
+            logger.error(f"Failed to acquire lease {name}: {e}")
+            return False
+
+        self.leases[name] = started + self.ttl
+        return True
+
+    def holds(self, name: str) -> bool:
+        expiry = self.leases.get(name)
+        return expiry is not None and time.monotonic() < expiry
+
+    async def release(self, name: str):
+        self.leases.pop(name, None)
+        try:
+            await self.store.db.leases.delete_one({"_id": name, "holder": self.replica_id})
+        except PyMongoError as e:
+            logger.warning(f"Failed to release lease {name}: {e}")
+
+    async def run_as_leader(self, name: str, job: Callable[[], Awaitable]):
+        """Run job() only while this replica holds lease name; stand by otherwise
+
+        The job is cancelled as soon as the lease cannot be renewed. Errors
+        propagate, so a supervised caller restarts with backoff.
+        """
+        while True:
+            if not await self.acquire(name):
+                self.supervisor.set_state(name, "standby")
+                await asyncio.sleep(self.renew_interval)
+                continue
+
+            self.supervisor.set_state(name, "running")
+            logger.info(f"👑 Replica {self.replica_id} is leader for {name}")
+            task = asyncio.create_task(job(), name=f"{name}:leader")
+            try:
+                while not task.done() and self.holds(name):
+                    await asyncio.wait({task}, timeout=self.renew_interval)
+            finally:
+                if not task.done():
+                    task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                if self.holds(name):
+                    await self.release(name)
+
+            if not task.cancelled() and task.exception():
+                raise task.exception()
+            logger.warning(f"⚠️ Replica {self.replica_id} gave up leadership of {name}")
+
+# Global coordinator for this process
+coordinator = ReplicaCoordinator()
@@ -0,0 +1,134 @@
+"""
+Runtime Config Cache for Rahu Escrow Bot
+God Mode edits to messages, fees and error strings served from memory
+"""
+
+import os
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from pymongo.errors import PyMongoError
+
+from models import db_manager
+
+logger = logging.getLogger(__name__)
+
+# Fallback when change streams are unavailable (standalone MongoDB)
+CONFIG_POLL_INTERVAL = float(os.getenv("CONFIG_POLL_INTERVAL", "1.0"))
+CONFIG_TYPES = ["messages", "fees"]
+
+class RuntimeConfig:
+    """One immutable snapshot of bot_config; replaced whole on every reload"""
+
+    __slots__ = ("version", "welcome_message", "rules_message", "error_messages", "fees")
+
+    def __init__(self, documents: List[Dict] = ()):
+        by_type = {document.get("type"): document for document in documents}
+        messages = by_type.get("messages") or {}
+        fees = by_type.get("fees") or {}
+
+        self.version = config_version(documents)
+        self.welcome_message: Optional[str] = messages.get("welcome_message") or None
+        self.rules_message: Optional[str] = messages.get("rules_message") or None
+        self.error_messages: Dict[str, str] = dict(messages.get("error_messages") or {})
+        self.fees: Dict[str, Dict] = {fee["network"]: fee for fee in fees.get("networks", []) if fee.get("network")}
+
+def config_version(documents: List[Dict]) -> Tuple:
+    """Comparable version of the stored config documents"""
+    return tuple(sorted(
+        (document.get("type"), document.get("version", 0), str(document.get("updated_at")))
+        for document in documents
+    ))
+
+class ConfigCache:
+    """bot_config kept in memory, reloaded by change stream or version polling"""
+
+    def __init__(self, store=db_manager, poll_interval: float = CONFIG_POLL_INTERVAL):
+        self.store = store
+        self.poll_interval = poll_interval
+        self.config = RuntimeConfig()
+        self.reloads = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Load the current config and follow later edits"""
+        if self._task:
+            return
+
+        try:
+            await self.reload()
+        except Exception as e:
+            logger.error(f"Failed to load bot config, using built-in messages: {e}")
+
+        self._task = asyncio.create_task(self._run())
+        logger.info("⚙️ Started runtime config cache")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logger.info("🛑 Stopped runtime config cache")
+
+    async def reload(self):
+        """Read every config document and swap in a fresh snapshot"""
+        documents = await self.store.db.bot_config.find({"type": {"$in": CONFIG_TYPES}}).to_list(None)
+        self.config = RuntimeConfig(documents)
+        self.reloads += 1
+        logger.info(f"⚙️ Loaded bot config version {self.config.version}")
+
+    async def _run(self):
+        while True:
+            try:
+                await self._watch()
+            except PyMongoError as e:
+                logger.info(f"Config change stream unavailable, polling every {self.poll_interval}s: {e}")
+                await self._poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in config watcher: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _watch(self):
+        """Reload on every bot_config write; edits land within one round trip"""
+        async with self.store.db.bot_config.watch() as stream:
+            # Catch edits made between the initial load and the stream opening
+            await self.reload()
+            async for _ in stream:
+                await self.reload()
+
+    async def _poll(self):
+        """Compare version fields only; reload when any document changed"""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                documents = await self.store.db.bot_config.find(
+                    {"type": {"$in": CONFIG_TYPES}},
+                    {"_id": 0, "type": 1, "version": 1, "updated_at": 1}
+                ).to_list(None)
+                if config_version(documents) != self.config.version:
+                    await self.reload()
+            except Exception as e:
+                logger.error(f"Failed to poll bot config: {e}")
+
+    # Memory-only accessors for the message path
+
+    def welcome_message(self) -> Optional[str]:
+        return self.config.welcome_message
+
+    def rules_message(self) -> Optional[str]:
+        return self.config.rules_message
+
+    def error_message(self, error_type: str) -> Optional[str]:
+        return self.config.error_messages.get(error_type)
+
+    def network_fee(self, network: str) -> Optional[Dict]:
+        return self.config.fees.get(network)
+
+# Global config cache
+config_cache = ConfigCache()
@@ -0,0 +1,224 @@
+"""
+Deposit Confirmation Tracker for Rahu Escrow Bot
+Follows detected deposits by tx hash until they reach network finality
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from models import NetworkType, DealStatus, GroupStatus, db_manager
+from blockchain import BlockchainAPI, CONFIRMATION_THRESHOLDS, BLOCK_TIMES, get_tx_hash, pays_address
+from blocks import normalize_address
+from transitions import state_machine
+from events import FundingSeen, DealFunded
+from cluster import coordinator
+
+logger = logging.getLogger(__name__)
+
+MIN_RECHECK_INTERVAL = 10  # seconds
+MAX_RECHECK_INTERVAL = 600  # seconds
+
+class ConfirmationTracker:
+    """Re-checks pending deposits on a per-chain block-time schedule"""
+
+    def __init__(self):
+        self.pending: Dict[str, Dict] = {}  # deal_id -> tracking entry
+        self._schedule: List[Tuple[float, str]] = []  # heap of (due, deal_id)
+        self._wakeup = asyncio.Event()
+        self.api = BlockchainAPI()
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start tracking, resuming deals already in Funding Seen"""
+        if self.running:
+            return
+
+        self.running = True
+        await self._load_pending_deals()
+        # Deals of a replica that left become ours to follow
+        coordinator.on_rebalance(self._load_pending_deals)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"⛓️ Started confirmation tracker with {len(self.pending)} pending deposits")
+
+    async def stop(self):
+        """Stop the confirmation tracker"""
+        self.running = False
+
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+        logger.info("🛑 Stopped confirmation tracker")
+
+    async def track(self, deal_id: str, network: NetworkType, address: str, tx_hash: Optional[str], amount: float) -> bool:
+        """Record first sighting of a deposit and schedule confirmation checks
+
+        Only the first report of a deposit moves the deal to Funding Seen; repeats
+        (the per-deal monitor and the shared poller both report) return False.
+        """
+        seen = FundingSeen(deal_id=deal_id, network=network.value, escrow_address=address, amount=amount,
+                           tx_hash=tx_hash, required_confirmations=CONFIRMATION_THRESHOLDS[network])
+        deal = await state_machine.transition_deal(deal_id, DealStatus.FUNDING_SEEN, {
+            "amount": amount,
+            "transaction_hash": tx_hash,
+            "funding_seen_at": datetime.utcnow()
+        }, events=[seen])
+        if deal is None:
+            logger.info(f"Deposit for deal {deal_id} already recorded")
+            return False
+
+        entry = {
+            "deal_id": deal_id,
+            "network": network,
+            "address": address,
+            "tx_hash": tx_hash,
+            "amount": amount
+        }
+        self._schedule_check(entry, BLOCK_TIMES[network])
+        logger.info(f"⛓️ Tracking confirmations for deal {deal_id} ({network.value})")
+        return True
+
+    def _schedule_check(self, entry: Dict, delay: float):
+        """Queue the next confirmation check for an entry"""
+        entry["due"] = time.monotonic() + delay
+        self.pending[entry["deal_id"]] = entry
+        heapq.heappush(self._schedule, (entry["due"], entry["deal_id"]))
+        self._wakeup.set()
+
+    async def _load_pending_deals(self):
+        """Resume tracking for deals interrupted mid-confirmation that this replica owns"""
+        try:
+            deals = await db_manager.get_deals_by_status(DealStatus.FUNDING_SEEN)
+
+            for deal in deals:
+                if not deal.network or not deal.escrow_address:
+                    continue
+                if deal.id in self.pending or not coordinator.owns(deal.id):
+                    continue
+
+                entry = {
+                    "deal_id": deal.id,
+                    "network": NetworkType(deal.network),
+                    "address": deal.escrow_address,
+                    "tx_hash": deal.transaction_hash,
+                    "amount": deal.amount or 0.0
+                }
+                self._schedule_check(entry, 0)
+
+        except Exception as e:
+            logger.error(f"Failed to load pending deposits: {e}")
+
+    async def _run(self):
+        """Run due checks, sleeping until the next one is scheduled"""
+        while self.running:
+            try:
+                now = time.monotonic()
+                due = []
+
+                while self._schedule and self._schedule[0][0] <= now:
+                    due_at, deal_id = heapq.heappop(self._schedule)
+                    entry = self.pending.get(deal_id)
+                    # Skip stale heap entries superseded by a reschedule
+                    if entry and entry["due"] == due_at:
+                        due.append(entry)
+
+                if due:
+                    async with self.api as api:
+                        for entry in due:
+                            await self._check_entry(api, entry)
+                    continue
+
+                timeout = self._schedule[0][0] - now if self._schedule else None
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in confirmation tracker: {e}")
+                await asyncio.sleep(60)
+
+    async def _check_entry(self, api: BlockchainAPI, entry: Dict):
+        """Check one deposit and either finalise or reschedule it"""
+        network = entry["network"]
+        threshold = CONFIRMATION_THRESHOLDS[network]
+        confirmations = 0
+
+        try:
+            # Resolve the hash once; every later check is a single tx lookup
+            if not entry["tx_hash"]:
+                entry["tx_hash"] = await self._find_deposit(api, entry)
+                if entry["tx_hash"]:
+                    await state_machine.update_deal(
+                        entry["deal_id"], {"transaction_hash": entry["tx_hash"]}, [DealStatus.FUNDING_SEEN]
+                    )
+
+            if entry["tx_hash"]:
+                tx_status = await api.check_transaction(network, entry["tx_hash"], entry["address"])
+                confirmations = tx_status.get("confirmations", 0)
+
+                if tx_status.get("failed") or (confirmations >= threshold and not self._pays_escrow(entry, tx_status)):
+                    # Never going to fund the deal; look for another deposit to the escrow
+                    logger.warning(f"⚠️ Transaction {entry['tx_hash']} does not fund deal {entry['deal_id']}; ignoring it")
+                    entry.setdefault("rejected", set()).add(entry["tx_hash"])
+                    entry["tx_hash"], confirmations = None, 0
+                elif tx_status.get("confirmed"):
+                    del self.pending[entry["deal_id"]]
+                    await self._mark_funded(entry, confirmations)
+                    return
+
+        except Exception as e:
+            logger.error(f"Failed to check confirmations for deal {entry['deal_id']}: {e}")
+
+        remaining = threshold - confirmations
+        delay = min(max(BLOCK_TIMES[network] * remaining, MIN_RECHECK_INTERVAL), MAX_RECHECK_INTERVAL)
+        self._schedule_check(entry, delay)
+
+    async def _find_deposit(self, api: BlockchainAPI, entry: Dict) -> Optional[str]:
+        """Newest incoming transaction to the escrow address not already ruled out"""
+        network = entry["network"]
+        rejected = entry.get("rejected", ())
+        for tx in await api.get_transactions(network, entry["address"], 5):
+            tx_hash = get_tx_hash(tx)
+            if tx_hash and tx_hash not in rejected and pays_address(network, tx, entry["address"]):
+                return tx_hash
+        return None
+
+    @staticmethod
+    def _pays_escrow(entry: Dict, tx_status: Dict) -> bool:
+        """The transaction credited the escrow address with the deposit that was seen"""
+        network = entry["network"]
+        recipient = tx_status.get("to")
+        if not recipient or normalize_address(network, recipient) != normalize_address(network, entry["address"]):
+            return False
+        amount = float(tx_status.get("amount", 0))
+        return amount > 0 and amount >= entry["amount"]
+
+    async def _mark_funded(self, entry: Dict, confirmations: int):
+        """Promote a confirmed deposit from Funding Seen to Funded"""
+        deal_id = entry["deal_id"]
+        network = entry["network"]
+
+        # Deal and group move to Funded together, once; audit and the group notification follow from the event
+        funded = DealFunded(deal_id=deal_id, network=network.value, escrow_address=entry["address"],
+                            amount=entry["amount"], tx_hash=entry["tx_hash"], confirmations=confirmations)
+        deal = await state_machine.transition_deal(deal_id, DealStatus.FUNDED, {
+            "funded_at": datetime.utcnow(),
+            "confirmations": confirmations
+        }, group_status=GroupStatus.FUNDED, events=[funded])
+        if deal is None:
+            logger.warning(f"⚠️ Deal {deal_id} or its group left Funding Seen before confirmation; not marked funded")
+            return
+
+        logger.info(f"✅ Deal {deal_id} funded with {confirmations} confirmations")
+
+# Global confirmation tracker
+confirmation_tracker = ConfirmationTracker()
@@ -0,0 +1,379 @@
+"""
+Event Bus for Rahu Escrow Bot
+Deal and group lifecycle events kept in a Mongo outbox and dispatched to in-process subscribers
+"""
+
+import os
+import uuid
+import asyncio
+import logging
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+from models import db_manager
+from cluster import REPLICA_ID
+from supervisor import TaskSupervisor, supervisor as default_supervisor
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "2.0"))  # seconds
+OUTBOX_RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", "7"))
+OUTBOX_CLAIM_TTL = 60  # seconds a replica has to deliver an event it claimed
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_RETRY_DELAY = 2.0  # seconds, doubled per failed attempt
+OUTBOX_MAX_RETRY_DELAY = 300.0  # seconds
+OUTBOX_BATCH = 100
+BROADCAST_WINDOW = timedelta(seconds=30)  # look-back for events committed out of created_at order
+BROADCAST_SEEN_SIZE = 10000
+
+# Events
+
+class Event:
+    """A lifecycle fact, written to the outbox together with the change it describes
+
+    Subclasses name their payload fields; the class name is the stored event type.
+    """
+
+    fields: Tuple[str, ...] = ()
+    audit_action: Optional[str] = None
+
+    def __init__(self, id: Optional[str] = None, created_at: Optional[datetime] = None, **payload):
+        missing = [field for field in self.fields if field not in payload]
+        if missing:
+            raise TypeError(f"{self.type} is missing {', '.join(missing)}")
+
+        self.id = id or str(uuid.uuid4())
+        self.created_at = created_at or datetime.utcnow()
+        self.payload = payload
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["payload"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @property
+    def type(self) -> str:
+        return type(self).__name__
+
+    def audit(self) -> Tuple[str, str]:
+        """Target and details of the system audit entry for this event"""
+        return "", ""
+
+    def document(self) -> Dict:
+        """Outbox document; available for delivery as soon as it commits"""
+        return {
+            "_id": self.id,
+            "type": self.type,
+            "payload": self.payload,
+            "created_at": self.created_at,
+            "available_at": self.created_at,
+            "attempts": 0,
+            "delivered": [],
+            "dispatched_at": None
+        }
+
+    @staticmethod
+    def from_document(document: Dict) -> Optional["Event"]:
+        event_type = EVENT_TYPES.get(document["type"])
+        if event_type is None:
+            return None
+        return event_type(id=document["_id"], created_at=document["created_at"], **document["payload"])
+
+class DealCreated(Event):
+    fields = ("deal_id", "escrow_id", "group_id", "creator_user_id")
+    audit_action = "deal_created"
+
+    def audit(self):
+        return self.escrow_id, f"Deal opened by user {self.creator_user_id} in group {self.group_id}"
+
+class EscrowGenerated(Event):
+    fields = ("deal_id", "network", "escrow_address")
+    audit_action = "escrow_generated"
+
+    def audit(self):
+        return self.escrow_address, f"{self.network} escrow wallet generated for deal {self.deal_id}"
+
+class FundingSeen(Event):
+    fields = ("deal_id", "network", "escrow_address", "amount", "tx_hash", "required_confirmations")
+    audit_action = "escrow_funding_seen"
+
+    def audit(self):
+        return self.escrow_address, (f"Deposit of {self.amount} {self.network} seen, "
+                                     f"awaiting {self.required_confirmations} confirmations")
+
+class DealFunded(Event):
+    fields = ("deal_id", "network", "escrow_address", "amount", "tx_hash", "confirmations")
+    audit_action = "escrow_funded"
+
+    def audit(self):
+        return self.escrow_address, (f"Real funding confirmed: {self.amount} {self.network} "
+                                     f"after {self.confirmations} confirmations")
+
+class DealFrozen(Event):
+    fields = ("deal_id",)
+    audit_action = "deal_frozen"
+
+    def audit(self):
+        return self.deal_id, "Deal frozen"
+
+class DealUnfrozen(Event):
+    fields = ("deal_id",)
+    audit_action = "deal_unfrozen"
+
+    def audit(self):
+        return self.deal_id, "Deal unfrozen"
+
+class GroupExpired(Event):
+    fields = ("group_id", "group_number")
+    audit_action = "group_reset"
+
+    def audit(self):
+        return f"Group {self.group_number}", "Auto-reset after cooldown period"
+
+class GroupBound(Event):
+    fields = ("group_id", "group_number", "chat_id")
+    audit_action = "group_bound"
+
+    def audit(self):
+        return f"Group {self.group_number}", f"Bound to Telegram chat {self.chat_id}"
+
+class CheckRequested(Event):
+    """A webhook reported activity on an address another replica checks; not audited"""
+    fields = ("network", "address", "priority")
+
+EVENT_TYPES = {event_type.__name__: event_type for event_type in Event.__subclasses__()}
+
+# Dispatch
+
+Handler = Callable[[Event], Awaitable]
+
+class Subscriber:
+    """A named handler for some (or, with no types, all) event types"""
+
+    __slots__ = ("name", "handler", "types", "broadcast", "delivered", "failed")
+
+    def __init__(self, name: str, handler: Handler, types: Iterable[str], broadcast: bool):
+        self.name = name
+        self.handler = handler
+        self.types = frozenset(types)
+        self.broadcast = broadcast
+        self.delivered = 0
+        self.failed = 0
+
+    def wants(self, event: Event) -> bool:
+        return not self.types or event.type in self.types
+
+class EventBus:
+    """At-least-once delivery of outbox events to this process's subscribers
+
+    Durable subscribers see each event once across the cluster (more after a
+    crash or failure): a replica claims the outbox document, delivers it to every
+    durable subscriber not yet done with it and records who succeeded; failures
+    come back with backoff and dead-letter after OUTBOX_MAX_ATTEMPTS. Broadcast
+    subscribers (caches) run on every replica that is dispatching, for every
+    event it sees committed, and are not retried. Processes that only publish
+    need not start the bus; those that keep caches without hosting the durable
+    subscribers (webhook receivers) start it with durable=False.
+    """
+
+    def __init__(self, store=db_manager, replica_id: str = REPLICA_ID, poll_interval: float = OUTBOX_POLL_INTERVAL,
+                 retry_delay: float = OUTBOX_RETRY_DELAY, supervisor: TaskSupervisor = default_supervisor):
+        self.store = store
+        self.replica_id = replica_id
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.supervisor = supervisor
+        self.subscribers: Dict[str, Subscriber] = {}
+        self.running = False
+        self.durable = True
+        self.dead_lettered = 0
+        self._wakeup = asyncio.Event()
+        self._local: List[Event] = []  # committed here, not yet broadcast
+        self._seen: "OrderedDict[str, None]" = OrderedDict()  # event IDs already broadcast
+        self._cursor: Optional[datetime] = None
+
+    def subscribe(self, name: str, handler: Handler, *event_types: type, broadcast: bool = False):
+        """Deliver events of event_types (all when none given) to handler(event)"""
+        self.subscribers[name] = Subscriber(name, handler, (t.__name__ for t in event_types), broadcast)
+
+    async def start(self, durable: bool = True):
+        """Create the outbox indexes and start dispatching; without durable, broadcast subscribers only"""
+        if self.running:
+            return
+
+        outbox = self.store.db.outbox
+        await outbox.create_index("dispatched_at", expireAfterSeconds=OUTBOX_RETENTION_DAYS * 86400)
+        await outbox.create_index([("dispatched_at", 1), ("available_at", 1)])
+        await outbox.create_index("created_at")
+
+        self._cursor = datetime.utcnow()
+        self.durable = durable
+        self.running = True
+        self.supervisor.spawn("event_bus", self._run, stall_after=max(self.poll_interval * 10, OUTBOX_CLAIM_TTL))
+        logger.info(f"📣 Started event bus with {len(self.subscribers)} subscribers")
+
+    async def stop(self):
+        self.running = False
+        await self.supervisor.cancel("event_bus")
+        logger.info("🛑 Stopped event bus")
+
+    async def publish(self, *events: Event):
+        """Record events that go with no state change; those that do pass events= to the state machine"""
+        await self.store.db.outbox.insert_many([event.document() for event in events])
+        self.committed(events)
+
+    def committed(self, events: Iterable[Event]):
+        """Events just committed to the outbox by this process: dispatch them now"""
+        if self.running:
+            self._local.extend(events)
+            self._wakeup.set()
+
+    async def backlog(self) -> int:
+        """Events not yet delivered to every durable subscriber"""
+        return await self.store.db.outbox.count_documents({"dispatched_at": None})
+
+    def stats(self) -> Dict:
+        return {
+            "running": self.running,
+            "dead_lettered": self.dead_lettered,
+            "subscribers": {
+                name: {"broadcast": subscriber.broadcast, "delivered": subscriber.delivered, "failed": subscriber.failed}
+                for name, subscriber in sorted(self.subscribers.items())
+            }
+        }
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            with self.supervisor.iteration("event_bus"):
+                try:
+                    await self._broadcast()
+                    if self.durable:
+                        await self._dispatch_due()
+                except Exception as e:
+                    logger.error(f"Event dispatch failed: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _deliver(self, subscriber: Subscriber, event: Event) -> bool:
+        try:
+            await subscriber.handler(event)
+            subscriber.delivered += 1
+            return True
+        except Exception as e:
+            subscriber.failed += 1
+            logger.error(f"Subscriber {subscriber.name} failed on {event.type} {event.id}: {e}")
+            return False
+
+    # Broadcast subscribers: every dispatching replica, every event
+
+    async def _broadcast(self):
+        subscribers = [subscriber for subscriber in self.subscribers.values() if subscriber.broadcast]
+        if not subscribers:
+            self._local.clear()
+            return
+
+        # Our own events first, without waiting for the read
+        events, self._local = self._local, []
+        documents = await self.store.db.outbox.find(
+            {"created_at": {"$gt": self._cursor - BROADCAST_WINDOW}}
+        ).sort("created_at", 1).to_list(None)
+        events += [event for event in map(Event.from_document, documents) if event]
+
+        for event in events:
+            if event.id in self._seen:
+                continue
+            self._seen[event.id] = None
+            if len(self._seen) > BROADCAST_SEEN_SIZE:
+                self._seen.popitem(last=False)
+            self._cursor = max(self._cursor, event.created_at)
+
+            for subscriber in subscribers:
+                if subscriber.wants(event):
+                    await self._deliver(subscriber, event)
+
+    # Durable subscribers: one claiming replica per event, retried until every one succeeds
+
+    async def _dispatch_due(self):
+        for _ in range(OUTBOX_BATCH):
+            now = datetime.utcnow()
+            document = await self.store.db.outbox.find_one_and_update(
+                {"dispatched_at": None, "available_at": {"$lte": now}},
+                {"$set": {"available_at": now + timedelta(seconds=OUTBOX_CLAIM_TTL), "claimed_by": self.replica_id},
+                 "$inc": {"attempts": 1}},
+                sort=[("available_at", 1)],
+                return_document=ReturnDocument.AFTER
+            )
+            if document is None:
+                return
+            await self._dispatch(document)
+
+    async def _dispatch(self, document: Dict):
+        event = Event.from_document(document)
+        if event is None:
+            # Written by a newer release; a replica that knows the type will deliver it
+            await self._settle(document, [], ["unknown event type"])
+            return
+
+        delivered, failed = [], []
+        for subscriber in self.subscribers.values():
+            if subscriber.broadcast or not subscriber.wants(event) or subscriber.name in document["delivered"]:
+                continue
+            (delivered if await self._deliver(subscriber, event) else failed).append(subscriber.name)
+
+        await self._settle(document, delivered, failed)
+
+    async def _settle(self, document: Dict, delivered: List[str], failed: List[str]):
+        """Record who got the event; retry the rest later, or give up on them"""
+        now = datetime.utcnow()
+        update = {"$addToSet": {"delivered": {"$each": delivered}}}
+
+        if not failed:
+            update["$set"] = {"dispatched_at": now}
+        elif document["attempts"] >= OUTBOX_MAX_ATTEMPTS:
+            update["$set"] = {"dispatched_at": now, "failed": failed}
+            self.dead_lettered += 1
+            logger.error(f"❌ Gave up on {document['type']} {document['_id']} for {', '.join(failed)}")
+        else:
+            delay = min(self.retry_delay * 2 ** (document["attempts"] - 1), OUTBOX_MAX_RETRY_DELAY)
+            update["$set"] = {"available_at": now + timedelta(seconds=delay)}
+
+        await self.store.db.outbox.update_one({"_id": document["_id"]}, update)
+
+# Metrics subscriber
+
+class EventMetrics:
+    """Lifecycle event counts and commit-to-handling lag seen by this replica"""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.funded_volume: Counter = Counter()  # network -> amount
+        self.last_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+
+    async def record(self, event: Event):
+        lag = (datetime.utcnow() - event.created_at).total_seconds()
+        self.counts[event.type] += 1
+        self.last_lag_seconds = lag
+        self.max_lag_seconds = max(self.max_lag_seconds, lag)
+        if isinstance(event, DealFunded):
+            self.funded_volume[event.network] += event.amount
+
+    def snapshot(self) -> Dict:
+        return {
+            "counts": dict(self.counts),
+            "funded_volume": dict(self.funded_volume),
+            "last_lag_ms": round(self.last_lag_seconds * 1000, 2),
+            "max_lag_ms": round(self.max_lag_seconds * 1000, 2)
+        }
+
+# Global event bus and metrics
+event_bus = EventBus()
+event_metrics = EventMetrics()
+event_bus.subscribe("metrics", event_metrics.record, broadcast=True)
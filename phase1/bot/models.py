@@ -3,12 +3,19 @@ MongoDB Models for Rahu Escrow Bot Phase 1
 Luxury data structures for the premium escrow ecosystem
 """
 
+import re
+import time
+import heapq
 import uuid
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple, Any
 from enum import Enum
 from pydantic import BaseModel, Field
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ReturnDocument, ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError
+from bson import ObjectId
+from bson.errors import InvalidId
 import os
 from dotenv import load_dotenv
 
@@ -19,6 +26,73 @@ load_dotenv()
 MONGO_URL = os.getenv('MONGO_URL', 'mongodb://localhost:27017')
 DB_NAME = os.getenv('DB_NAME', 'rahu_escrow')
 
+# Audit logs are browsed newest first; _id breaks timestamp ties
+AUDIT_LOG_SORT = [("timestamp", DESCENDING), ("_id", DESCENDING)]
+
+# Audit logs live in monthly collections (audit_logs_YYYY_MM); the unpartitioned
+# legacy collection is read until the retention job has migrated it
+AUDIT_PARTITION_PATTERN = re.compile(r"^audit_logs_(\d{4})_(\d{2})$")
+LEGACY_AUDIT_COLLECTION = "audit_logs"
+AUDIT_PARTITION_CACHE_TTL = 60  # seconds
+
+def audit_partition_name(timestamp: datetime) -> str:
+    """Monthly collection holding entries logged at timestamp"""
+    return f"audit_logs_{timestamp:%Y_%m}"
+
+def audit_partition_month(name: str) -> Optional[datetime]:
+    """First instant of a partition's month, None for other collections"""
+    match = AUDIT_PARTITION_PATTERN.match(name)
+    return datetime(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+def next_month(month: datetime) -> datetime:
+    return datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+def encode_log_cursor(log: Dict) -> str:
+    """Opaque keyset cursor pointing just past a log entry"""
+    return f"{log['timestamp'].isoformat()}|{log['_id']}"
+
+def decode_log_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Parse a cursor from encode_log_cursor (raises ValueError if malformed)"""
+    timestamp, _, object_id = cursor.partition("|")
+    try:
+        return datetime.fromisoformat(timestamp), ObjectId(object_id)
+    except InvalidId as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+
+def build_audit_log_query(action: Optional[str] = None, action_prefix: Optional[str] = None,
+                          user_id: Optional[int] = None, deal_id: Optional[str] = None,
+                          group_id: Optional[str] = None, start: Optional[datetime] = None,
+                          end: Optional[datetime] = None, cursor: Optional[str] = None) -> Dict:
+    """Exact-match filters, time range and keyset position for an audit log page"""
+    query = {}
+    if action:
+        query["action"] = action
+    elif action_prefix:
+        # Anchored and case-sensitive so it scans a range of the action index
+        query["action"] = {"$regex": f"^{re.escape(action_prefix)}"}
+    if user_id is not None:
+        query["user_id"] = user_id
+    if deal_id:
+        query["deal_id"] = deal_id
+    if group_id:
+        query["group_id"] = group_id
+    
+    if start or end:
+        query["timestamp"] = {}
+        if start:
+            query["timestamp"]["$gte"] = start
+        if end:
+            query["timestamp"]["$lt"] = end
+    
+    if cursor:
+        timestamp, object_id = decode_log_cursor(cursor)
+        query = {"$and": [query, {"$or": [
+            {"timestamp": {"$lt": timestamp}},
+            {"timestamp": timestamp, "_id": {"$lt": object_id}}
+        ]}]}
+    
+    return query
+
 class NetworkType(str, Enum):
     """Supported cryptocurrency networks"""
     BTC = "BTC"
@@ -41,6 +115,7 @@ class DealStatus(str, Enum):
     PENDING = "Pending"
     ADDRESSES_SET = "Addresses Set"
     ESCROW_GENERATED = "Escrow Generated" 
+    FUNDING_SEEN = "Funding Seen"  # Deposit detected, awaiting confirmations
     FUNDED = "Funded"
     COMPLETED = "Completed"
     DISPUTED = "Disputed"
@@ -61,7 +136,11 @@ class User(BaseModel):
     can_freeze: bool = True  # Default permission for moderators
     can_broadcast: bool = False  # Restricted permission
     can_edit_fees: bool = False  # Restricted permission
+    # Set when Telegram refuses delivery (bot blocked / account deactivated)
+    is_blocked: bool = False
+    blocked_reason: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)  # Delta export watermark
     last_active: datetime = Field(default_factory=datetime.utcnow)
     deals_count: int = 0
     total_volume: float = 0.0
@@ -77,6 +156,7 @@ class Group(BaseModel):
     status: GroupStatus = GroupStatus.AVAILABLE
     current_deal_id: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)  # Delta export watermark
     occupied_at: Optional[datetime] = None
     expires_at: Optional[datetime] = None
     cooldown_until: Optional[datetime] = None
@@ -103,15 +183,46 @@ class Deal(BaseModel):
     fee_amount: Optional[float] = None
     status: DealStatus = DealStatus.PENDING
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)  # Delta export watermark
+    funding_seen_at: Optional[datetime] = None
     funded_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     transaction_hash: Optional[str] = None
+    confirmations: int = 0
     is_frozen: bool = False
     dispute_reason: Optional[str] = None
     
     class Config:
         use_enum_values = True
 
+class BroadcastStatus(str, Enum):
+    """Broadcast job lifecycle states"""
+    QUEUED = "Queued"
+    RUNNING = "Running"
+    COMPLETED = "Completed"
+    CANCELLED = "Cancelled"
+    FAILED = "Failed"
+
+class Broadcast(BaseModel):
+    """Premium broadcast job with resumable progress"""
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    message: str
+    created_by: int  # Telegram user ID, 0 for God Mode
+    status: BroadcastStatus = BroadcastStatus.QUEUED
+    dry_run: bool = False
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    # Checkpoint: every recipient with user_id <= last_user_id has been handled
+    last_user_id: int = 0
+    sent_count: int = 0
+    failed_count: int = 0
+    blocked_count: int = 0
+    error: Optional[str] = None
+    
+    class Config:
+        use_enum_values = True
+
 class AuditLog(BaseModel):
     """Comprehensive audit logging for all actions"""  
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -130,12 +241,54 @@ class AuditLog(BaseModel):
     class Config:
         use_enum_values = True
 
+class ReadRecord:
+    """Projection of a stored document, built without model validation
+    
+    For hot lookups: only the fields in __slots__ are fetched, and missing ones
+    take the model default from DEFAULTS. Writes still go through the models.
+    """
+    __slots__ = ()
+    DEFAULTS: Dict[str, Any] = {}
+    
+    def __init__(self, document: Dict):
+        defaults = self.DEFAULTS
+        for field in self.__slots__:
+            value = document.get(field)
+            setattr(self, field, defaults.get(field) if value is None else value)
+    
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{field}={getattr(self, field)!r}" for field in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+    
+    @classmethod
+    def projection(cls) -> Dict:
+        return {"_id": 0, **{field: 1 for field in cls.__slots__}}
+
+class UserAccess(ReadRecord):
+    """Permission flags checked on every command"""
+    __slots__ = ("user_id", "is_banned", "is_moderator", "is_admin", "can_broadcast")
+    DEFAULTS = {"is_banned": False, "is_moderator": False, "is_admin": False, "can_broadcast": False}
+
+class DealSummary(ReadRecord):
+    """Deal fields needed by monitoring and notifications; never the escrow key"""
+    __slots__ = ("id", "escrow_id", "group_id", "status", "network", "escrow_address",
+                 "amount", "amount_usd", "buyer_user_id", "seller_user_id", "is_frozen")
+    DEFAULTS = {"status": DealStatus.PENDING.value, "is_frozen": False}
+
+class GroupSummary(ReadRecord):
+    """Group fields needed to route messages and follow the current deal"""
+    __slots__ = ("id", "group_number", "status", "current_deal_id", "telegram_chat_id")
+    DEFAULTS = {"status": GroupStatus.AVAILABLE.value}
+
 class DatabaseManager:
     """Luxury database manager for premium operations"""
     
     def __init__(self):
         self.client: Optional[AsyncIOMotorClient] = None
         self.db: Optional[AsyncIOMotorDatabase] = None
+        self._indexed_partitions: set = set()
+        self._partition_names: List[str] = []
+        self._partitions_listed_at = 0.0
     
     async def connect(self):
         """Establish premium database connection"""
@@ -159,24 +312,35 @@ class DatabaseManager:
         await self.db.users.create_index("user_id", unique=True)
         await self.db.users.create_index("username")
         await self.db.users.create_index([("is_banned", 1), ("is_moderator", 1)])
+        await self.db.users.create_index("updated_at")
+        await self.db.users.create_index("is_moderator")
         
         # Group indexes  
+        await self.db.groups.create_index("id", unique=True)
         await self.db.groups.create_index("group_number", unique=True)
         await self.db.groups.create_index("status")
         await self.db.groups.create_index("expires_at")
+        await self.db.groups.create_index("updated_at")
+        await self.db.groups.create_index("telegram_chat_id", sparse=True)
         
         # Deal indexes
+        await self.db.deals.create_index("id", unique=True)
         await self.db.deals.create_index("escrow_id", unique=True)
-        await self.db.deals.create_index("group_id")
+        await self.db.deals.create_index([("group_id", 1), ("created_at", 1)])
         await self.db.deals.create_index([("buyer_user_id", 1), ("seller_user_id", 1)])
         await self.db.deals.create_index("status")
         await self.db.deals.create_index("network")
+        await self.db.deals.create_index("updated_at")
+        
+        # Audit log indexes (per monthly partition, created as months roll over)
+        await self.audit_partition(datetime.utcnow())
         
-        # Audit log indexes
-        await self.db.audit_logs.create_index("user_id")
-        await self.db.audit_logs.create_index("timestamp") 
-        await self.db.audit_logs.create_index("action")
-        await self.db.audit_logs.create_index("log_id", unique=True)
+        # God Mode permission override indexes
+        await self.db.moderator_permissions.create_index("user_id", unique=True)
+        
+        # Broadcast indexes
+        await self.db.broadcasts.create_index("id", unique=True)
+        await self.db.broadcasts.create_index([("status", 1), ("created_at", 1)])
     
     # User operations
     async def create_user(self, user: User) -> User:
@@ -189,11 +353,16 @@ class DatabaseManager:
         user_data = await self.db.users.find_one({"user_id": user_id})
         return User(**user_data) if user_data else None
     
+    async def get_user_access(self, user_id: int) -> Optional[UserAccess]:
+        """Permission flags only, for per-command checks"""
+        user_data = await self.db.users.find_one({"user_id": user_id}, UserAccess.projection())
+        return UserAccess(user_data) if user_data else None
+    
     async def update_user(self, user_id: int, updates: Dict) -> bool:
         """Update user information"""
         result = await self.db.users.update_one(
             {"user_id": user_id}, 
-            {"$set": updates}
+            {"$set": {**updates, "updated_at": datetime.utcnow()}}
         )
         return result.modified_count > 0
     
@@ -219,6 +388,17 @@ class DatabaseManager:
         users = await self.db.users.find({}).to_list(None)
         return [User(**user) for user in users]
     
+    async def get_moderator_permissions(self, user_id: int) -> Optional[Dict]:
+        """Get God Mode permission overrides for a moderator"""
+        return await self.db.moderator_permissions.find_one({"user_id": user_id})
+    
+    async def mark_user_unreachable(self, user_id: int, reason: str) -> bool:
+        """Record that Telegram refuses delivery to this user"""
+        return await self.update_user(user_id, {
+            "is_blocked": True,
+            "blocked_reason": reason
+        })
+    
     # Group operations
     async def create_groups(self, count: int = 50) -> List[Group]:
         """Create premium escrow groups"""
@@ -242,7 +422,7 @@ class DatabaseManager:
     async def update_group_status(self, group_id: str, status: GroupStatus, **kwargs) -> bool:
         """Update group status with luxury precision"""
         status_value = status.value if hasattr(status, 'value') else status
-        updates = {"status": status_value}
+        updates = {"status": status_value, "updated_at": datetime.utcnow()}
         updates.update(kwargs)
         
         result = await self.db.groups.update_one(
@@ -256,6 +436,26 @@ class DatabaseManager:
         group_data = await self.db.groups.find_one({"id": group_id})
         return Group(**group_data) if group_data else None
     
+    async def get_group_summary(self, group_id: str) -> Optional[GroupSummary]:
+        """Routing fields of a group, without model validation"""
+        group_data = await self.db.groups.find_one({"id": group_id}, GroupSummary.projection())
+        return GroupSummary(group_data) if group_data else None
+    
+    async def get_group_summary_by_number(self, group_number: int) -> Optional[GroupSummary]:
+        """Routing fields of a group, by its number"""
+        group_data = await self.db.groups.find_one({"group_number": group_number}, GroupSummary.projection())
+        return GroupSummary(group_data) if group_data else None
+    
+    async def get_group_summary_by_chat(self, chat_id: int) -> Optional[GroupSummary]:
+        """Group bound to a Telegram chat"""
+        group_data = await self.db.groups.find_one({"telegram_chat_id": chat_id}, GroupSummary.projection())
+        return GroupSummary(group_data) if group_data else None
+    
+    async def get_bound_groups(self) -> List[GroupSummary]:
+        """Routing fields of every group attached to a Telegram chat"""
+        groups = await self.db.groups.find({"telegram_chat_id": {"$ne": None}}, GroupSummary.projection()).to_list(None)
+        return [GroupSummary(group) for group in groups]
+    
     async def get_expired_groups(self) -> List[Group]:
         """Get groups ready for cooldown reset"""
         now = datetime.utcnow()
@@ -274,7 +474,8 @@ class DatabaseManager:
             "expires_at": None,
             "cooldown_until": None,
             "creator_user_id": None,
-            "participant_ids": []
+            "participant_ids": [],
+            "updated_at": datetime.utcnow()
         }
         
         result = await self.db.groups.update_one(
@@ -309,44 +510,222 @@ class DatabaseManager:
         deal_data = await self.db.deals.find_one({"id": deal_id})
         return Deal(**deal_data) if deal_data else None
     
+    async def get_deal_summary(self, deal_id: str) -> Optional[DealSummary]:
+        """Display and routing fields of a deal, without model validation"""
+        deal_data = await self.db.deals.find_one({"id": deal_id}, DealSummary.projection())
+        return DealSummary(deal_data) if deal_data else None
+    
     async def update_deal(self, deal_id: str, updates: Dict) -> bool:
         """Update deal with luxury precision"""
         result = await self.db.deals.update_one(
             {"id": deal_id},
-            {"$set": updates}
+            {"$set": {**updates, "updated_at": datetime.utcnow()}}
         )
         return result.modified_count > 0
     
     async def freeze_deal(self, deal_id: str) -> bool:
-        """Freeze premium deal"""
-        return await self.update_deal(deal_id, {"is_frozen": True})
+        """Freeze premium deal, publishing DealFrozen with the change"""
+        from events import DealFrozen
+        from transitions import state_machine
+        return await state_machine.set_frozen(deal_id, True, events=[DealFrozen(deal_id=deal_id)]) is not None
     
     async def unfreeze_deal(self, deal_id: str) -> bool:
-        """Unfreeze premium deal"""
-        return await self.update_deal(deal_id, {"is_frozen": False})
+        """Unfreeze premium deal, publishing DealUnfrozen with the change"""
+        from events import DealUnfrozen
+        from transitions import state_machine
+        return await state_machine.set_frozen(deal_id, False, events=[DealUnfrozen(deal_id=deal_id)]) is not None
     
     async def get_active_deals(self) -> List[Deal]:
         """Get all active premium deals"""
         deals = await self.db.deals.find({
             "status": {"$in": [DealStatus.PENDING, DealStatus.ADDRESSES_SET, 
-                              DealStatus.ESCROW_GENERATED, DealStatus.FUNDED]}
+                              DealStatus.ESCROW_GENERATED, DealStatus.FUNDING_SEEN,
+                              DealStatus.FUNDED]}
         }).to_list(None)
         return [Deal(**deal) for deal in deals]
     
+    async def get_deals_by_status(self, status: DealStatus) -> List[Deal]:
+        """Get all deals in a given status"""
+        deals = await self.db.deals.find({"status": status}).to_list(None)
+        return [Deal(**deal) for deal in deals]
+    
+    # Broadcast operations
+    async def create_broadcast(self, broadcast: Broadcast) -> Broadcast:
+        """Queue premium broadcast job"""
+        await self.db.broadcasts.insert_one(broadcast.dict())
+        return broadcast
+    
+    async def get_broadcast(self, broadcast_id: str) -> Optional[Broadcast]:
+        """Retrieve broadcast job by ID"""
+        broadcast_data = await self.db.broadcasts.find_one({"id": broadcast_id})
+        return Broadcast(**broadcast_data) if broadcast_data else None
+    
+    async def claim_next_broadcast(self) -> Optional[Broadcast]:
+        """Atomically claim the oldest queued broadcast"""
+        broadcast_data = await self.db.broadcasts.find_one_and_update(
+            {"status": BroadcastStatus.QUEUED},
+            {"$set": {"status": BroadcastStatus.RUNNING, "started_at": datetime.utcnow()}},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+        return Broadcast(**broadcast_data) if broadcast_data else None
+    
+    async def requeue_running_broadcasts(self) -> int:
+        """Requeue broadcasts interrupted by a restart so they resume from checkpoint"""
+        result = await self.db.broadcasts.update_many(
+            {"status": BroadcastStatus.RUNNING},
+            {"$set": {"status": BroadcastStatus.QUEUED}}
+        )
+        return result.modified_count
+    
+    async def checkpoint_broadcast(self, broadcast_id: str, last_user_id: int, sent: int, failed: int, blocked: int) -> bool:
+        """Persist broadcast progress after a completed batch"""
+        result = await self.db.broadcasts.update_one(
+            {"id": broadcast_id},
+            {
+                "$set": {"last_user_id": last_user_id},
+                "$inc": {"sent_count": sent, "failed_count": failed, "blocked_count": blocked}
+            }
+        )
+        return result.modified_count > 0
+    
+    async def finish_broadcast(self, broadcast_id: str, status: BroadcastStatus, error: Optional[str] = None) -> bool:
+        """Mark broadcast job as finished"""
+        result = await self.db.broadcasts.update_one(
+            {"id": broadcast_id},
+            {"$set": {"status": status, "completed_at": datetime.utcnow(), "error": error}}
+        )
+        return result.modified_count > 0
+    
+    async def iter_broadcast_recipients(self, after_user_id: int = 0, batch_size: int = 500):
+        """Stream reachable recipient IDs in user_id order, one batch at a time"""
+        query = {
+            "user_id": {"$gt": after_user_id},
+            "is_banned": {"$ne": True},
+            "is_blocked": {"$ne": True}
+        }
+        cursor = self.db.users.find(
+            query, {"_id": 0, "user_id": 1}
+        ).sort("user_id", 1).batch_size(batch_size)
+        
+        batch = []
+        async for doc in cursor:
+            batch.append(doc["user_id"])
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    # Block scan cursors
+    async def get_block_cursor(self, network: str) -> Optional[int]:
+        """Last block height scanned on a chain, by any replica"""
+        cursor = await self.db.block_cursors.find_one({"_id": network})
+        return cursor["height"] if cursor else None
+    
+    async def save_block_cursor(self, network: str, height: int):
+        """Record a scanned block; the cursor never moves back"""
+        await self.db.block_cursors.update_one(
+            {"_id": network},
+            {"$max": {"height": height}, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+    
+    # Audit log partitions
+    async def create_audit_indexes(self, collection):
+        """Indexes fitted to the audit queries: each filter field, then the keyset sort"""
+        await collection.create_index(AUDIT_LOG_SORT)
+        await collection.create_index([("action", ASCENDING)] + AUDIT_LOG_SORT)
+        await collection.create_index([("user_id", ASCENDING)] + AUDIT_LOG_SORT)
+        # Most entries carry no deal or group, so keep those indexes partial;
+        # equality on an id string satisfies the $gt filter, nulls fall outside it
+        for field in ["deal_id", "group_id"]:
+            await collection.create_index(
+                [(field, ASCENDING)] + AUDIT_LOG_SORT,
+                partialFilterExpression={field: {"$gt": ""}}
+            )
+        await collection.create_index("log_id", unique=True)
+    
+    async def audit_partition(self, timestamp: datetime):
+        """Monthly audit collection for timestamp, indexed on first use"""
+        name = audit_partition_name(timestamp)
+        if name not in self._indexed_partitions:
+            await self.create_audit_indexes(self.db[name])
+            self._indexed_partitions.add(name)
+            self._partitions_listed_at = 0.0
+        return self.db[name]
+    
+    async def list_audit_partitions(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[str]:
+        """Partitions overlapping [start, end), newest first"""
+        if time.monotonic() - self._partitions_listed_at > AUDIT_PARTITION_CACHE_TTL:
+            names = await self.db.list_collection_names(filter={"name": {"$regex": "^audit_logs_"}})
+            self._partition_names = sorted((name for name in names if audit_partition_month(name)), reverse=True)
+            self._partitions_listed_at = time.monotonic()
+        
+        return [
+            name for name in self._partition_names
+            if (end is None or audit_partition_month(name) < end)
+            and (start is None or next_month(audit_partition_month(name)) > start)
+        ]
+    
+    async def has_legacy_audit_logs(self) -> bool:
+        """Whether the pre-partitioning collection still holds entries"""
+        return await self.db[LEGACY_AUDIT_COLLECTION].find_one({}, {"_id": 1}) is not None
+    
     # Audit log operations
     async def log_action(self, log: AuditLog) -> AuditLog:
         """Log premium action for audit trail"""
-        await self.db.audit_logs.insert_one(log.dict())
+        collection = await self.audit_partition(log.timestamp)
+        await collection.insert_one(log.dict())
         return log
     
-    async def get_audit_logs(self, limit: int = 100, user_id: Optional[int] = None) -> List[AuditLog]:
+    async def log_actions(self, logs: List[AuditLog]) -> List[AuditLog]:
+        """Log a batch of actions, one round trip per month; returns entries to retry"""
+        by_partition: Dict[str, List[AuditLog]] = {}
+        for log in logs:
+            by_partition.setdefault(audit_partition_name(log.timestamp), []).append(log)
+        
+        failed = []
+        for batch in by_partition.values():
+            collection = await self.audit_partition(batch[0].timestamp)
+            try:
+                await collection.insert_many([log.dict() for log in batch], ordered=False)
+            except BulkWriteError as e:
+                # Duplicate log_ids were already written by an earlier partial attempt
+                failed.extend(batch[error["index"]] for error in e.details.get("writeErrors", []) if error.get("code") != 11000)
+        return failed
+    
+    async def get_audit_logs(self, limit: int = 100, user_id: Optional[int] = None, **filters) -> List[AuditLog]:
         """Retrieve premium audit logs"""
-        query = {}
-        if user_id:
-            query["user_id"] = user_id
-            
-        logs = await self.db.audit_logs.find(query).sort("timestamp", -1).limit(limit).to_list(None)
-        return [AuditLog(**log) for log in logs]
+        logs, _ = await self.get_audit_log_page(limit, user_id=user_id, **filters)
+        return logs
+    
+    async def get_audit_log_page(self, limit: int = 100, cursor: Optional[str] = None,
+                                 **filters) -> Tuple[List[AuditLog], Optional[str]]:
+        """One page of audit logs, newest first, plus the cursor for the next page"""
+        query = build_audit_log_query(cursor=cursor, **filters)
+        
+        # Skip months entirely after the cursor or outside the requested range
+        upper = filters.get("end")
+        if cursor:
+            cursor_time = decode_log_cursor(cursor)[0]
+            upper = min(upper, cursor_time + timedelta(microseconds=1)) if upper else cursor_time + timedelta(microseconds=1)
+        
+        # Months are disjoint, so newest-first partitions fill the page in order;
+        # fetch one extra entry to learn whether another page exists
+        logs = []
+        for name in await self.list_audit_partitions(filters.get("start"), upper):
+            logs += await self.db[name].find(query).sort(AUDIT_LOG_SORT).limit(limit + 1 - len(logs)).to_list(None)
+            if len(logs) > limit:
+                break
+        
+        if await self.has_legacy_audit_logs():
+            legacy = await self.db[LEGACY_AUDIT_COLLECTION].find(query).sort(AUDIT_LOG_SORT).limit(limit + 1).to_list(None)
+            logs = list(heapq.merge(logs, legacy, key=lambda log: (log["timestamp"], log["_id"]), reverse=True))[:limit + 1]
+        
+        next_cursor = encode_log_cursor(logs[limit - 1]) if len(logs) > limit else None
+        
+        return [AuditLog(**log) for log in logs[:limit]], next_cursor
 
 # Global database manager instance
 db_manager = DatabaseManager()
\ No newline at end of file
@@ -4,24 +4,47 @@ Production-grade transaction monitoring and webhook handling
 """
 
 import asyncio
+import itertools
 import logging
+import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Callable
 from decimal import Decimal
 import json
 
+import aiohttp
+
 from models import NetworkType, Deal, DealStatus, db_manager
-from blockchain import real_wallet_manager, BlockchainAPI
-from state import AuditLogger
+from blockchain import real_wallet_manager, BlockchainAPI, BLOCK_TIMES, get_tx_hash, pays_address
+from blocks import build_block_sources, normalize_address
+from confirmations import confirmation_tracker
+from events import CheckRequested, EscrowGenerated, EventBus, event_bus
+from supervisor import supervisor
+from cluster import ReplicaCoordinator, coordinator as default_coordinator
 
 logger = logging.getLogger(__name__)
 
+# "poll" checks every address each cycle; "blocks" follows new blocks per chain
+MONITOR_MODE = os.getenv("MONITOR_MODE", "poll")
+MAX_BLOCKS_PER_TICK = 20
+
+# Queued check priorities (lower runs first)
+CHECK_PRIORITY_CONFIRMED = 0  # provider reports the tx as mined
+CHECK_PRIORITY_PENDING = 1  # mempool sighting or unknown state
+
 class RealTimeMonitor:
     """Real-time blockchain monitoring service"""
     
-    def __init__(self):
+    def __init__(self, coordinator: ReplicaCoordinator = default_coordinator):
+        self.coordinator = coordinator
         self.monitored_addresses: Dict[str, Dict] = {}
         self.monitoring_tasks: Dict[str, asyncio.Task] = {}
+        # network -> normalized address -> monitored_addresses key
+        self.address_index: Dict[NetworkType, Dict[str, str]] = {network: {} for network in NetworkType}
+        # Out-of-cycle checks (webhooks) drained by one worker with one API session
+        self.check_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self.queued_keys: Dict[str, int] = {}  # key -> best queued priority
+        self._check_sequence = itertools.count()
         self.api = BlockchainAPI()
         self.running = False
     
@@ -33,11 +56,14 @@ class RealTimeMonitor:
         self.running = True
         logger.info("🚀 Starting Real-time Blockchain Monitor")
         
-        # Start background monitoring task
-        asyncio.create_task(self._monitor_loop())
+        # Start supervised monitoring tasks (restarted with backoff if they crash)
+        supervisor.spawn("monitor_loop", self._monitor_loop, stall_after=300)
+        supervisor.spawn("check_worker", self._check_worker)
         
-        # Load existing deals that need monitoring
+        # Load existing deals that need monitoring; replicas joining or leaving
+        # move address ownership, so reload to pick up deals created elsewhere
         await self._load_existing_deals()
+        self.coordinator.on_rebalance(self._load_existing_deals)
     
     async def stop(self):
         """Stop the monitoring service"""
@@ -48,6 +74,9 @@ class RealTimeMonitor:
             task.cancel()
         
         self.monitoring_tasks.clear()
+        
+        await supervisor.cancel("monitor_loop")
+        await supervisor.cancel("check_worker")
         logger.info("🛑 Stopped Real-time Blockchain Monitor")
     
     async def add_address(self, network: NetworkType, address: str, deal_id: str, callback: Callable = None):
@@ -64,6 +93,7 @@ class RealTimeMonitor:
             "balance": Decimal("0"),
             "transactions": []
         }
+        self.address_index[network][normalize_address(network, address)] = key
         
         logger.info(f"📍 Added {network.value} address to monitoring: {address}")
     
@@ -73,6 +103,7 @@ class RealTimeMonitor:
         
         if key in self.monitored_addresses:
             del self.monitored_addresses[key]
+            self.address_index[network].pop(normalize_address(network, address), None)
             
             if key in self.monitoring_tasks:
                 self.monitoring_tasks[key].cancel()
@@ -80,6 +111,60 @@ class RealTimeMonitor:
             
             logger.info(f"📍 Removed {network.value} address from monitoring: {address}")
     
+    async def on_escrow_generated(self, event: EscrowGenerated):
+        """Watch an escrow created at runtime; every replica indexes it, its owner checks it"""
+        network = NetworkType(event.network)
+        if self.find_address(network, event.escrow_address) is None:
+            await self.add_address(network, event.escrow_address, event.deal_id, self._funding_detected_callback)
+    
+    async def on_check_requested(self, event: CheckRequested):
+        """Run a check another replica's webhook receiver handed to the address owner"""
+        key = self.find_address(NetworkType(event.network), event.address)
+        if key and self.coordinator.owns(key):
+            self.schedule_check(key, event.priority)
+    
+    def find_address(self, network: NetworkType, address: str) -> Optional[str]:
+        """O(1) lookup of a monitored address key"""
+        try:
+            return self.address_index[network].get(normalize_address(network, address))
+        except ValueError:
+            return None  # Malformed address (e.g. bad base58 checksum)
+    
+    def schedule_check(self, key: str, priority: int = CHECK_PRIORITY_PENDING) -> bool:
+        """Queue an immediate check for a monitored address"""
+        if key not in self.monitored_addresses:
+            return False
+        
+        # Already queued at the same or a better priority
+        if self.queued_keys.get(key, priority + 1) <= priority:
+            return False
+        
+        self.queued_keys[key] = priority
+        self.check_queue.put_nowait((priority, next(self._check_sequence), key))
+        return True
+    
+    async def _check_worker(self):
+        """Run queued checks over one long-lived API session"""
+        async with BlockchainAPI() as api:
+            while self.running:
+                priority, _, key = await self.check_queue.get()
+                
+                # Skip entries superseded by a higher-priority requeue
+                if self.queued_keys.get(key) != priority:
+                    continue
+                del self.queued_keys[key]
+                
+                # Queued checks were owned when requested; one extra check after a rebalance is harmless
+                monitor_data = self.monitored_addresses.get(key)
+                if not monitor_data:
+                    continue
+                
+                try:
+                    with supervisor.iteration("check_worker"):
+                        await self._check_single_address(api, monitor_data)
+                except Exception as e:
+                    logger.error(f"Failed queued check for {key}: {e}")
+    
     async def _load_existing_deals(self):
         """Load existing unfunded deals for monitoring"""
         try:
@@ -89,7 +174,8 @@ class RealTimeMonitor:
             for deal in active_deals:
                 if (deal.escrow_address and 
                     deal.status in [DealStatus.ESCROW_GENERATED, DealStatus.ADDRESSES_SET] and
-                    deal.network):
+                    deal.network and
+                    self.find_address(NetworkType(deal.network), deal.escrow_address) is None):
                     
                     await self.add_address(
                         NetworkType(deal.network),
@@ -107,7 +193,8 @@ class RealTimeMonitor:
         """Main monitoring loop"""
         while self.running:
             try:
-                await self._check_all_addresses()
+                with supervisor.iteration("monitor_loop"):
+                    await self._check_all_addresses()
                 
                 # Check every 30 seconds
                 await asyncio.sleep(30)
@@ -122,7 +209,11 @@ class RealTimeMonitor:
             return
         
         async with self.api as api:
-            for key, monitor_data in self.monitored_addresses.items():
+            # Snapshot: funding callbacks remove addresses mid-iteration
+            for key, monitor_data in list(self.monitored_addresses.items()):
+                # Each address is polled by exactly one replica
+                if not self.coordinator.owns(key):
+                    continue
                 try:
                     await self._check_single_address(api, monitor_data)
                     
@@ -173,40 +264,24 @@ class RealTimeMonitor:
         try:
             logger.info(f"🚨 REAL FUNDING DETECTED for deal {deal_id}")
             
-            # Get deal details
-            deal = await db_manager.get_deal_by_id(deal_id)
-            if not deal:
-                logger.error(f"Deal {deal_id} not found")
-                return
+            # Hand the deposit to the confirmation tracker; it marks the deal funded
+            network = NetworkType(funding_data["network"])
+            deposit = next((tx for tx in funding_data["transactions"]
+                            if pays_address(network, tx, funding_data["address"])), None)
             
-            # Update deal status
-            updates = {
-                "status": DealStatus.FUNDED.value,
-                "amount": funding_data["amount_received"],
-                "funded_at": datetime.utcnow(),
-                "transaction_hash": funding_data["transactions"][0].get("tx_hash") if funding_data["transactions"] else None
-            }
+            tracked = await confirmation_tracker.track(
+                deal_id,
+                network,
+                funding_data["address"],
+                get_tx_hash(deposit) if deposit else None,
+                funding_data["amount_received"]
+            )
             
-            success = await db_manager.update_deal(deal_id, updates)
+            # Stop polling the address; confirmations are followed by tx hash
+            await self.remove_address(network, funding_data["address"])
             
-            if success:
-                # Log funding
-                await AuditLogger.log_system_action(
-                    action="escrow_funded",
-                    target=funding_data["address"],
-                    details=f"Real funding: {funding_data['amount_received']} {funding_data['network']}"
-                )
-                
-                # TODO: Send notification to Telegram group
-                # This would notify users in the escrow group about funding
-                
-                # Remove from monitoring (deal is now funded)
-                await self.remove_address(
-                    NetworkType(funding_data["network"]),
-                    funding_data["address"]
-                )
-                
-                logger.info(f"✅ Successfully processed funding for deal {deal.escrow_id}")
+            if tracked:
+                logger.info(f"✅ Funding for deal {deal_id} awaiting confirmations")
             
         except Exception as e:
             logger.error(f"Failed to process funding callback: {e}")
@@ -233,86 +308,207 @@ class RealTimeMonitor:
         
         return stats
 
+class BlockScanMonitor(RealTimeMonitor):
+    """Follows new blocks per chain and matches them against an in-memory address set"""
+    
+    def __init__(self, sources: Dict = None, coordinator: ReplicaCoordinator = default_coordinator, store=db_manager):
+        super().__init__(coordinator)
+        self.sources = sources if sources is not None else build_block_sources()
+        self.store = store
+        self.last_heights: Dict[NetworkType, int] = {}
+        self.blocks_scanned = 0
+    
+    async def _monitor_loop(self):
+        """Follow every chain with a block source; poll the rest"""
+        # Catch deposits that landed while we were offline
+        await self._check_all_addresses()
+        
+        async with aiohttp.ClientSession() as session:
+            # One replica follows each chain (it matches every watched address);
+            # chains spread across replicas as their leases are taken
+            followers = [
+                self.coordinator.run_as_leader(
+                    f"follow_blocks:{network.value}",
+                    lambda network=network, source=source: self._follow_chain(session, network, source)
+                )
+                for network, source in self.sources.items()
+            ]
+            await asyncio.gather(self._poll_unsourced_loop(), *followers)
+    
+    async def _follow_chain(self, session: aiohttp.ClientSession, network: NetworkType, source):
+        """Scan each new block of one chain exactly once
+        
+        Runs while this replica holds the chain's lease; the height reached is
+        saved per block, so whoever takes the lease over resumes from it.
+        """
+        interval = max(BLOCK_TIMES[network] / 2, 2)
+        resumed = False
+        
+        while self.running:
+            try:
+                if not resumed:
+                    saved = await self.store.get_block_cursor(network.value)
+                    if saved is not None:
+                        self.last_heights[network] = saved
+                    else:
+                        self.last_heights.pop(network, None)
+                    resumed = True
+                
+                head = await source.get_head(session)
+                last = self.last_heights.get(network, head - 1)
+                
+                # Bound catch-up work per tick after long outages
+                with supervisor.iteration("monitor_loop"):
+                    for height in range(last + 1, min(head, last + MAX_BLOCKS_PER_TICK) + 1):
+                        credits = await source.get_credits(session, height)
+                        for key, credit in self.match_credits(network, credits):
+                            await self._apply_credit(key, credit)
+                        self.last_heights[network] = height
+                        await self.store.save_block_cursor(network.value, height)
+                        self.blocks_scanned += 1
+                
+                if self.last_heights.get(network, head) < head:
+                    continue  # Still catching up
+                
+            except Exception as e:
+                logger.error(f"Error following {network.value} blocks: {e}")
+            
+            await asyncio.sleep(interval)
+    
+    def match_credits(self, network: NetworkType, credits: List[Dict]) -> List[tuple]:
+        """Return (monitor key, credit) for credits paying a watched address"""
+        index = self.address_index[network]
+        if not index:
+            return []
+        return [(index[credit["address"]], credit) for credit in credits if credit["address"] in index]
+    
+    async def _apply_credit(self, key: str, credit: Dict):
+        """Record a matched credit and fire the funding callback"""
+        monitor_data = self.monitored_addresses.get(key)
+        if not monitor_data:
+            return
+        
+        old_balance = monitor_data["balance"]
+        new_balance = old_balance + credit["amount"]
+        monitor_data["balance"] = new_balance
+        monitor_data["last_check"] = datetime.utcnow()
+        monitor_data["transactions"] = [{"tx_hash": credit["tx_hash"], "value": str(credit["amount"])}]
+        
+        logger.info(f"💰 FUNDING DETECTED in block! {monitor_data['network'].value} {monitor_data['address']}: {credit['amount']}")
+        
+        if monitor_data["callback"]:
+            funding_data = {
+                "address": monitor_data["address"],
+                "network": monitor_data["network"].value,
+                "old_balance": float(old_balance),
+                "new_balance": float(new_balance),
+                "amount_received": float(credit["amount"]),
+                "transactions": monitor_data["transactions"],
+                "timestamp": datetime.utcnow().isoformat()
+            }
+            
+            await monitor_data["callback"](monitor_data["deal_id"], funding_data)
+    
+    async def _poll_unsourced_loop(self):
+        """Fall back to address polling for chains without a block source"""
+        while self.running:
+            try:
+                with supervisor.iteration("monitor_loop"):
+                    unsourced = [
+                        monitor_data for key, monitor_data in list(self.monitored_addresses.items())
+                        if monitor_data["network"] not in self.sources and self.coordinator.owns(key)
+                    ]
+                    
+                    if unsourced:
+                        async with self.api as api:
+                            for monitor_data in unsourced:
+                                await self._check_single_address(api, monitor_data)
+                
+            except Exception as e:
+                logger.error(f"Error in fallback polling loop: {e}")
+            
+            await asyncio.sleep(30)
+
 class WebhookHandler:
     """Handle blockchain webhooks for instant notifications"""
     
-    def __init__(self, monitor: RealTimeMonitor):
+    def __init__(self, monitor: RealTimeMonitor, bus: EventBus = event_bus):
         self.monitor = monitor
+        self.bus = bus
+    
+    async def _route(self, networks: List[NetworkType], address: str, priority: int) -> bool:
+        """Check a watched address here when this replica owns it, otherwise hand it to the owner"""
+        matched = False
+        for network in networks:
+            key = self.monitor.find_address(network, address)
+            if not key:
+                continue
+            matched = True
+            if self.monitor.coordinator.owns(key):
+                self.monitor.schedule_check(key, priority)
+            else:
+                await self.bus.publish(CheckRequested(network=network.value, address=address, priority=priority))
+        return matched
     
-    async def handle_bitcoin_webhook(self, webhook_data: Dict):
+    async def handle_bitcoin_webhook(self, webhook_data: Dict, priority: int = CHECK_PRIORITY_PENDING) -> bool:
         """Handle Bitcoin blockchain webhooks"""
         try:
             # Parse Bitcoin webhook
             address = webhook_data.get("address")
-            tx_hash = webhook_data.get("tx_hash")
-            amount = webhook_data.get("amount", 0)
             
-            if address and address in [data["address"] for data in self.monitor.monitored_addresses.values()]:
+            # BTC and LTC share the UTXO webhook path; the address format tells them apart
+            if address and await self._route([NetworkType.BTC, NetworkType.LTC], address, priority):
                 logger.info(f"🔔 Bitcoin webhook received for {address}")
-                
-                # Trigger immediate check
-                for key, monitor_data in self.monitor.monitored_addresses.items():
-                    if monitor_data["address"] == address:
-                        async with self.monitor.api as api:
-                            await self.monitor._check_single_address(api, monitor_data)
-                        break
+                return True
         
         except Exception as e:
             logger.error(f"Failed to handle Bitcoin webhook: {e}")
+        
+        return False
     
-    async def handle_ethereum_webhook(self, webhook_data: Dict):
+    async def handle_ethereum_webhook(self, webhook_data: Dict, priority: int = CHECK_PRIORITY_PENDING) -> bool:
         """Handle Ethereum blockchain webhooks"""
         try:
             # Parse Ethereum webhook
-            to_address = webhook_data.get("to", "").lower()
-            tx_hash = webhook_data.get("hash")
-            value = webhook_data.get("value", "0")
+            to_address = webhook_data.get("to") or ""
             
-            # Check if this is one of our monitored addresses
-            for key, monitor_data in self.monitor.monitored_addresses.items():
-                if (monitor_data["network"] in [NetworkType.ETH, NetworkType.USDT_BEP20] and 
-                    monitor_data["address"].lower() == to_address):
-                    
-                    logger.info(f"🔔 Ethereum webhook received for {to_address}")
-                    
-                    # Trigger immediate check
-                    async with self.monitor.api as api:
-                        await self.monitor._check_single_address(api, monitor_data)
-                    break
+            # ETH and BEP20 share the address format
+            if to_address and await self._route([NetworkType.ETH, NetworkType.USDT_BEP20], to_address, priority):
+                logger.info(f"🔔 Ethereum webhook received for {to_address}")
+                return True
         
         except Exception as e:
             logger.error(f"Failed to handle Ethereum webhook: {e}")
+        
+        return False
     
-    async def handle_tron_webhook(self, webhook_data: Dict):
+    async def handle_tron_webhook(self, webhook_data: Dict, priority: int = CHECK_PRIORITY_PENDING) -> bool:
         """Handle TRON blockchain webhooks"""
         try:
             # Parse TRON webhook
             to_address = webhook_data.get("to_address")
-            tx_id = webhook_data.get("txID")
             
-            # Check if this is one of our monitored addresses
-            for key, monitor_data in self.monitor.monitored_addresses.items():
-                if (monitor_data["network"] == NetworkType.USDT_TRC20 and 
-                    monitor_data["address"] == to_address):
-                    
-                    logger.info(f"🔔 TRON webhook received for {to_address}")
-                    
-                    # Trigger immediate check
-                    async with self.monitor.api as api:
-                        await self.monitor._check_single_address(api, monitor_data)
-                    break
+            if to_address and await self._route([NetworkType.USDT_TRC20], to_address, priority):
+                logger.info(f"🔔 TRON webhook received for {to_address}")
+                return True
         
         except Exception as e:
             logger.error(f"Failed to handle TRON webhook: {e}")
+        
+        return False
 
 # Global monitoring service
-real_monitor = RealTimeMonitor()
+real_monitor = BlockScanMonitor() if MONITOR_MODE == "blocks" else RealTimeMonitor()
 webhook_handler = WebhookHandler(real_monitor)
+event_bus.subscribe("monitor", real_monitor.on_escrow_generated, EscrowGenerated, broadcast=True)
+event_bus.subscribe("monitor_checks", real_monitor.on_check_requested, CheckRequested, broadcast=True)
 
 async def start_monitoring_service():
     """Start the global monitoring service"""
     await real_monitor.start()
+    await confirmation_tracker.start()
 
 async def stop_monitoring_service():
     """Stop the global monitoring service"""
-    await real_monitor.stop()
\ No newline at end of file
+    await real_monitor.stop()
+    await confirmation_tracker.stop()
\ No newline at end of file
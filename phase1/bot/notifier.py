@@ -0,0 +1,91 @@
+"""
+Escrow Group Notifier for Rahu Escrow Bot
+Funding notifications pushed into escrow groups from the event bus
+"""
+
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Optional
+
+from telegram import Bot
+from telegram.constants import ParseMode
+from telegram.error import RetryAfter, TelegramError
+
+from models import NetworkType, db_manager
+from blockchain import CONFIRMATION_THRESHOLDS
+from ui import LuxuryFormatter, KeyboardBuilder
+from events import DealFunded, event_bus
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_MAX_ATTEMPTS = 3
+
+class GroupNotifier:
+    """Delivers funding events to the deal's Telegram group"""
+
+    def __init__(self):
+        self.bot: Optional[Bot] = None
+
+    async def start(self, bot: Bot):
+        """Attach the bot; DealFunded events arriving before this are retried from the outbox"""
+        self.bot = bot
+        logger.info("🔔 Started escrow group notifier")
+
+    async def stop(self):
+        """Stop delivering notifications"""
+        self.bot = None
+        logger.info("🛑 Stopped escrow group notifier")
+
+    async def on_deal_funded(self, event: DealFunded):
+        """Event bus subscriber; raising hands the event back for a later retry"""
+        if self.bot is None:
+            raise RuntimeError("notifier has no bot attached")
+        await self._deliver_funded(event)
+
+    async def _deliver_funded(self, event: DealFunded):
+        """Render and send the funded message to the escrow group"""
+        deal = await db_manager.get_deal_summary(event.deal_id)
+        if not deal:
+            logger.warning(f"Deal {event.deal_id} not found for funding notification")
+            return
+
+        group = await db_manager.get_group_summary(deal.group_id)
+        if not group or not group.telegram_chat_id:
+            logger.warning(f"No Telegram chat linked for deal {deal.escrow_id}")
+            return
+
+        text = LuxuryFormatter.format_funded_message(
+            deal,
+            event.amount,
+            event.tx_hash or "pending",
+            event.confirmations,
+            CONFIRMATION_THRESHOLDS[NetworkType(deal.network)]
+        )
+
+        for attempt in range(NOTIFY_MAX_ATTEMPTS):
+            try:
+                await self.bot.send_message(
+                    chat_id=group.telegram_chat_id,
+                    text=text,
+                    parse_mode=ParseMode.MARKDOWN,
+                    reply_markup=KeyboardBuilder.build_funded_actions()
+                )
+                logger.info(f"🔔 Sent funding notification for {deal.escrow_id}")
+                return
+
+            except RetryAfter as e:
+                delay = e.retry_after
+                if isinstance(delay, timedelta):
+                    delay = delay.total_seconds()
+                await asyncio.sleep(delay)
+
+            except TelegramError as e:
+                logger.warning(f"Funding notification for {deal.escrow_id} failed (attempt {attempt + 1}): {e}")
+                await asyncio.sleep(2 ** attempt)
+
+        raise RuntimeError(f"funding notification for {deal.escrow_id} not delivered")
+
+# Global notifier instance
+group_notifier = GroupNotifier()
+event_bus.subscribe("notifier", group_notifier.on_deal_funded, DealFunded)
@@ -10,21 +10,26 @@ from datetime import datetime, timedelta
 from typing import Dict, Set, Optional
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, BotCommand
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes
-from telegram.constants import ParseMode
-import uuid
-import random
+from telegram.constants import ChatType, ParseMode
 
 # Import Phase 1 components
 from models import (
-    User, Group, Deal, AuditLog,
+    User, Group, AuditLog, Broadcast,
     NetworkType, GroupStatus, DealStatus,
     db_manager
 )
 from state import (
-    NetworkDetector, EscrowWalletGenerator, GroupLifecycleManager,
-    DealManager, AuditLogger, BackgroundTasks
+    NetworkDetector, GroupLifecycleManager,
+    DealManager, AuditLogger, BackgroundTasks, audit_sink, chat_index
 )
 from ui import LuxuryFormatter, KeyboardBuilder, MessageBuilder
+from config import config_cache
+from broadcast import BroadcastEngine
+from notifier import group_notifier
+from events import event_bus
+from qr import qr_renderer
+from supervisor import supervisor
+from cluster import coordinator
 
 # Configure logging
 logging.basicConfig(
@@ -41,6 +46,8 @@ class RahuEscrowBotPhase1:
     
     def __init__(self):
         self.application = None
+        self.broadcast_engine = None
+        self.webhook_task = None
         # Admin user ID (in production, this would come from environment)
         self.admin_id = 111222333
         
@@ -51,10 +58,22 @@ class RahuEscrowBotPhase1:
             await db_manager.connect()
             logger.info("✨ Connected to premium database")
             
+            # Buffer audit writes off the command path
+            await audit_sink.start()
+            
+            # Serve God Mode messages and fees from memory
+            await config_cache.start()
+            
+            # Join the replica cluster before starting leased and sharded jobs
+            await coordinator.start()
+            
             # Initialize groups
             groups = await GroupLifecycleManager.initialize_groups()
             logger.info(f"✨ Initialized {len(groups)} premium escrow groups")
             
+            # Resolve chats to their current deal from memory
+            await chat_index.load()
+            
             # Start background tasks
             await BackgroundTasks.start_background_tasks()
             
@@ -80,9 +99,12 @@ class RahuEscrowBotPhase1:
             
             if user:
                 # Update last active
-                await db_manager.update_user(telegram_user.id, {
-                    "last_active": datetime.utcnow()
-                })
+                updates = {"last_active": datetime.utcnow()}
+                if user.is_blocked:
+                    # Messaging the bot again means Telegram delivers to them once more
+                    updates.update(is_blocked=False, blocked_reason=None)
+                    user.is_blocked, user.blocked_reason = False, None
+                await db_manager.update_user(telegram_user.id, updates)
                 return user
             
             # Create new user
@@ -113,15 +135,34 @@ class RahuEscrowBotPhase1:
     async def check_user_permissions(self, user_id: int) -> tuple[bool, bool, bool]:
         """Check user permissions (is_banned, is_moderator, is_admin)"""
         try:
-            user = await db_manager.get_user_by_telegram_id(user_id)
-            if not user:
+            access = await db_manager.get_user_access(user_id)
+            if not access:
                 return True, False, False  # Banned if not found
             
-            return user.is_banned, user.is_moderator, user.is_admin
+            return access.is_banned, access.is_moderator, access.is_admin
             
         except Exception as e:
             logger.error(f"Failed to check permissions: {e}")
             return True, False, False
+    
+    async def check_broadcast_permission(self, user_id: int, is_moderator: bool, is_admin: bool) -> bool:
+        """Check can_broadcast, preferring God Mode overrides over the user record"""
+        try:
+            if is_admin:
+                return True
+            if not is_moderator:
+                return False
+            
+            overrides = await db_manager.get_moderator_permissions(user_id)
+            if overrides is not None:
+                return overrides.get("can_broadcast", False)
+            
+            access = await db_manager.get_user_access(user_id)
+            return bool(access and access.can_broadcast)
+            
+        except Exception as e:
+            logger.error(f"Failed to check broadcast permission: {e}")
+            return False
             
     # ============ CORE COMMANDS ============
     
@@ -150,7 +191,8 @@ class RahuEscrowBotPhase1:
         await AuditLogger.log_user_action(
             user.user_id, 
             "/start", 
-            details="User accessed welcome screen"
+            details="User accessed welcome screen",
+            username=user.username
         )
         
         # Send luxury welcome
@@ -179,25 +221,7 @@ class RahuEscrowBotPhase1:
     
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Elite help message"""
-        help_text = """
-🎯 *Rahu Escrow - Elite Support* 🎯
-
-🌟 *For Premium Assistance:*
-
-👨‍💼 **Elite Moderators:**
-• @RahuMod1 - Senior Arbitrator
-• @RahuMod2 - Dispute Specialist  
-• @RahuMod3 - Technical Support
-
-📞 *Contact Priority:*
-• VIP Members: < 5 minutes
-• Premium: < 15 minutes
-• Standard: < 1 hour
-
-⚡ *Emergency Support:* @RahuAdmin
-
-*We're here to serve your escrow needs with luxury service.*
-        """
+        help_text = LuxuryFormatter.format_help_message()
         
         await update.message.reply_text(
             help_text,
@@ -245,7 +269,8 @@ class RahuEscrowBotPhase1:
                 target=deal.escrow_id,
                 group_id=group.id,
                 deal_id=deal.id,
-                details=f"Created escrow in Group {group.group_number}"
+                details=f"Created escrow in Group {group.group_number}",
+                username=telegram_user.username
             )
             
             # Send luxury confirmation
@@ -270,7 +295,15 @@ class RahuEscrowBotPhase1:
             )
     
     async def buyer_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Set buyer address with real network detection"""
+        """Register the buyer's address on this chat's deal"""
+        await self.register_participant(update, context, "buyer")
+    
+    async def seller_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Register the seller's address on this chat's deal"""
+        await self.register_participant(update, context, "seller")
+    
+    async def register_participant(self, update: Update, context: ContextTypes.DEFAULT_TYPE, role: str):
+        """Set a participant address with real network detection; escrow generation follows both"""
         telegram_user = update.effective_user
         
         # Check permissions
@@ -284,8 +317,8 @@ class RahuEscrowBotPhase1:
         
         if not context.args:
             # Show network selection
-            selection_text = LuxuryFormatter.format_network_selection_message("BUYER")
-            keyboard = KeyboardBuilder.build_network_selection("buyer")
+            selection_text = LuxuryFormatter.format_network_selection_message(role.upper())
+            keyboard = KeyboardBuilder.build_network_selection(role)
             
             await update.message.reply_text(
                 selection_text,
@@ -306,23 +339,36 @@ class RahuEscrowBotPhase1:
             )
             return
         
-        # Find active deal for this user (simplified for Phase 1)
-        # In full implementation, this would be more sophisticated
         try:
-            # For demo, we'll create a mock deal scenario
-            # In production, this would find the actual deal from group context
+            # The deal behind this escrow group, from the in-memory chat index
+            chat_id = update.effective_chat.id
+            deal_id = await chat_index.resolve_deal(chat_id)
+            if not deal_id:
+                await update.message.reply_text(
+                    LuxuryFormatter.format_error_message("no_deal"),
+                    parse_mode=ParseMode.MARKDOWN
+                )
+                return
+            
+            deal, error = await DealManager.set_participant_address(deal_id, telegram_user.id, address, role)
+            if not deal:
+                await update.message.reply_text(error)
+                return
             
             # Log action
             await AuditLogger.log_user_action(
                 telegram_user.id,
-                "/buyer",
+                f"/{role}",
                 target=address,
-                details=f"Set buyer address for {detected_network.value}"
+                group_id=chat_index.group_for_chat(chat_id),
+                deal_id=deal_id,
+                details=f"Set {role} address for {detected_network.value}",
+                username=telegram_user.username
             )
             
             # Send confirmation
             response_text = LuxuryFormatter.format_address_registered_message(
-                "BUYER", address, detected_network
+                role.upper(), address, detected_network
             )
             
             await update.message.reply_text(
@@ -330,116 +376,35 @@ class RahuEscrowBotPhase1:
                 parse_mode=ParseMode.MARKDOWN
             )
             
-        except Exception as e:
-            logger.error(f"Failed to set buyer address: {e}")
-            await update.message.reply_text(
-                LuxuryFormatter.format_error_message("system_error"),
-                parse_mode=ParseMode.MARKDOWN
-            )
-    
-    async def seller_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Set seller address with escrow generation"""
-        telegram_user = update.effective_user
-        
-        # Check permissions
-        is_banned, _, _ = await self.check_user_permissions(telegram_user.id)
-        if is_banned:
-            await update.message.reply_text(
-                LuxuryFormatter.format_error_message("user_banned"),
-                parse_mode=ParseMode.MARKDOWN
-            )
-            return
-        
-        if not context.args:
-            # Show network selection
-            selection_text = LuxuryFormatter.format_network_selection_message("SELLER")
-            keyboard = KeyboardBuilder.build_network_selection("seller")
-            
-            await update.message.reply_text(
-                selection_text,
-                parse_mode=ParseMode.MARKDOWN,
-                reply_markup=keyboard
-            )
-            return
-        
-        address = context.args[0].strip()
-        
-        # Validate and detect network
-        is_valid, detected_network = NetworkDetector.validate_address(address)
-        
-        if not is_valid:
-            await update.message.reply_text(
-                LuxuryFormatter.format_error_message("invalid_address"),
-                parse_mode=ParseMode.MARKDOWN
-            )
-            return
-        
-        try:
-            # For production use: Find actual deal from group context
-            # For now, create a demo deal and generate REAL escrow wallet
-            
-            # Generate REAL escrow wallet
-            escrow_address, private_key = await EscrowWalletGenerator.generate_escrow_address(
-                detected_network, 
-                str(uuid.uuid4())
-            )
+            # This registration completed the pair, or retries a failed generation: generate the
+            # REAL escrow wallet (monitoring starts with it)
+            if deal.status != DealStatus.ADDRESSES_SET.value:
+                return
             
-            if not escrow_address:
+            escrow_deal, error = await DealManager.generate_escrow_wallet(deal)
+            if not escrow_deal:
+                logger.error(f"Failed to generate escrow for deal {deal.escrow_id}: {error}")
                 await update.message.reply_text(
-                    "❌ Failed to generate escrow wallet. Please try again.",
+                    LuxuryFormatter.format_error_message("system_error"),
                     parse_mode=ParseMode.MARKDOWN
                 )
                 return
             
-            # Log action
-            await AuditLogger.log_user_action(
-                telegram_user.id,
-                "/seller",
-                target=address,
-                details=f"Set seller address, generated REAL {detected_network.value} escrow: {escrow_address}"
-            )
-            
-            # Create demo deal object for message formatting
-            demo_deal = Deal(
-                escrow_id=f"ESCROW-{random.choice(['ABC', 'DEF', 'GHI'])}{random.randint(100, 999)}",
-                group_id="demo",
-                network=detected_network,
-                escrow_address=escrow_address
-            )
-            
-            # Start REAL blockchain monitoring for this address
-            try:
-                from monitoring import real_monitor
-                await real_monitor.add_address(
-                    detected_network,
-                    escrow_address,
-                    demo_deal.id,
-                    callback=None  # Would be real callback in production
-                )
-                logger.info(f"🔍 Started REAL monitoring for {detected_network.value}: {escrow_address}")
-            except Exception as e:
-                logger.warning(f"Failed to start monitoring: {e}")
-            
-            # Send escrow active message with REAL address
+            deal = escrow_deal
             active_text = LuxuryFormatter.format_escrow_active_message(
-                demo_deal,
-                "DEMO_BUYER_ADDRESS",
-                address
+                deal,
+                deal.buyer_address,
+                deal.seller_address
             )
             
-            # Add real blockchain monitoring notice
-            active_text += f"\n\n🔍 **REAL BLOCKCHAIN MONITORING ACTIVE**\n*This is a production {detected_network.value} address with live monitoring*"
-            
-            keyboard = KeyboardBuilder.build_escrow_actions()
-            
             await update.message.reply_text(
                 active_text,
                 parse_mode=ParseMode.MARKDOWN,
-                reply_markup=keyboard
+                reply_markup=KeyboardBuilder.build_escrow_actions()
             )
             
         except Exception as e:
-            logger.error(f"Failed to set seller address: {e}")
+            logger.error(f"Failed to set {role} address: {e}")
             await update.message.reply_text(
                 LuxuryFormatter.format_error_message("system_error"),
                 parse_mode=ParseMode.MARKDOWN
@@ -511,7 +476,8 @@ class RahuEscrowBotPhase1:
                     telegram_user.id,
                     "/ban",
                     target=f"@{target_username}",
-                    details=f"Banned user {target_user.user_id}"
+                    details=f"Banned user {target_user.user_id}",
+                    username=telegram_user.username
                 )
                 
                 # Send confirmation
@@ -586,7 +552,8 @@ class RahuEscrowBotPhase1:
                     telegram_user.id,
                     "/unban",
                     target=f"@{target_username}",
-                    details=f"Unbanned user {target_user.user_id}"
+                    details=f"Unbanned user {target_user.user_id}",
+                    username=telegram_user.username
                 )
                 
                 await update.message.reply_text(
@@ -644,7 +611,8 @@ class RahuEscrowBotPhase1:
                     telegram_user.id,
                     "/freeze global",
                     target="ALL_DEALS",
-                    details="Global freeze activated"
+                    details="Global freeze activated",
+                    username=telegram_user.username
                 )
                 
                 response_text = LuxuryFormatter.format_moderation_action(
@@ -660,7 +628,8 @@ class RahuEscrowBotPhase1:
                     telegram_user.id,
                     "/freeze",
                     target=target,
-                    details=f"Froze deal {target}"
+                    details=f"Froze deal {target}",
+                    username=telegram_user.username
                 )
                 
                 response_text = LuxuryFormatter.format_moderation_action(
@@ -719,7 +688,8 @@ class RahuEscrowBotPhase1:
                     telegram_user.id,
                     "/unfreeze global",
                     target="ALL_DEALS",
-                    details="Global freeze lifted - all deals resumed"
+                    details="Global freeze lifted - all deals resumed",
+                    username=telegram_user.username
                 )
                 
                 response_text = f"""
@@ -738,7 +708,8 @@ class RahuEscrowBotPhase1:
                     telegram_user.id,
                     "/unfreeze",
                     target=target,
-                    details=f"Unfroze deal {target}"
+                    details=f"Unfroze deal {target}",
+                    username=telegram_user.username
                 )
                 
                 response_text = LuxuryFormatter.format_moderation_action(
@@ -808,7 +779,8 @@ class RahuEscrowBotPhase1:
                     telegram_user.id,
                     "/addmod",
                     target=f"@{target_username}",
-                    details=f"Promoted {target_user.user_id} to moderator"
+                    details=f"Promoted {target_user.user_id} to moderator",
+                    username=telegram_user.username
                 )
                 
                 await update.message.reply_text(
@@ -875,7 +847,8 @@ class RahuEscrowBotPhase1:
                     telegram_user.id,
                     "/removemod",
                     target=f"@{target_username}",
-                    details=f"Removed moderator status from {target_user.user_id}"
+                    details=f"Removed moderator status from {target_user.user_id}",
+                    username=telegram_user.username
                 )
                 
                 await update.message.reply_text(
@@ -962,6 +935,48 @@ class RahuEscrowBotPhase1:
                 parse_mode=ParseMode.MARKDOWN
             )
     
+    async def bind_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Bind the escrow group chat this is sent in to its group number (admin only)"""
+        telegram_user = update.effective_user
+        chat = update.effective_chat
+        
+        # Admin only
+        is_banned, is_moderator, is_admin = await self.check_user_permissions(telegram_user.id)
+        
+        if is_banned or not is_admin:
+            await update.message.reply_text(
+                LuxuryFormatter.format_error_message("permission_denied"),
+                parse_mode=ParseMode.MARKDOWN
+            )
+            return
+        
+        if chat.type == ChatType.PRIVATE or not context.args or not context.args[0].isdigit():
+            await update.message.reply_text(
+                "Usage: `/bind <group number>`, sent in the escrow group chat",
+                parse_mode=ParseMode.MARKDOWN
+            )
+            return
+        
+        group_number = int(context.args[0])
+        
+        try:
+            error = await GroupLifecycleManager.bind_chat(group_number, chat.id)
+            if error:
+                await update.message.reply_text(error, parse_mode=ParseMode.MARKDOWN)
+                return
+            
+            await update.message.reply_text(
+                f"🔗 **Chat bound to Premium Group {group_number}**",
+                parse_mode=ParseMode.MARKDOWN
+            )
+            
+        except Exception as e:
+            logger.error(f"Failed to bind group chat: {e}")
+            await update.message.reply_text(
+                LuxuryFormatter.format_error_message("system_error"),
+                parse_mode=ParseMode.MARKDOWN
+            )
+    
     async def grouplist_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """List all groups (admin only)"""
         telegram_user = update.effective_user
@@ -989,6 +1004,55 @@ class RahuEscrowBotPhase1:
                 parse_mode=ParseMode.MARKDOWN
             )
     
+    async def broadcast_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Queue a broadcast to every reachable user"""
+        telegram_user = update.effective_user
+        
+        # Admins, or moderators holding can_broadcast
+        is_banned, is_moderator, is_admin = await self.check_user_permissions(telegram_user.id)
+        
+        if is_banned or not await self.check_broadcast_permission(telegram_user.id, is_moderator, is_admin):
+            await update.message.reply_text(
+                LuxuryFormatter.format_error_message("permission_denied"),
+                parse_mode=ParseMode.MARKDOWN
+            )
+            return
+        
+        if not context.args:
+            await update.message.reply_text(
+                "Usage: `/broadcast your announcement`",
+                parse_mode=ParseMode.MARKDOWN
+            )
+            return
+        
+        # Keep the original line breaks rather than re-joining args
+        message = update.message.text.split(None, 1)[1]
+        
+        try:
+            broadcast = await db_manager.create_broadcast(
+                Broadcast(message=message, created_by=telegram_user.id)
+            )
+            
+            await AuditLogger.log_user_action(
+                telegram_user.id,
+                "/broadcast",
+                target=broadcast.id,
+                details=f"Queued broadcast ({len(message)} chars)",
+                username=telegram_user.username
+            )
+            
+            await update.message.reply_text(
+                f"📣 **Broadcast queued**\n\n🆔 `{broadcast.id}`\n\n*Delivery starts shortly at the maximum safe rate.*",
+                parse_mode=ParseMode.MARKDOWN
+            )
+            
+        except Exception as e:
+            logger.error(f"Failed to queue broadcast: {e}")
+            await update.message.reply_text(
+                LuxuryFormatter.format_error_message("system_error"),
+                parse_mode=ParseMode.MARKDOWN
+            )
+    
     # ============ CALLBACK HANDLERS ============
     
     async def button_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -1020,53 +1084,42 @@ class RahuEscrowBotPhase1:
                 await query.edit_message_text(instruction_text, parse_mode=ParseMode.MARKDOWN)
                 
             elif query.data == "show_qr":
-                await query.edit_message_text(
-                    "📱 *QR Code Generated*\n\n[QR Code would be displayed here]\n\n*Scan to send crypto to escrow address*",
+                deal_id = await chat_index.resolve_deal(query.message.chat_id)
+                deal = await db_manager.get_deal_summary(deal_id) if deal_id else None
+                
+                if not deal or not deal.escrow_address:
+                    await query.edit_message_text(
+                        LuxuryFormatter.format_error_message("no_escrow"),
+                        parse_mode=ParseMode.MARKDOWN
+                    )
+                    return
+                
+                # Rendered off the event loop once; later presses reuse Telegram's file_id
+                image = await qr_renderer.render(deal.network, deal.escrow_address, deal.amount)
+                sent = await query.message.reply_photo(
+                    photo=image.photo,
+                    caption=LuxuryFormatter.format_qr_caption(deal),
                     parse_mode=ParseMode.MARKDOWN
                 )
+                if sent.photo:
+                    qr_renderer.remember_file_id(deal.escrow_address, deal.amount, sent.photo[-1].file_id)
                 
             elif query.data == "check_balance":
-                # Check REAL balance from blockchain
-                try:
-                    from blockchain import real_wallet_manager
-                    from models import NetworkType
-                    
-                    # For demo purposes, we'll check a real Bitcoin address
-                    # In production, this would get the actual escrow address from context
-                    demo_address = "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa"  # Genesis block address
-                    network = NetworkType.BTC
-                    
-                    async with real_wallet_manager.blockchain_api as api:
-                        real_balance = await api.get_balance(network, demo_address)
-                        transactions = await api.get_transactions(network, demo_address, 3)
-                    
-                    balance_text = f"""
-💰 **REAL BLOCKCHAIN BALANCE**
-
-🌐 **Network:** ₿ Bitcoin (BTC)
-📍 **Address:** `{demo_address}`
-💵 **Balance:** {real_balance} BTC
-⏰ **Last updated:** {datetime.now().strftime('%H:%M:%S')}
-
-🔗 **Recent Transactions:** {len(transactions)}
-
-*This is live data from the Bitcoin blockchain*
-                    """
-                    
-                except Exception as e:
-                    logger.error(f"Failed to check real balance: {e}")
-                    balance_text = f"""
-💰 **Balance Check**
-
-❌ **Error:** Unable to fetch real balance
-🔧 **Reason:** {str(e)[:100]}...
-⏰ **Time:** {datetime.now().strftime('%H:%M:%S')}
-
-*Please try again in a moment*
-                    """
+                # Check REAL balance of this chat's escrow wallet
+                deal_id = await chat_index.resolve_deal(query.message.chat_id)
+                if not deal_id:
+                    await query.edit_message_text(
+                        LuxuryFormatter.format_error_message("no_deal"),
+                        parse_mode=ParseMode.MARKDOWN
+                    )
+                    return
+                
+                balance = await DealManager.check_escrow_balance(deal_id)
+                if balance.get("error"):
+                    logger.error(f"Failed to check real balance: {balance['error']}")
                 
                 await query.edit_message_text(
-                    balance_text,
+                    LuxuryFormatter.format_balance_message(balance),
                     parse_mode=ParseMode.MARKDOWN
                 )
                 
@@ -1099,6 +1152,8 @@ class RahuEscrowBotPhase1:
         self.application.add_handler(CommandHandler("modlist", self.modlist_command))
         self.application.add_handler(CommandHandler("userlist", self.userlist_command))
         self.application.add_handler(CommandHandler("grouplist", self.grouplist_command))
+        self.application.add_handler(CommandHandler("bind", self.bind_command))
+        self.application.add_handler(CommandHandler("broadcast", self.broadcast_command))
         
         # Callback handlers
         self.application.add_handler(CallbackQueryHandler(self.button_handler))
@@ -1139,6 +1194,28 @@ class RahuEscrowBotPhase1:
             await self.application.start()
             await self.application.updater.start_polling()
             
+            # Start pushing funding notifications into escrow groups
+            await group_notifier.start(self.application.bot)
+            
+            # Deliver lifecycle events to audit, notifier, metrics and cache subscribers
+            await event_bus.start()
+            
+            # Start broadcast engine (resumes interrupted broadcasts)
+            self.broadcast_engine = BroadcastEngine(self.application.bot)
+            await self.broadcast_engine.start()
+            
+            # Serve blockchain webhooks next to the monitor they feed, unless the API process mounts them
+            if os.getenv("WEBHOOK_PORT"):
+                from webhooks import serve_webhooks, API_RECEIVER_ROLE, RECEIVER_ROLE
+                if await coordinator.members_with(API_RECEIVER_ROLE):
+                    logger.error("❌ Not serving WEBHOOK_PORT: the API process already mounts the webhook receiver")
+                else:
+                    coordinator.roles.add(RECEIVER_ROLE)
+                    await coordinator.heartbeat()
+                    self.webhook_task = supervisor.spawn(
+                        "webhook_server", lambda: serve_webhooks(port=int(os.getenv("WEBHOOK_PORT")))
+                    )
+            
             # Keep running
             try:
                 while True:
@@ -1146,9 +1223,20 @@ class RahuEscrowBotPhase1:
             except KeyboardInterrupt:
                 logger.info("Bot stopping...")
             finally:
+                if self.webhook_task:
+                    await supervisor.cancel("webhook_server")
+                await self.broadcast_engine.stop()
+                await event_bus.stop()
+                await group_notifier.stop()
                 await self.application.updater.stop()
                 await self.application.stop()
                 await self.application.shutdown()
+                # Drain supervised tasks while the database and audit sink are still up
+                await supervisor.shutdown()
+                await coordinator.stop()
+                await config_cache.stop()
+                await audit_sink.stop()
+                qr_renderer.shutdown()
                 await db_manager.disconnect()
                 
         except Exception as e:
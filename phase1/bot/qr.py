@@ -0,0 +1,139 @@
+"""
+QR Code Renderer for Rahu Escrow Bot
+Payment-URI QR images rendered off the event loop and cached per escrow address
+"""
+
+import io
+import os
+import asyncio
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Dict, Optional, Tuple, Union
+
+import qrcode
+
+from models import NetworkType
+from blocks import USDT_BEP20_CONTRACT
+
+logger = logging.getLogger(__name__)
+
+QR_CACHE_SIZE = int(os.getenv("QR_CACHE_SIZE", "512"))
+QR_RENDER_WORKERS = int(os.getenv("QR_RENDER_WORKERS", "2"))
+QR_PRERENDER = os.getenv("QR_PRERENDER", "true").lower() == "true"
+
+BSC_CHAIN_ID = 56
+WEI_DECIMALS = 18
+USDT_BEP20_DECIMALS = 18
+
+def format_amount(amount) -> str:
+    """Plain decimal string: no exponent, no trailing zeros"""
+    return format(Decimal(str(amount)).normalize(), "f")
+
+def base_units(amount, decimals: int) -> str:
+    """Integer token units for EIP-681 value/uint256 parameters"""
+    return str(int(Decimal(str(amount)) * (Decimal(10) ** decimals)))
+
+def payment_uri(network: NetworkType, address: str, amount: Optional[float] = None) -> str:
+    """BIP21 (BTC/LTC) or EIP-681 (ETH/BEP20) URI wallets can prefill from a scan
+
+    TRON has no payment URI standard its wallets agree on, so USDT-TRC20 encodes
+    the bare address.
+    """
+    network = NetworkType(network)
+
+    if network == NetworkType.BTC:
+        return f"bitcoin:{address}" + (f"?amount={format_amount(amount)}" if amount else "")
+    if network == NetworkType.LTC:
+        return f"litecoin:{address}" + (f"?amount={format_amount(amount)}" if amount else "")
+    if network == NetworkType.ETH:
+        return f"ethereum:{address}" + (f"?value={base_units(amount, WEI_DECIMALS)}" if amount else "")
+    if network == NetworkType.USDT_BEP20:
+        uri = f"ethereum:{USDT_BEP20_CONTRACT}@{BSC_CHAIN_ID}/transfer?address={address}"
+        return uri + (f"&uint256={base_units(amount, USDT_BEP20_DECIMALS)}" if amount else "")
+    return address
+
+def render_png(data: str) -> bytes:
+    """Encode data as a PNG QR code; CPU-bound, runs in the render pool"""
+    code = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, box_size=10, border=4)
+    code.add_data(data)
+    code.make(fit=True)
+
+    out = io.BytesIO()
+    code.make_image(fill_color="black", back_color="white").save(out, format="PNG")
+    return out.getvalue()
+
+class QRImage:
+    """A rendered QR code; once Telegram stores it, only the file_id is kept"""
+
+    __slots__ = ("uri", "png", "file_id")
+
+    def __init__(self, uri: str, png: Optional[bytes] = None, file_id: Optional[str] = None):
+        self.uri = uri
+        self.png = png
+        self.file_id = file_id
+
+    @property
+    def photo(self) -> Union[str, bytes]:
+        """What send_photo/reply_photo should be given: the file_id when known"""
+        return self.file_id or self.png
+
+class QRRenderer:
+    """LRU of QR images keyed by (address, amount), rendered in a thread pool"""
+
+    def __init__(self, max_size: int = QR_CACHE_SIZE, workers: int = QR_RENDER_WORKERS):
+        self.max_size = max_size
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="qr-render")
+        self.cache: "OrderedDict[Tuple[str, Optional[float]], QRImage]" = OrderedDict()
+        self._pending: Dict[Tuple[str, Optional[float]], asyncio.Task] = {}
+        self.hits = 0
+        self.renders = 0
+
+    async def render(self, network: NetworkType, address: str, amount: Optional[float] = None) -> QRImage:
+        """Cached QR image for an escrow address, rendering it at most once"""
+        key = (address, amount)
+        image = self.cache.get(key)
+        if image:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return image
+
+        # Concurrent presses for the same address share one render
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._render(key, payment_uri(network, address, amount)))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _render(self, key: Tuple[str, Optional[float]], uri: str) -> QRImage:
+        png = await asyncio.get_running_loop().run_in_executor(self.executor, render_png, uri)
+
+        image = QRImage(uri, png)
+        self.cache[key] = image
+        self.renders += 1
+        while len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+        return image
+
+    def prerender(self, network: NetworkType, address: str, amount: Optional[float] = None):
+        """Warm the cache when an escrow is created so the first press is instant"""
+        if not QR_PRERENDER:
+            return
+
+        from supervisor import supervisor
+        supervisor.spawn(f"qr_prerender:{address}", lambda: self.render(network, address, amount), restart=False)
+
+    def remember_file_id(self, address: str, amount: Optional[float], file_id: str):
+        """Reuse Telegram's copy from now on and free the PNG bytes"""
+        image = self.cache.get((address, amount))
+        if image:
+            image.file_id = file_id
+            image.png = None
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+# Global QR renderer
+qr_renderer = QRRenderer()
@@ -5,7 +5,9 @@ Luxury state tracking and group lifecycle management
 
 import asyncio
 import logging
-from datetime import datetime, timedelta
+import os
+import time
+from datetime import datetime
 from typing import Dict, List, Optional
 import random
 import re
@@ -16,9 +18,16 @@ from models import (
     NetworkType, GroupStatus, DealStatus,
     db_manager
 )
+from events import Event, DealCreated, EscrowGenerated, FundingSeen, DealFunded, DealFrozen, DealUnfrozen, GroupExpired, GroupBound, event_bus
 
 logger = logging.getLogger(__name__)
 
+AUDIT_FLUSH_SIZE = int(os.getenv("AUDIT_FLUSH_SIZE", "100"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))  # seconds
+AUDIT_MAX_BUFFER = 10000  # oldest entries are dropped beyond this while Mongo is unreachable
+AUDIT_DROP_WARN_INTERVAL = 60  # seconds between warnings about dropped entries
+CHAT_INDEX_MISS_TTL = 60  # seconds before an unknown chat is looked up again
+
 class NetworkDetector:
     """Premium network detection for multi-chain support"""
     
@@ -154,6 +163,82 @@ class EscrowWalletGenerator:
         """Generate hex string"""
         return ''.join(random.choice('0123456789abcdef') for _ in range(length))
 
+class ChatDealIndex:
+    """telegram_chat_id -> group -> current deal, held in memory
+    
+    Loaded once at startup and kept current by the group lifecycle, so chat
+    commands resolve their deal without a query. /bind updates it directly and
+    GroupBound tells the other replicas to look the chat up again on first use;
+    misses are remembered for CHAT_INDEX_MISS_TTL.
+    """
+    
+    def __init__(self, store=db_manager):
+        self.store = store
+        self.chat_groups: Dict[int, str] = {}
+        self.group_deals: Dict[str, Optional[str]] = {}
+        self._misses: Dict[int, float] = {}
+    
+    async def load(self):
+        """Rebuild from every group bound to a chat"""
+        groups = await self.store.get_bound_groups()
+        self.chat_groups = {group.telegram_chat_id: group.id for group in groups}
+        self.group_deals = {group.id: group.current_deal_id for group in groups}
+        self._misses.clear()
+        logger.info(f"🗂️ Indexed {len(self.chat_groups)} escrow group chats")
+    
+    def set_deal(self, group_id: str, deal_id: Optional[str]):
+        """Called by the lifecycle whenever a group's current deal changes"""
+        if group_id in self.group_deals:
+            self.group_deals[group_id] = deal_id
+    
+    def bind(self, chat_id: int, group_id: str, deal_id: Optional[str]):
+        """Route a chat to its group, replacing any chat the group was bound to"""
+        self.forget(chat_id, group_id)
+        self.chat_groups[chat_id] = group_id
+        self.group_deals[group_id] = deal_id
+    
+    def forget(self, chat_id: int, group_id: str):
+        """Drop what is known about a chat and a group so both are looked up again"""
+        for bound_chat in [chat for chat, group in self.chat_groups.items() if group == group_id]:
+            del self.chat_groups[bound_chat]
+        self.chat_groups.pop(chat_id, None)
+        self.group_deals.pop(group_id, None)
+        self._misses.pop(chat_id, None)
+    
+    async def apply_event(self, event: Event):
+        """Broadcast subscriber: follow deal changes made on other replicas"""
+        if isinstance(event, DealCreated):
+            self.set_deal(event.group_id, event.deal_id)
+        elif isinstance(event, GroupExpired):
+            self.set_deal(event.group_id, None)
+        elif isinstance(event, GroupBound) and self.chat_groups.get(event.chat_id) != event.group_id:
+            self.forget(event.chat_id, event.group_id)
+    
+    def group_for_chat(self, chat_id: int) -> Optional[str]:
+        return self.chat_groups.get(chat_id)
+    
+    async def resolve_deal(self, chat_id: int) -> Optional[str]:
+        """Current deal ID for a chat, or None outside escrow groups"""
+        group_id = self.chat_groups.get(chat_id)
+        if group_id is not None:
+            return self.group_deals.get(group_id)
+        
+        missed_at = self._misses.get(chat_id)
+        if missed_at is not None and time.monotonic() - missed_at < CHAT_INDEX_MISS_TTL:
+            return None
+        
+        group = await self.store.get_group_summary_by_chat(chat_id)
+        if not group:
+            self._misses[chat_id] = time.monotonic()
+            return None
+        
+        self.chat_groups[chat_id] = group.id
+        self.group_deals[group.id] = group.current_deal_id
+        return group.current_deal_id
+
+# Global chat index
+chat_index = ChatDealIndex()
+
 class GroupLifecycleManager:
     """Premium group lifecycle management"""
     
@@ -195,17 +280,11 @@ class GroupLifecycleManager:
     async def assign_group() -> Optional[Group]:
         """Assign next available premium group"""
         try:
-            group = await db_manager.get_available_group()
+            from transitions import state_machine
+            group = await state_machine.claim_group()
             if group:
-                # Mark as occupied
-                await db_manager.update_group_status(
-                    group.id, 
-                    GroupStatus.OCCUPIED,
-                    occupied_at=datetime.utcnow(),
-                    expires_at=datetime.utcnow() + timedelta(hours=12)
-                )
-                logger.info(f"✨ Assigned premium group {group.group_number}")
-                return await db_manager.get_group_by_id(group.id)
+                logger.info(f"✨ Assigned premium group {group['group_number']}")
+                return Group(**group)
             
             logger.warning("No available premium groups")
             return None
@@ -218,46 +297,62 @@ class GroupLifecycleManager:
     async def transition_group_status(group_id: str, new_status: GroupStatus, **kwargs):
         """Transition group status with luxury precision"""
         try:
-            updates = {"status": new_status}
-            
-            if new_status == GroupStatus.ESCROW_CREATED:
-                updates["created_at"] = datetime.utcnow()
-            elif new_status == GroupStatus.FUNDED:
-                updates["funded_at"] = datetime.utcnow()
-            elif new_status == GroupStatus.COOLDOWN:
-                updates["cooldown_until"] = datetime.utcnow() + timedelta(hours=12)
-            
-            updates.update(kwargs)
+            from transitions import state_machine
+            group = await state_machine.transition_group(group_id, new_status, kwargs)
+            if group is None:
+                logger.warning(f"Group {group_id} cannot move to {new_status.value} from its current status")
+                return False
             
-            success = await db_manager.update_group_status(group_id, new_status, **updates)
-            if success:
-                logger.info(f"✨ Group {group_id} transitioned to {new_status.value}")
-            
-            return success
+            if "current_deal_id" in group:
+                chat_index.set_deal(group_id, group["current_deal_id"])
+            logger.info(f"✨ Group {group_id} transitioned to {new_status.value}")
+            return True
             
         except Exception as e:
             logger.error(f"Failed to transition group status: {e}")
             return False
     
+    @staticmethod
+    async def bind_chat(group_number: int, chat_id: int) -> Optional[str]:
+        """Bind an escrow group to the Telegram chat it runs in; an error message when refused"""
+        group = await db_manager.get_group_summary_by_number(group_number)
+        if not group:
+            return f"❌ Group {group_number} not found"
+        
+        bound = await db_manager.get_group_summary_by_chat(chat_id)
+        if bound and bound.id != group.id:
+            return f"❌ This chat is already bound to group {bound.group_number}"
+        
+        from transitions import state_machine
+        updated = await state_machine.bind_chat(
+            group.id, chat_id,
+            events=[GroupBound(group_id=group.id, group_number=group_number, chat_id=chat_id)]
+        )
+        if updated is None:
+            return "❌ Failed to bind group"
+        
+        chat_index.bind(chat_id, group.id, updated.get("current_deal_id"))
+        logger.info(f"✨ Group {group_number} bound to chat {chat_id}")
+        return None
+    
     @staticmethod
     async def reset_expired_groups():
         """Reset groups after cooldown period"""
         try:
+            from transitions import state_machine
             expired_groups = await db_manager.get_expired_groups()
             
             for group in expired_groups:
-                # Reset group to available
-                success = await db_manager.reset_group(group.id)
+                # Reset group to available, unless another replica or an admin got there first
+                success = await state_machine.transition_group(
+                    group.id,
+                    GroupStatus.AVAILABLE,
+                    events=[GroupExpired(group_id=group.id, group_number=group.group_number)]
+                )
                 if success:
+                    chat_index.set_deal(group.id, None)
                     logger.info(f"✨ Reset premium group {group.group_number} to available")
-                    
-                    # TODO: In full implementation, kick users and clear chat
-                    # For now, just log the action
-                    await AuditLogger.log_system_action(
-                        action="group_reset",
-                        target=f"Group {group.group_number}",
-                        details=f"Auto-reset after cooldown period"
-                    )
+                    # TODO: In full implementation, kick users and clear chat from a GroupExpired subscriber
             
             return len(expired_groups)
             
@@ -284,41 +379,32 @@ class DealManager:
                 seller_user_id=creator_user_id if not is_buyer else None
             )
             
-            # Save deal
-            saved_deal = await db_manager.create_deal(deal)
-            
-            # Update group with deal reference
-            await db_manager.update_group_status(
-                group.id,
-                GroupStatus.OCCUPIED,
-                current_deal_id=deal.id
-            )
+            # Save deal and attach it to the group in one step
+            from transitions import state_machine
+            created = DealCreated(deal_id=deal.id, escrow_id=escrow_id, group_id=group.id, creator_user_id=creator_user_id)
+            if not await state_machine.open_deal(deal, events=[created]):
+                logger.warning(f"Group {group.group_number} already holds a deal")
+                return None
+            chat_index.set_deal(group.id, deal.id)
             
             logger.info(f"✨ Created premium deal {escrow_id}")
-            return saved_deal
+            return deal
             
         except Exception as e:
             logger.error(f"Failed to create deal: {e}")
             return None
     
     @staticmethod
-    async def set_participant_address(deal_id: str, user_id: int, address: str, role: str) -> tuple[bool, Optional[str]]:
-        """Set participant address with network detection"""
+    async def set_participant_address(deal_id: str, user_id: int, address: str, role: str) -> tuple[Optional[Deal], Optional[str]]:
+        """Set participant address with network detection; returns the updated deal"""
         try:
+            from transitions import state_machine
+            
             # Validate address and detect network
             is_valid, detected_network = NetworkDetector.validate_address(address)
             
             if not is_valid:
-                return False, "🛑 Invalid address format — please check and retry"
-            
-            # Get current deal
-            deal = await db_manager.get_deal_by_id(deal_id)
-            if not deal:
-                return False, "Deal not found"
-            
-            # Check network compatibility
-            if deal.network and deal.network != detected_network:
-                return False, f"🛑 Network mismatch — please use {deal.network.value} address to match other participant"
+                return None, "🛑 Invalid address format — please check and retry"
             
             # Update deal
             updates = {
@@ -333,29 +419,53 @@ class DealManager:
                 updates["seller_user_id"] = user_id  
                 updates["seller_address"] = address
             
-            # Check if both addresses are set
-            if deal.buyer_address and deal.seller_address:
-                updates["status"] = DealStatus.ADDRESSES_SET.value
-            
-            success = await db_manager.update_deal(deal_id, updates)
+            # Addresses stay editable until both are in, and must match the other participant's network
+            deal = await state_machine.update_deal(
+                deal_id,
+                updates,
+                [DealStatus.PENDING],
+                match={"network": {"$in": [None, detected_network.value]}}
+            )
             
-            if success:
-                logger.info(f"✨ Set {role} address for deal {deal.escrow_id}")
-                return True, None
-                
-            return False, "Failed to update address"
+            if deal is None:
+                # Only a refused update reads the deal, to explain why
+                current = await db_manager.get_deal_summary(deal_id)
+                if not current:
+                    return None, "Deal not found"
+                if current.network and current.network != detected_network.value:
+                    return None, f"🛑 Network mismatch — please use {current.network} address to match other participant"
+                if current.status == DealStatus.ADDRESSES_SET.value and not current.escrow_address:
+                    # Escrow generation failed after the pair was set: resending the same address retries it
+                    stuck = await db_manager.get_deal_by_id(deal_id)
+                    registered = stuck.buyer_address if role.lower() == "buyer" else stuck.seller_address
+                    if registered == address:
+                        logger.info(f"🔁 Retrying escrow generation for deal {stuck.escrow_id}")
+                        return stuck, None
+                return None, "🛑 Addresses are locked — the escrow for this deal is already being set up"
+            
+            # Whichever registration completes the pair moves the deal on, exactly once
+            if deal.get("buyer_address") and deal.get("seller_address"):
+                deal = await state_machine.transition_deal(
+                    deal_id,
+                    DealStatus.ADDRESSES_SET,
+                    match={"buyer_address": {"$ne": None}, "seller_address": {"$ne": None}}
+                ) or deal
+            
+            logger.info(f"✨ Set {role} address for deal {deal['escrow_id']}")
+            return Deal(**deal), None
             
         except Exception as e:
             logger.error(f"Failed to set participant address: {e}")
-            return False, f"System error: {str(e)}"
+            return None, f"System error: {str(e)}"
     
     @staticmethod 
-    async def generate_escrow_wallet(deal_id: str) -> tuple[bool, Optional[str]]:
-        """Generate REAL escrow wallet for deal with blockchain monitoring"""
+    async def generate_escrow_wallet(deal: Deal) -> tuple[Optional[Deal], Optional[str]]:
+        """Generate REAL escrow wallet for deal with blockchain monitoring; returns the updated deal"""
         try:
-            deal = await db_manager.get_deal_by_id(deal_id)
-            if not deal or not deal.network:
-                return False, "Deal or network not found"
+            from transitions import state_machine
+            
+            if not deal.network:
+                return None, "Deal network not set"
             
             # Generate REAL escrow wallet
             escrow_address, private_key = await EscrowWalletGenerator.generate_escrow_address(
@@ -363,85 +473,32 @@ class DealManager:
                 deal.id
             )
             
-            # Update deal
-            updates = {
-                "escrow_address": escrow_address,
-                "escrow_private_key": private_key,  # Encrypt in production
-                "status": DealStatus.ESCROW_GENERATED.value
-            }
-            
-            success = await db_manager.update_deal(deal_id, updates)
-            
-            if success:
-                # Update group status
-                await GroupLifecycleManager.transition_group_status(
-                    deal.group_id,
-                    GroupStatus.ESCROW_CREATED
-                )
-                
-                # Start REAL blockchain monitoring
-                asyncio.create_task(
-                    DealManager._monitor_escrow_funding(deal_id, escrow_address, NetworkType(deal.network))
-                )
-                
-                logger.info(f"✨ Generated REAL {deal.network} escrow wallet: {escrow_address}")
-                return True, escrow_address
-                
-            return False, "Failed to save escrow wallet"
-            
-        except Exception as e:
-            logger.error(f"Failed to generate escrow wallet: {e}")
-            return False, f"System error: {str(e)}"
-    
-    @staticmethod
-    async def _monitor_escrow_funding(deal_id: str, address: str, network: NetworkType):
-        """Monitor escrow address for REAL funding"""
-        try:
-            from blockchain import real_wallet_manager
+            # Save the wallet and move the group on together; a repeated or racing call saves nothing.
+            # EscrowGenerated puts the address under the sharded monitor on every replica
+            updated = await state_machine.transition_deal(
+                deal.id,
+                DealStatus.ESCROW_GENERATED,
+                {
+                    "escrow_address": escrow_address,
+                    "escrow_private_key": private_key  # Encrypt in production
+                },
+                group_status=GroupStatus.ESCROW_CREATED,
+                events=[EscrowGenerated(deal_id=deal.id, network=deal.network, escrow_address=escrow_address)]
+            )
             
-            logger.info(f"🔍 Starting REAL monitoring for {network.value} address: {address}")
+            if updated is None:
+                return None, "Escrow wallet already generated for this deal"
             
-            # Define callback for when funding is detected
-            async def funding_callback(address: str, funding_status: dict):
-                try:
-                    logger.info(f"💰 REAL FUNDING DETECTED! Address: {address}, Amount: {funding_status['balance']}")
-                    
-                    # Update deal as funded
-                    updates = {
-                        "status": DealStatus.FUNDED.value,
-                        "amount": float(funding_status['balance']),
-                        "funded_at": datetime.utcnow(),
-                        "transaction_hash": funding_status['deposits'][0]['tx_hash'] if funding_status['deposits'] else None
-                    }
-                    
-                    await db_manager.update_deal(deal_id, updates)
-                    
-                    # Update group status
-                    deal = await db_manager.get_deal_by_id(deal_id)
-                    if deal:
-                        await GroupLifecycleManager.transition_group_status(
-                            deal.group_id,
-                            GroupStatus.FUNDED
-                        )
-                    
-                    # Log funding
-                    await AuditLogger.log_system_action(
-                        action="escrow_funded",
-                        target=address,
-                        details=f"Real funding detected: {funding_status['balance']} {network.value}"
-                    )
-                    
-                    # TODO: Send funding notification to escrow group
-                    # This would notify users in the Telegram group
-                    
-                except Exception as e:
-                    logger.error(f"Failed to process funding callback: {e}")
+            # Warm the QR cache so the first "Show QR" press needs no render
+            from qr import qr_renderer
+            qr_renderer.prerender(NetworkType(deal.network), escrow_address, deal.amount)
             
-            # Start monitoring (this runs in background)
-            await real_wallet_manager.monitor_address(network, address, funding_callback)
+            logger.info(f"✨ Generated REAL {deal.network} escrow wallet: {escrow_address}")
+            return Deal(**updated), None
             
         except Exception as e:
-            logger.error(f"Failed to start funding monitoring: {e}")
+            logger.error(f"Failed to generate escrow wallet: {e}")
+            return None, f"System error: {str(e)}"
     
     @staticmethod
     async def check_escrow_balance(deal_id: str) -> dict:
@@ -471,16 +528,117 @@ class DealManager:
             logger.error(f"Failed to check escrow balance: {e}")
             return {"balance": 0, "funded": False, "error": str(e)}
 
+class AuditSink:
+    """Write-behind audit buffer flushed with insert_many on size or time"""
+    
+    def __init__(self, store=db_manager, flush_size: int = AUDIT_FLUSH_SIZE, flush_interval: float = AUDIT_FLUSH_INTERVAL):
+        self.store = store
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.buffer: List[AuditLog] = []
+        self.running = False
+        self.dropped = 0
+        self._failed_at: Optional[float] = None  # monotonic time of the last failed flush
+        self._drop_warned_at = 0.0
+        self._flush_requested = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        """Start the background flusher"""
+        if self.running:
+            return
+        
+        self.running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info("📜 Started audit sink")
+    
+    async def stop(self):
+        """Stop the flusher and write out everything still buffered"""
+        self.running = False
+        
+        if self._task:
+            self._flush_requested.set()
+            await self._task
+            self._task = None
+        
+        await self.flush()
+        logger.info("🛑 Stopped audit sink")
+    
+    async def write(self, log: AuditLog):
+        """Buffer an entry; writes straight through when the sink is not running"""
+        if not self.running:
+            await self.store.log_action(log)
+            return
+        
+        self.buffer.append(log)
+        self._trim()
+        if len(self.buffer) >= AUDIT_MAX_BUFFER and not self._recently_failed():
+            # Backpressure while Mongo keeps up; after a failure the flusher retries on its interval
+            await self.flush()
+        elif len(self.buffer) >= self.flush_size:
+            self._flush_requested.set()
+    
+    def _recently_failed(self) -> bool:
+        return self._failed_at is not None and time.monotonic() - self._failed_at < self.flush_interval
+    
+    def _trim(self):
+        """Drop the oldest entries beyond AUDIT_MAX_BUFFER, warning with the running count"""
+        overflow = len(self.buffer) - AUDIT_MAX_BUFFER
+        if overflow <= 0:
+            return
+        
+        del self.buffer[:overflow]
+        self.dropped += overflow
+        now = time.monotonic()
+        if now - self._drop_warned_at >= AUDIT_DROP_WARN_INTERVAL:
+            self._drop_warned_at = now
+            logger.warning(f"⚠️ Audit buffer full, dropped oldest entries: {self.dropped} lost so far")
+    
+    async def flush(self):
+        """Insert buffered entries in one batch"""
+        async with self._flush_lock:
+            if not self.buffer:
+                return
+            
+            batch, self.buffer = self.buffer, []
+            try:
+                failed = await self.store.log_actions(batch)
+                if failed:
+                    self.buffer = failed + self.buffer
+                    self._failed_at = time.monotonic()
+                    logger.error(f"Failed to flush {len(failed)} audit entries, will retry")
+                else:
+                    self._failed_at = None
+            except Exception as e:
+                # Keep entries for the next attempt, oldest first
+                self.buffer = batch + self.buffer
+                self._failed_at = time.monotonic()
+                logger.error(f"Failed to flush {len(batch)} audit entries: {e}")
+            self._trim()
+    
+    async def _run(self):
+        """Flush whenever the batch fills up or the interval passes"""
+        while self.running:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            
+            self._flush_requested.clear()
+            await self.flush()
+
+# Global audit sink
+audit_sink = AuditSink()
+
 class AuditLogger:
     """Premium audit logging system"""
     
     @staticmethod
-    async def log_user_action(user_id: int, action: str, target: str = None, group_id: str = None, deal_id: str = None, details: str = None, success: bool = True):
-        """Log user action for audit trail"""
+    async def log_user_action(user_id: int, action: str, target: str = None, group_id: str = None, deal_id: str = None, details: str = None, success: bool = True, username: Optional[str] = None):
+        """Log user action for audit trail (username as known to the handler)"""
         try:
-            # Get user info
-            user = await db_manager.get_user_by_telegram_id(user_id)
-            username = f"@{user.username}" if user and user.username else f"User_{user_id}"
+            username = f"@{username}" if username else f"User_{user_id}"
             
             log = AuditLog(
                 user_id=user_id,
@@ -493,7 +651,7 @@ class AuditLogger:
                 success=success
             )
             
-            await db_manager.log_action(log)
+            await audit_sink.write(log)
             logger.info(f"📜 Logged action: {username} -> {action}")
             
         except Exception as e:
@@ -512,11 +670,43 @@ class AuditLogger:
                 success=True
             )
             
-            await db_manager.log_action(log)
+            await audit_sink.write(log)
             logger.info(f"📜 Logged system action: {action}")
             
         except Exception as e:
             logger.error(f"Failed to log system action: {e}")
+    
+    @staticmethod
+    async def log_event(event: Event):
+        """Audit subscriber for lifecycle events
+        
+        Written straight through rather than buffered, and keyed on the event ID,
+        so a failure is retried from the outbox and a redelivery adds no entry.
+        """
+        target, details = event.audit()
+        log = AuditLog(
+            log_id=event.id,
+            timestamp=event.created_at,
+            user_id=0,  # System user
+            username="SYSTEM",
+            action=event.audit_action,
+            target=target,
+            group_id=event.payload.get("group_id"),
+            deal_id=event.payload.get("deal_id"),
+            details=details,
+            success=True
+        )
+        
+        if await audit_sink.store.log_actions([log]):
+            raise RuntimeError(f"audit entry for {event.type} {event.id} not written")
+        logger.info(f"📜 Logged event: {event.audit_action}")
+
+# Lifecycle event subscribers
+event_bus.subscribe(
+    "audit", AuditLogger.log_event,
+    DealCreated, EscrowGenerated, FundingSeen, DealFunded, DealFrozen, DealUnfrozen, GroupExpired, GroupBound
+)
+event_bus.subscribe("chat_index", chat_index.apply_event, DealCreated, GroupExpired, GroupBound, broadcast=True)
 
 class BackgroundTasks:
     """Premium background task management"""
@@ -524,21 +714,60 @@ class BackgroundTasks:
     @staticmethod
     async def start_background_tasks():
         """Start luxury background tasks"""
-        asyncio.create_task(BackgroundTasks._group_reset_task())
+        from supervisor import supervisor
+        from cluster import coordinator
+        
+        # Singleton jobs: only the replica holding the lease runs them
+        supervisor.spawn(
+            "group_reset",
+            lambda: coordinator.run_as_leader("group_reset", BackgroundTasks._group_reset_task),
+            stall_after=1800
+        )
+        supervisor.spawn(
+            "audit_retention",
+            lambda: coordinator.run_as_leader("audit_retention", BackgroundTasks._audit_retention_task),
+            stall_after=3 * 86400
+        )
         logger.info("✨ Started premium background tasks")
     
     @staticmethod
     async def _group_reset_task():
         """Background task to reset expired groups"""
+        from supervisor import supervisor
+        
         while True:
             try:
-                reset_count = await GroupLifecycleManager.reset_expired_groups()
-                if reset_count > 0:
-                    logger.info(f"✨ Reset {reset_count} expired groups")
+                with supervisor.iteration("group_reset"):
+                    reset_count = await GroupLifecycleManager.reset_expired_groups()
+                    if reset_count > 0:
+                        logger.info(f"✨ Reset {reset_count} expired groups")
+                    
+                    # Pick up groups bound or reset from God Mode
+                    await chat_index.load()
                 
                 # Check every 10 minutes
                 await asyncio.sleep(600)
                 
             except Exception as e:
                 logger.error(f"Error in group reset task: {e}")
-                await asyncio.sleep(60)  # Retry in 1 minute on error
\ No newline at end of file
+                await asyncio.sleep(60)  # Retry in 1 minute on error
+    
+    @staticmethod
+    async def _audit_retention_task():
+        """Background task to archive audit log months past retention"""
+        from archive import audit_archiver
+        from supervisor import supervisor
+        
+        while True:
+            try:
+                with supervisor.iteration("audit_retention"):
+                    archived = await audit_archiver.run_retention()
+                    if archived > 0:
+                        logger.info(f"🗄️ Archived {archived} cold audit entries")
+                
+                # Months roll over slowly; check daily
+                await asyncio.sleep(86400)
+                
+            except Exception as e:
+                logger.error(f"Error in audit retention task: {e}")
+                await asyncio.sleep(3600)
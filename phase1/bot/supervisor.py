@@ -0,0 +1,218 @@
+"""
+Task Supervisor for Rahu Escrow Bot
+Named background tasks restarted with backoff, timed, and drained on shutdown
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SUPERVISOR_MIN_BACKOFF = 1.0  # seconds
+SUPERVISOR_MAX_BACKOFF = 300.0  # seconds
+SUPERVISOR_DRAIN_TIMEOUT = float(os.getenv("SUPERVISOR_DRAIN_TIMEOUT", "10"))
+SUPERVISOR_FAILED_KEPT = 50  # failed one-shot tasks remembered for /health
+
+class TaskStats:
+    """Liveness and loop timings of one supervised task"""
+
+    __slots__ = ("name", "state", "state_changed_at", "restart", "stall_after", "started_at", "restarts", "failures",
+                 "last_error", "iterations", "last_iteration_at", "last_iteration_seconds",
+                 "max_iteration_seconds", "total_iteration_seconds")
+
+    def __init__(self, name: str, restart: bool, stall_after: Optional[float]):
+        self.name = name
+        self.state = "starting"
+        self.state_changed_at = time.monotonic()
+        self.restart = restart
+        self.stall_after = stall_after
+        self.started_at: Optional[float] = None
+        self.restarts = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.iterations = 0
+        self.last_iteration_at: Optional[float] = None
+        self.last_iteration_seconds = 0.0
+        self.max_iteration_seconds = 0.0
+        self.total_iteration_seconds = 0.0
+
+    @property
+    def alive(self) -> bool:
+        """Running, and (when a stall window is set) finished an iteration recently"""
+        if self.state != "running":
+            return self.state in ("done", "standby")
+        if self.stall_after is None:
+            return True
+        last = max(self.last_iteration_at or 0.0, self.state_changed_at)
+        return time.monotonic() - last < self.stall_after
+
+    def set_state(self, state: str):
+        if state != self.state:
+            self.state = state
+            self.state_changed_at = time.monotonic()
+
+    def record_iteration(self, seconds: float):
+        self.iterations += 1
+        self.last_iteration_at = time.monotonic()
+        self.last_iteration_seconds = seconds
+        self.max_iteration_seconds = max(self.max_iteration_seconds, seconds)
+        self.total_iteration_seconds += seconds
+
+    def snapshot(self) -> Dict:
+        now = time.monotonic()
+        return {
+            "state": self.state,
+            "alive": self.alive,
+            "uptime_seconds": round(now - self.started_at, 1) if self.started_at and self.state == "running" else 0,
+            "restarts": self.restarts,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "iterations": self.iterations,
+            "seconds_since_iteration": round(now - self.last_iteration_at, 1) if self.last_iteration_at else None,
+            "last_iteration_ms": round(self.last_iteration_seconds * 1000, 2),
+            "max_iteration_ms": round(self.max_iteration_seconds * 1000, 2),
+            "avg_iteration_ms": round(self.total_iteration_seconds / self.iterations * 1000, 2) if self.iterations else 0
+        }
+
+class TaskSupervisor:
+    """Owns every long-running task so none is lost, silently dead, or left running at exit"""
+
+    def __init__(self, min_backoff: float = SUPERVISOR_MIN_BACKOFF, max_backoff: float = SUPERVISOR_MAX_BACKOFF,
+                 drain_timeout: float = SUPERVISOR_DRAIN_TIMEOUT):
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.drain_timeout = drain_timeout
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.task_stats: Dict[str, TaskStats] = {}
+        # Failed one-shots leave task_stats (they are not a service that is down) but stay visible here
+        self.failed_one_shots: Dict[str, TaskStats] = OrderedDict()
+        self.stopping = False
+
+    def spawn(self, name: str, factory: Callable[[], Awaitable], restart: bool = True,
+              stall_after: Optional[float] = None) -> Optional[asyncio.Task]:
+        """Run factory() under supervision; with restart, crashes and early exits start it again
+
+        stall_after marks the task not alive when no iteration() completes for that many seconds.
+        """
+        if self.stopping:
+            logger.warning(f"Not starting task {name}: supervisor is shutting down")
+            return None
+
+        existing = self.tasks.get(name)
+        if existing and not existing.done():
+            return existing
+
+        stats = TaskStats(name, restart, stall_after)
+        self.task_stats[name] = stats
+        task = asyncio.create_task(self._supervise(stats, factory), name=name)
+        self.tasks[name] = task
+        task.add_done_callback(lambda finished: self._forget(name, finished))
+        return task
+
+    def _forget(self, name: str, task: asyncio.Task):
+        # One-shot tasks leave no entry behind once finished; failures are kept apart
+        if self.tasks.get(name) is task:
+            del self.tasks[name]
+            stats = self.task_stats.get(name)
+            if stats and not stats.restart:
+                del self.task_stats[name]
+                if stats.state == "failed":
+                    self.failed_one_shots.pop(name, None)
+                    self.failed_one_shots[name] = stats
+                    while len(self.failed_one_shots) > SUPERVISOR_FAILED_KEPT:
+                        self.failed_one_shots.popitem(last=False)
+
+    async def _supervise(self, stats: TaskStats, factory: Callable[[], Awaitable]):
+        backoff = self.min_backoff
+        while True:
+            stats.set_state("running")
+            stats.started_at = time.monotonic()
+            try:
+                await factory()
+                if not stats.restart or self.stopping:
+                    stats.set_state("done")
+                    return
+                logger.warning(f"⚠️ Task {stats.name} exited unexpectedly")
+            except asyncio.CancelledError:
+                stats.set_state("stopped")
+                raise
+            except Exception as e:
+                stats.failures += 1
+                stats.last_error = f"{type(e).__name__}: {e}"
+                logger.error(f"Task {stats.name} crashed: {e}", exc_info=True)
+                if not stats.restart or self.stopping:
+                    stats.set_state("failed")
+                    return
+
+            # A task that ran healthily for a while starts over from the minimum delay
+            if time.monotonic() - stats.started_at > self.max_backoff:
+                backoff = self.min_backoff
+
+            stats.set_state("backoff")
+            logger.info(f"🔁 Restarting task {stats.name} in {backoff:.0f}s")
+            try:
+                await asyncio.sleep(backoff)
+            except asyncio.CancelledError:
+                stats.set_state("stopped")
+                raise
+            backoff = min(backoff * 2, self.max_backoff)
+            stats.restarts += 1
+
+    @contextmanager
+    def iteration(self, name: str):
+        """Time one loop iteration of a supervised task; also serves as its heartbeat"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats = self.task_stats.get(name)
+            if stats:
+                stats.record_iteration(time.perf_counter() - started)
+
+    def set_state(self, name: str, state: str):
+        """Let a task report a sub-state, e.g. "standby" while another replica leads"""
+        stats = self.task_stats.get(name)
+        if stats:
+            stats.set_state(state)
+
+    def is_alive(self, name: str) -> bool:
+        stats = self.task_stats.get(name)
+        return bool(stats and stats.alive)
+
+    def stats(self) -> Dict[str, Dict]:
+        return {name: stats.snapshot() for name, stats in sorted(self.task_stats.items())}
+
+    def failed_stats(self) -> Dict[str, Dict]:
+        """Recently failed one-shot tasks, oldest first"""
+        return {name: stats.snapshot() for name, stats in self.failed_one_shots.items()}
+
+    async def cancel(self, name: str, timeout: Optional[float] = None):
+        """Stop one task and wait for it to finish"""
+        task = self.tasks.get(name)
+        if task:
+            await self._drain([task], self.drain_timeout if timeout is None else timeout)
+        self.task_stats.pop(name, None)
+
+    async def shutdown(self, timeout: Optional[float] = None):
+        """Cancel every task and wait for them up to the drain deadline"""
+        self.stopping = True
+        pending = await self._drain(list(self.tasks.values()), self.drain_timeout if timeout is None else timeout)
+        if pending:
+            logger.warning(f"⚠️ {len(pending)} tasks still running after drain: {sorted(t.get_name() for t in pending)}")
+        logger.info("🛑 Stopped task supervisor")
+
+    async def _drain(self, tasks, timeout: float):
+        for task in tasks:
+            task.cancel()
+        if not tasks:
+            return set()
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        return pending
+
+# Global task supervisor
+supervisor = TaskSupervisor()
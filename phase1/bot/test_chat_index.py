@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test script for the chat → group → current deal index behind /buyer, /seller and balance checks
+"""
+
+import asyncio
+import logging
+
+from pymongo import ReturnDocument
+
+import state
+import transitions
+from state import ChatDealIndex, DealManager, GroupLifecycleManager
+from transitions import StateMachine
+from events import GroupBound
+from models import Group, GroupSummary, GroupStatus
+
+logging.basicConfig(level=logging.WARNING)
+
+class GroupStore:
+    """In-memory groups collection counting lookups"""
+
+    def __init__(self, groups):
+        self.groups = {group.id: group.model_dump() for group in groups}
+        self.queries = 0
+
+    async def get_bound_groups(self):
+        self.queries += 1
+        return [GroupSummary(group) for group in self.groups.values() if group["telegram_chat_id"] is not None]
+
+    async def get_group_summary_by_chat(self, chat_id):
+        self.queries += 1
+        group = next((group for group in self.groups.values() if group["telegram_chat_id"] == chat_id), None)
+        return GroupSummary(group) if group else None
+
+    async def get_group_summary_by_number(self, group_number):
+        group = next((group for group in self.groups.values() if group["group_number"] == group_number), None)
+        return GroupSummary(group) if group else None
+
+    async def find_one_and_update(self, query, update, sort=None, return_document=None, session=None):
+        """The state machine's compare-and-set writes, on exact or $in matches"""
+        for group in sorted(self.groups.values(), key=lambda group: group["group_number"]):
+            if all(group.get(field) in (condition["$in"] if isinstance(condition, dict) else [condition])
+                   for field, condition in query.items()):
+                before = dict(group)
+                group.update(update["$set"])
+                return before if return_document == ReturnDocument.BEFORE else dict(group)
+        return None
+
+class WriteSink:
+    """Deals and outbox events, written and forgotten"""
+
+    def __init__(self):
+        self.documents = []
+
+    async def insert_one(self, document, session=None):
+        self.documents.append(document)
+
+    async def insert_many(self, documents, session=None):
+        self.documents.extend(documents)
+
+async def test_chat_index():
+    print("🧪 Testing Chat Deal Index...")
+    print("=" * 60)
+
+    groups = [Group(group_number=n, telegram_chat_id=-1000 - n) for n in range(1, 51)]
+    groups.append(Group(group_number=51))  # Not bound to a chat yet
+    store = GroupStore(groups)
+    index = ChatDealIndex(store=store)
+    # The lifecycle maintains the module-level index against the module-level store
+    state.db_manager, state.chat_index = store, index
+    outbox = WriteSink()
+    store.db = {"groups": store, "deals": WriteSink(), "outbox": outbox}
+    transitions.state_machine = StateMachine(store=store)
+    transitions.state_machine.transactions = False  # standalone store: writes applied in order
+
+    await index.load()
+    assert len(index.chat_groups) == 50
+    print("✅ 50 bound group chats indexed at startup")
+
+    # A new deal is visible to the chat immediately, with no query
+    group = await GroupLifecycleManager.assign_group()
+    deal = await DealManager.create_deal(4242, group)
+    queries = store.queries
+    for _ in range(10_000):
+        assert await index.resolve_deal(-1001) == deal.id
+    assert store.queries == queries
+    print("✅ 10,000 chat → deal resolutions served from memory")
+
+    # Lifecycle resets clear the current deal
+    await GroupLifecycleManager.transition_group_status(groups[0].id, GroupStatus.COOLDOWN, current_deal_id=None)
+    assert await index.resolve_deal(-1001) is None
+    print("✅ Group lifecycle keeps the index current")
+
+    # Unknown chats are looked up once, then remembered as misses
+    queries = store.queries
+    for _ in range(100):
+        assert await index.resolve_deal(12345) is None
+    assert store.queries == queries + 1
+    print("✅ Non-escrow chats cost one lookup per miss window")
+
+    # A chat bound after startup is picked up on first use
+    store.groups[groups[50].id].update(telegram_chat_id=-1051, current_deal_id="deal-51")
+    assert await index.resolve_deal(-1051) == "deal-51"
+    assert index.group_for_chat(-1051) == groups[50].id
+    print("✅ Late-bound chat resolved and cached")
+
+    # /bind writes the chat onto the group and routes it with no lookup
+    group = await GroupLifecycleManager.assign_group()
+    deal = await DealManager.create_deal(4343, group)
+    store.groups[group.id]["telegram_chat_id"] = None
+    index.forget(-1000 - group.group_number, group.id)
+    assert await GroupLifecycleManager.bind_chat(group.group_number, -2002) is None
+    assert store.groups[group.id]["telegram_chat_id"] == -2002
+    queries = store.queries
+    assert await index.resolve_deal(-2002) == deal.id
+    assert store.queries == queries
+    assert any(document["type"] == "GroupBound" for document in outbox.documents)
+    print("✅ /bind stored the chat and indexed it")
+
+    # Another replica drops what it knew and looks the chat up on first use
+    replica = ChatDealIndex(store=store)
+    await replica.resolve_deal(-2003)
+    replica.chat_groups[-1000 - group.group_number] = group.id
+    await replica.apply_event(GroupBound(group_id=group.id, group_number=group.group_number, chat_id=-2003))
+    store.groups[group.id]["telegram_chat_id"] = -2003
+    assert await replica.resolve_deal(-2003) == deal.id
+    assert -1000 - group.group_number not in replica.chat_groups
+    print("✅ GroupBound refreshed another replica's index")
+
+    # A chat already bound elsewhere is refused
+    assert await GroupLifecycleManager.bind_chat(groups[0].group_number, -2003)
+    assert await GroupLifecycleManager.bind_chat(999, -3000)
+    print("✅ Rebinding a bound chat and unknown groups refused")
+
+    print("\n✨ Chat Deal Index Test Complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    asyncio.run(test_chat_index())
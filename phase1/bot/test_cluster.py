@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Test script for replica coordination: singleton leases, address sharding and failover
+"""
+
+import asyncio
+import logging
+from collections import Counter
+
+from pymongo.errors import DuplicateKeyError
+
+from cluster import ReplicaCoordinator
+from models import NetworkType
+from monitoring import BlockScanMonitor
+from supervisor import TaskSupervisor
+
+logging.basicConfig(level=logging.CRITICAL)
+
+def matches(document, query) -> bool:
+    for field, condition in query.items():
+        if field == "$or":
+            if not any(matches(document, option) for option in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = document.get(field)
+            if value is None:
+                return False
+            if "$lte" in condition and not value <= condition["$lte"]:
+                return False
+            if "$gt" in condition and not value > condition["$gt"]:
+                return False
+        elif isinstance(document.get(field), list):
+            if condition not in document[field]:
+                return False
+        elif document.get(field) != condition:
+            return False
+    return True
+
+class Collection:
+    """Enough of a Motor collection for leases and replica heartbeats"""
+
+    def __init__(self):
+        self.documents = {}
+
+    async def create_index(self, *args, **kwargs):
+        pass
+
+    async def update_one(self, query, update, upsert=False):
+        document = self.documents.get(query["_id"])
+        if document is not None and matches(document, query):
+            document.update(update["$set"])
+        elif document is not None and upsert:
+            raise DuplicateKeyError("E11000 duplicate key error")
+        elif upsert:
+            self.documents[query["_id"]] = {"_id": query["_id"], **update["$set"]}
+
+    async def delete_one(self, query):
+        document = self.documents.get(query["_id"])
+        if document is not None and matches(document, query):
+            del self.documents[query["_id"]]
+
+    def find(self, query, projection=None):
+        documents = [dict(document) for document in self.documents.values() if matches(document, query)]
+
+        class Cursor:
+            async def to_list(self, length):
+                return documents
+        return Cursor()
+
+class Store:
+    def __init__(self):
+        self.db = type("DB", (), {"replicas": Collection(), "leases": Collection()})()
+
+class Cursors:
+    """block_cursors kept by the store, shared by every replica"""
+
+    def __init__(self, **heights):
+        self.heights = heights
+
+    async def get_block_cursor(self, network):
+        return self.heights.get(network)
+
+    async def save_block_cursor(self, network, height):
+        self.heights[network] = max(self.heights.get(network, height), height)
+
+class Chain:
+    """Block source recording which replica scanned each height"""
+
+    def __init__(self, head):
+        self.head = head
+        self.scanned = []
+        self.scanner = None
+
+    async def get_head(self, session):
+        return self.head
+
+    async def get_credits(self, session, height):
+        self.scanned.append((self.scanner, height))
+        return []
+
+async def test_cluster():
+    print("🧪 Testing Replica Coordination...")
+    print("=" * 60)
+
+    store = Store()
+    replicas = [ReplicaCoordinator(store, f"replica-{name}", ttl=0.3, supervisor=TaskSupervisor()) for name in "ABC"]
+    rebalances = Counter()
+    for replica in replicas:
+        replica.on_rebalance(lambda replica=replica: asyncio.sleep(0, rebalances.update([replica.replica_id])))
+        await replica.start()
+    await asyncio.sleep(0.25)
+    assert all(len(replica.ring.members) == 3 for replica in replicas)
+    print("✅ 3 replicas joined; every ring agrees on membership")
+
+    # Every address has exactly one owner, spread roughly evenly
+    addresses = [f"BTC:bc1qaddress{i:05d}" for i in range(3000)]
+    owners = {}
+    for address in addresses:
+        owning = [replica.replica_id for replica in replicas if replica.owns(address)]
+        assert len(owning) == 1, (address, owning)
+        owners[address] = owning[0]
+    shares = Counter(owners.values())
+    assert all(600 < count < 1400 for count in shares.values()), shares
+    print(f"✅ 3000 addresses sharded with one owner each: {dict(sorted(shares.items()))}")
+
+    # Singleton job: runs on exactly one replica
+    running = Counter()
+    async def group_reset(replica_id):
+        running[replica_id] += 1
+        try:
+            await asyncio.Event().wait()
+        finally:
+            running[replica_id] -= 1
+
+    for replica in replicas:
+        replica.supervisor.spawn("group_reset", lambda replica=replica: replica.run_as_leader(
+            "group_reset", lambda: group_reset(replica.replica_id)))
+    await asyncio.sleep(0.2)
+    leaders = [replica_id for replica_id, count in running.items() if count]
+    assert len(leaders) == 1 and sum(running.values()) == 1, running
+    print(f"✅ Singleton job running on one replica only ({leaders[0]})")
+
+    # The leader dies without releasing anything: its lease and membership expire
+    leader = next(replica for replica in replicas if replica.replica_id == leaders[0])
+    survivors = [replica for replica in replicas if replica is not leader]
+    for task in list(leader.supervisor.tasks.values()):
+        task.cancel()
+    await asyncio.sleep(0.05)
+    running[leader.replica_id] = 0  # Its process is gone
+    leader.leases.clear()
+
+    await asyncio.sleep(0.7)
+    new_leaders = [replica_id for replica_id, count in running.items() if count]
+    assert len(new_leaders) == 1 and new_leaders[0] != leader.replica_id, running
+    print(f"✅ Lease taken over by {new_leaders[0]} after the TTL")
+
+    # Survivors rebalance: the dead replica's addresses move, the rest stay put
+    assert all(replica.ring.members == {survivor.replica_id for survivor in survivors} for replica in survivors)
+    moved = 0
+    for address in addresses:
+        owning = [replica.replica_id for replica in survivors if replica.owns(address)]
+        assert len(owning) == 1, (address, owning)
+        if owners[address] != leader.replica_id:
+            assert owning[0] == owners[address], "only the dead replica's keys may move"
+        else:
+            moved += 1
+    assert all(rebalances[replica.replica_id] >= 2 for replica in survivors), rebalances
+    print(f"✅ Rebalanced on failure: {moved} addresses moved, none of the survivors' own")
+
+    # Roles ride on the heartbeat, so a process can see who else serves webhooks
+    first, second = survivors
+    first.roles.add("webhooks")
+    await first.heartbeat()
+    assert await second.members_with("webhooks") == [first.replica_id]
+    assert await first.members_with("webhooks") == []
+    print("✅ Advertised roles visible to the other replicas")
+
+    for replica in survivors:
+        await replica.supervisor.shutdown(timeout=1)
+        await replica.stop()
+    # Only the dead replica's documents remain, left for the TTL index to remove
+    survivor_ids = {replica.replica_id for replica in survivors}
+    assert not survivor_ids & set(store.db.replicas.documents)
+    assert not any(lease["holder"] in survivor_ids for lease in store.db.leases.documents.values())
+    print("✅ Clean shutdown released leases and membership")
+
+    print("\n✨ Replica Coordination Test Complete!")
+    print("=" * 60)
+
+async def test_block_cursor():
+    print("\n🧪 Testing Block Cursor Takeover...")
+    print("=" * 60)
+
+    network = NetworkType.USDT_BEP20
+    cursors = Cursors(**{network.value: 100})
+    chain = Chain(head=105)
+    replicas = {name: BlockScanMonitor(sources={network: chain}, store=cursors) for name in "AB"}
+
+    async def lead(name, head):
+        """One lease term: follow the chain until it has caught up with head"""
+        chain.head, chain.scanner = head, name
+        monitor = replicas[name]
+        monitor.running = True
+        task = asyncio.create_task(monitor._follow_chain(None, network, chain))
+        while cursors.heights[network.value] < head:
+            await asyncio.sleep(0.01)
+        monitor.running = False
+        task.cancel()
+
+    await lead("A", 105)
+    assert chain.scanned == [("A", height) for height in range(101, 106)]
+    print("✅ First leader resumed from the stored cursor")
+
+    # A's lease passes to B, which picks up where A stopped
+    await lead("B", 110)
+    assert chain.scanned[5:] == [("B", height) for height in range(106, 111)]
+
+    # And back to A, whose own memory of the chain is stale by now
+    await lead("A", 112)
+    assert chain.scanned[10:] == [("A", 111), ("A", 112)]
+    assert [height for _, height in chain.scanned] == list(range(101, 113))
+    print("✅ Every block scanned once across two lease handovers")
+
+    print("\n✨ Block Cursor Test Complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    asyncio.run(test_cluster())
+    asyncio.run(test_block_cursor())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the runtime config cache: God Mode edits go live without per-message reads
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+
+from pymongo.errors import PyMongoError
+
+import ui
+from config import ConfigCache
+from ui import LuxuryFormatter
+
+logging.basicConfig(level=logging.WARNING)
+
+class BotConfigCollection:
+    """In-memory bot_config on a standalone server (no change streams), counting reads"""
+
+    def __init__(self):
+        self.documents = {}
+        self.reads = 0
+
+    def save(self, config_type: str, **fields):
+        """Same update the backend's God Mode endpoints issue"""
+        document = self.documents.setdefault(config_type, {"type": config_type, "version": 0})
+        document.update(fields, updated_at=datetime.utcnow())
+        document["version"] += 1
+
+    def find(self, query, projection=None):
+        self.reads += 1
+        documents = [dict(document) for document in self.documents.values()]
+
+        class Cursor:
+            async def to_list(self, length):
+                return documents
+        return Cursor()
+
+    def watch(self):
+        raise PyMongoError("The $changeStream stage is only supported on replica sets")
+
+class Store:
+    def __init__(self, collection):
+        self.db = type("DB", (), {"bot_config": collection})()
+
+async def test_config_cache():
+    print("🧪 Testing Runtime Config Cache...")
+    print("=" * 60)
+
+    collection = BotConfigCollection()
+    cache = ConfigCache(store=Store(collection), poll_interval=0.2)
+    # Formatters read through ui's module-level cache
+    ui.config_cache = cache
+
+    await cache.start()
+    try:
+        default_rules = LuxuryFormatter.format_rules_message()
+        assert "5%" in default_rules
+        print("✅ Built-in messages served before any God Mode edit")
+
+        # Rendering must not touch the database
+        reads = collection.reads
+        for _ in range(10_000):
+            LuxuryFormatter.format_error_message("invalid_address", "BTC")
+            LuxuryFormatter.format_rules_message()
+        assert collection.reads - reads <= 1, collection.reads - reads
+        print("✅ 20,000 renders with no per-message reads")
+
+        # Edit fees and messages the way the backend does, then time until live
+        started = time.perf_counter()
+        collection.save("fees", networks=[{"network": "BTC", "fee_percentage": 2.5, "gas_deduction": 0.0001}])
+        collection.save("messages", welcome_message="Hello {user_name}", rules_message="",
+                        error_messages={"invalid_address": "Wrong {network} address"})
+
+        while LuxuryFormatter.format_error_message("invalid_address", "BTC") != "Wrong BTC address":
+            assert time.perf_counter() - started < 1.0, "edit not live within a second"
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - started
+
+        assert LuxuryFormatter.format_welcome_message("Ada") == "Hello Ada"
+        assert "2.5%" in LuxuryFormatter.format_rules_message()
+        print(f"✅ God Mode edit live after {elapsed * 1000:.0f} ms (version polling)")
+
+    finally:
+        await cache.stop()
+
+    print("\n✨ Runtime Config Cache Test Complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    asyncio.run(test_config_cache())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for deposit confirmation checks: only a final, successful deposit to
+the escrow address moves a deal from Funding Seen to Funded
+"""
+
+import asyncio
+import logging
+from decimal import Decimal
+
+import confirmations
+from blockchain import CONFIRMATION_THRESHOLDS, pays_address
+from confirmations import ConfirmationTracker
+from models import NetworkType
+
+logging.basicConfig(level=logging.WARNING)
+
+ESCROW = "0x1111111111111111111111111111111111111111"
+OTHER = "0x2222222222222222222222222222222222222222"
+
+class ChainAPI:
+    """Recorded explorer answers: recent transactions and per-hash status"""
+
+    def __init__(self, transactions, statuses):
+        self.transactions = transactions
+        self.statuses = statuses
+
+    async def get_transactions(self, network, address, limit=10):
+        return self.transactions[:limit]
+
+    async def check_transaction(self, network, tx_hash, address=None):
+        return self.statuses[tx_hash]
+
+class Deals:
+    """State machine calls the tracker makes, recorded"""
+
+    def __init__(self):
+        self.hashes = []
+        self.funded = []
+
+    async def update_deal(self, deal_id, updates, statuses, match=None):
+        self.hashes.append(updates["transaction_hash"])
+        return updates
+
+    async def transition_deal(self, deal_id, new_status, updates=None, group_status=None, events=()):
+        self.funded.extend(events)
+        return updates
+
+def track(tracker, amount=1.0):
+    """A deposit seen on the escrow address, hash not yet known"""
+    entry = {"deal_id": "deal-1", "network": NetworkType.ETH, "address": ESCROW, "tx_hash": None, "amount": amount}
+    tracker.pending[entry["deal_id"]] = entry
+    return entry
+
+def status(to=ESCROW, amount="1.0", confirmed=True, failed=False):
+    final = CONFIRMATION_THRESHOLDS[NetworkType.ETH]
+    return {"confirmed": confirmed, "failed": failed, "confirmations": final, "to": to, "amount": Decimal(amount)}
+
+async def test_confirmations():
+    print("🧪 Testing Deposit Confirmations...")
+    print("=" * 60)
+
+    deals = Deals()
+    confirmations.state_machine = deals
+    tracker = ConfirmationTracker()
+
+    # Incoming transactions only, on every provider's record format
+    assert pays_address(NetworkType.BTC, {"tx_hash": "a", "tx_output_n": 0}, "1Escrow")
+    assert not pays_address(NetworkType.BTC, {"tx_hash": "a", "tx_input_n": 0, "tx_output_n": -1}, "1Escrow")
+    assert pays_address(NetworkType.ETH, {"hash": "a", "to": ESCROW.upper().replace("0X", "0x")}, ESCROW)
+    assert not pays_address(NetworkType.ETH, {"hash": "a", "to": OTHER}, ESCROW)
+    print("✅ Deposits told apart from spends")
+
+    # The newest transaction is a spend from the escrow; the deposit before it is chosen
+    api = ChainAPI(
+        [{"hash": "out", "from": ESCROW, "to": OTHER}, {"hash": "in", "from": OTHER, "to": ESCROW}],
+        {"in": status()}
+    )
+    deposit = track(tracker)
+    await tracker._check_entry(api, deposit)
+    assert deals.hashes == ["in"] and len(deals.funded) == 1
+    assert deals.funded[0].tx_hash == "in"
+    print("✅ Missing hash resolved to the incoming deposit, then funded")
+
+    # Enough confirmations but a reverted receipt, a transfer elsewhere, or a short amount never fund
+    for rejected in (status(confirmed=False, failed=True), status(to=OTHER), status(amount="0.5")):
+        deals.funded.clear()
+        api = ChainAPI([{"hash": "in", "to": ESCROW}], {"in": rejected})
+        deposit = track(tracker)
+        await tracker._check_entry(api, deposit)
+        assert not deals.funded
+        assert deposit["tx_hash"] is None and deposit["rejected"] == {"in"}
+        assert tracker.pending["deal-1"] is deposit
+
+        # Ruled out for good: the next check finds nothing new to follow
+        await tracker._check_entry(api, deposit)
+        assert not deals.funded and deposit["tx_hash"] is None
+    print("✅ Reverted, misdirected and short deposits left in Funding Seen")
+
+    # Mined but not yet final waits for more confirmations
+    deals.funded.clear()
+    api = ChainAPI([{"hash": "in", "to": ESCROW}], {"in": {**status(confirmed=False), "confirmations": 2}})
+    deposit = track(tracker)
+    await tracker._check_entry(api, deposit)
+    assert not deals.funded and deposit["tx_hash"] == "in"
+    print("✅ Deposits below the threshold rescheduled")
+
+    print("\n✨ Deposit Confirmation Test Complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    asyncio.run(test_confirmations())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Test script for the outbox event bus: at-least-once delivery, retries, failover and broadcast caches
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import events
+from events import DealFunded, EventBus, GroupExpired
+from supervisor import TaskSupervisor
+
+logging.basicConfig(level=logging.CRITICAL)
+
+def matches(document, query) -> bool:
+    for field, condition in query.items():
+        value = document.get(field)
+        if isinstance(condition, dict):
+            if value is None:
+                return False
+            if "$lte" in condition and not value <= condition["$lte"]:
+                return False
+            if "$gt" in condition and not value > condition["$gt"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+def apply(document, update):
+    document.update(update.get("$set", {}))
+    for field, amount in update.get("$inc", {}).items():
+        document[field] = document.get(field, 0) + amount
+    for field, values in update.get("$addToSet", {}).items():
+        document[field] = document[field] + [value for value in values["$each"] if value not in document[field]]
+
+class Outbox:
+    """Enough of a Motor collection for the outbox, shared by every replica"""
+
+    def __init__(self):
+        self.documents = {}
+
+    async def create_index(self, *args, **kwargs):
+        pass
+
+    async def insert_many(self, documents, session=None):
+        for document in documents:
+            self.documents[document["_id"]] = dict(document)
+
+    def find(self, query):
+        documents = [dict(document) for document in self.documents.values() if matches(document, query)]
+
+        class Cursor:
+            def sort(self, field, direction):
+                documents.sort(key=lambda document: document[field])
+                return self
+
+            async def to_list(self, length):
+                return documents
+        return Cursor()
+
+    async def find_one_and_update(self, query, update, sort=None, return_document=None):
+        candidates = sorted((document for document in self.documents.values() if matches(document, query)),
+                            key=lambda document: document[sort[0][0]])
+        if not candidates:
+            return None
+        apply(candidates[0], update)
+        return dict(candidates[0])
+
+    async def update_one(self, query, update):
+        apply(self.documents[query["_id"]], update)
+
+    async def count_documents(self, query):
+        return sum(1 for document in self.documents.values() if matches(document, query))
+
+class Store:
+    def __init__(self, outbox):
+        self.db = type("DB", (), {"outbox": outbox})()
+
+async def settle(outbox, timeout: float = 5.0):
+    started = time.perf_counter()
+    while await outbox.count_documents({"dispatched_at": None}):
+        assert time.perf_counter() - started < timeout, "outbox not drained"
+        await asyncio.sleep(0.01)
+
+def funded(n: int) -> DealFunded:
+    return DealFunded(deal_id=f"deal-{n}", network="BTC", escrow_address=f"bc1-{n}", amount=0.1,
+                      tx_hash=None, confirmations=3)
+
+async def test_events():
+    print("🧪 Testing Outbox Event Bus...")
+    print("=" * 60)
+
+    outbox = Outbox()
+    audited = Counter()
+    notified = Counter()
+    failures = Counter()
+    cached = {"replica-a": set(), "replica-b": set()}
+    delivered_at = {}
+
+    async def audit(event):
+        audited[event.id] += 1
+        delivered_at.setdefault(event.id, time.perf_counter())
+
+    async def notify(event):
+        # Telegram is down for the first two attempts at every event
+        failures[event.id] += 1
+        if failures[event.id] <= 2:
+            raise RuntimeError("Telegram unavailable")
+        notified[event.id] += 1
+
+    def cache_for(seen):
+        async def cache(event):
+            seen.add(event.id)
+        return cache
+
+    buses = []
+    for replica in cached:
+        bus = EventBus(store=Store(outbox), replica_id=replica, poll_interval=0.5, retry_delay=0.01,
+                       supervisor=TaskSupervisor(min_backoff=0.01))
+        bus.subscribe("audit", audit)
+        bus.subscribe("notifier", notify, DealFunded)
+        bus.subscribe("cache", cache_for(cached[replica]), broadcast=True)
+        buses.append(bus)
+        await bus.start()
+    a, b = buses
+
+    try:
+        # Published events reach the durable subscribers once, without waiting for a poll
+        published = {}
+        for n in range(20):
+            event = funded(n)
+            published[event.id] = time.perf_counter()
+            await a.publish(event)
+        await settle(outbox)
+
+        assert set(audited) == set(published) and set(audited.values()) == {1}
+        lag = max(delivered_at[event_id] - published[event_id] for event_id in published)
+        assert lag < 0.25, lag
+        print(f"✅ 20 events audited exactly once across 2 replicas (max lag {lag * 1000:.0f} ms)")
+
+        # Failed subscribers are retried alone; the ones that succeeded are not called again
+        assert set(notified.values()) == {1} and len(notified) == 20
+        assert set(audited.values()) == {1}
+        print("✅ Notifier retried through 2 failures per event; audit not redelivered")
+
+        # Every dispatching replica's caches see every event
+        await asyncio.sleep(0.6)
+        assert cached["replica-a"] == cached["replica-b"] == set(published)
+        print("✅ Broadcast cache subscribers updated on both replicas")
+
+        # An event claimed by a replica that died mid-delivery is picked up once its claim lapses
+        orphan = GroupExpired(group_id="group-7", group_number=7)
+        document = orphan.document()
+        document.update(attempts=1, claimed_by="replica-dead", available_at=datetime.utcnow() - timedelta(seconds=1))
+        await outbox.insert_many([document])
+        await settle(outbox)
+        assert audited[orphan.id] == 1 and orphan.id not in notified
+        print("✅ Orphaned claim delivered by a surviving replica")
+
+        # A subscriber that never succeeds is dead-lettered instead of retried forever
+        events.OUTBOX_MAX_ATTEMPTS = 3
+
+        async def broken(event):
+            raise RuntimeError("always fails")
+
+        a.subscribe("broken", broken, GroupExpired)
+        b.subscribe("broken", broken, GroupExpired)
+        poisoned = GroupExpired(group_id="group-8", group_number=8)
+        await a.publish(poisoned)
+        await settle(outbox)
+        stored = outbox.documents[poisoned.id]
+        assert stored["failed"] == ["broken"] and stored["delivered"] == ["audit"]
+        assert a.dead_lettered + b.dead_lettered == 1
+        assert await a.backlog() == 0
+        print(f"✅ Poison event dead-lettered after {stored['attempts']} attempts")
+
+    finally:
+        for bus in buses:
+            await bus.stop()
+
+    print("\n✨ Outbox Event Bus Test Complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    asyncio.run(test_events())
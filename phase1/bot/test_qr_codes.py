@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for escrow QR codes: payment URIs, off-loop rendering and caching
+"""
+
+import asyncio
+import threading
+
+import qr
+from qr import QRRenderer, payment_uri
+from models import NetworkType
+
+async def test_qr_codes():
+    print("🧪 Testing Escrow QR Codes...")
+    print("=" * 60)
+
+    # Payment URIs wallets can prefill from
+    assert payment_uri(NetworkType.BTC, "bc1qtest", 0.05) == "bitcoin:bc1qtest?amount=0.05"
+    assert payment_uri(NetworkType.LTC, "Ltest") == "litecoin:Ltest"
+    assert payment_uri(NetworkType.ETH, "0xabc", 1.5) == "ethereum:0xabc?value=1500000000000000000"
+    assert payment_uri(NetworkType.USDT_BEP20, "0xabc", 25) == \
+        "ethereum:0x55d398326f99059fF775485246999027B3197955@56/transfer?address=0xabc&uint256=25000000000000000000"
+    assert payment_uri(NetworkType.USDT_TRC20, "TXtest", 25) == "TXtest"
+    print("✅ BIP21 / EIP-681 payment URIs")
+
+    renderer = QRRenderer(max_size=2)
+    threads = set()
+    render_png = qr.render_png
+    def tracked(data):
+        threads.add(threading.current_thread().name)
+        return render_png(data)
+    qr.render_png = tracked
+
+    try:
+        # Concurrent presses share one render, done in the pool
+        images = await asyncio.gather(*(renderer.render(NetworkType.BTC, "bc1qtest", 0.05) for _ in range(10)))
+        assert renderer.renders == 1 and all(image is images[0] for image in images)
+        assert images[0].png.startswith(b"\x89PNG") and images[0].photo == images[0].png
+        assert threads and all(name.startswith("qr-render") for name in threads), threads
+        print(f"✅ 10 concurrent presses, 1 render off the event loop ({len(images[0].png)} B PNG)")
+
+        # Once Telegram has it, only the file_id is sent
+        renderer.remember_file_id("bc1qtest", 0.05, "AgACAgQAAxkBAAI")
+        image = await renderer.render(NetworkType.BTC, "bc1qtest", 0.05)
+        assert image.photo == "AgACAgQAAxkBAAI" and image.png is None and renderer.renders == 1
+        print("✅ Repeat presses reuse Telegram's file_id")
+
+        # Size-bounded LRU
+        await renderer.render(NetworkType.ETH, "0xabc")
+        await renderer.render(NetworkType.BTC, "bc1qtest", 0.05)
+        await renderer.render(NetworkType.LTC, "Ltest")
+        assert list(renderer.cache) == [("bc1qtest", 0.05), ("Ltest", None)]
+        print("✅ Least recently used entry evicted")
+
+        # Pre-render at escrow creation warms the cache
+        renderer.prerender(NetworkType.USDT_TRC20, "TXtest")
+        await asyncio.sleep(0.5)
+        assert ("TXtest", None) in renderer.cache
+        print("✅ Pre-rendered on escrow creation")
+    finally:
+        qr.render_png = render_png
+        renderer.shutdown()
+
+    print("\n✨ Escrow QR Code Test Complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    asyncio.run(test_qr_codes())
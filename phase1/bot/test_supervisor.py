@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for the task supervisor: restarts with backoff, liveness, timings and drain
+"""
+
+import asyncio
+import logging
+import time
+
+from supervisor import TaskSupervisor
+
+logging.basicConfig(level=logging.CRITICAL)
+
+async def test_supervisor():
+    print("🧪 Testing Task Supervisor...")
+    print("=" * 60)
+
+    supervisor = TaskSupervisor(min_backoff=0.05, max_backoff=0.2, drain_timeout=0.5)
+
+    # A loop that crashes twice, then settles into timed iterations
+    starts = []
+    async def flaky_loop():
+        starts.append(time.monotonic())
+        if len(starts) <= 2:
+            raise RuntimeError(f"boom {len(starts)}")
+        while True:
+            with supervisor.iteration("flaky"):
+                await asyncio.sleep(0.01)
+
+    supervisor.spawn("flaky", flaky_loop, stall_after=1.0)
+    await asyncio.sleep(0.4)
+    stats = supervisor.stats()["flaky"]
+    assert stats["restarts"] == 2 and stats["failures"] == 2, stats
+    assert stats["last_error"] == "RuntimeError: boom 2"
+    assert starts[2] - starts[1] > starts[1] - starts[0], "backoff should grow"
+    assert supervisor.is_alive("flaky") and stats["iterations"] > 5
+    print(f"✅ Crashed task restarted twice with growing backoff, {stats['iterations']} iterations "
+          f"(avg {stats['avg_iteration_ms']} ms)")
+
+    # A task that stops iterating is reported dead
+    async def stuck():
+        with supervisor.iteration("stuck"):
+            pass
+        await asyncio.Event().wait()
+
+    supervisor.spawn("stuck", stuck, stall_after=0.1)
+    await asyncio.sleep(0.05)
+    assert supervisor.is_alive("stuck")
+    await asyncio.sleep(0.2)
+    assert not supervisor.is_alive("stuck")
+    print("✅ Stalled loop flagged not alive")
+
+    # One-shot tasks run once and leave nothing behind
+    ran = []
+    async def once():
+        ran.append(1)
+    supervisor.spawn("once", once, restart=False)
+    await asyncio.sleep(0.05)
+    assert ran == [1] and "once" not in supervisor.tasks and "once" not in supervisor.task_stats
+    print("✅ One-shot task tracked until done, then forgotten")
+
+    # A failed one-shot is kept apart: visible, but not a task that is down
+    async def broken_once():
+        raise ValueError("bad input")
+    supervisor.spawn("broken_once", broken_once, restart=False)
+    await asyncio.sleep(0.05)
+    assert "broken_once" not in supervisor.task_stats
+    failed = supervisor.failed_stats()["broken_once"]
+    assert failed["state"] == "failed" and failed["failures"] == 1 and failed["last_error"] == "ValueError: bad input"
+    print("✅ Failed one-shot task kept for health reporting")
+
+    # Every state change is timestamped, including the wait before a restart
+    async def crash_later():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("late")
+    slow = TaskSupervisor(min_backoff=1.0)
+    slow.spawn("crash_later", crash_later)
+    await asyncio.sleep(0.1)
+    stats = slow.task_stats["crash_later"]
+    assert stats.state == "backoff" and stats.state_changed_at > stats.started_at
+    await slow.shutdown(timeout=0.5)
+    assert stats.state == "stopped"
+    print("✅ Backoff and stop recorded with their own state change time")
+
+    # Drain: cooperative tasks finish, a stubborn one is abandoned at the deadline
+    cleaned = []
+    async def cooperative():
+        try:
+            await asyncio.Event().wait()
+        finally:
+            cleaned.append("cooperative")
+
+    released = asyncio.Event()
+    async def stubborn():
+        while not released.is_set():
+            try:
+                await released.wait()
+            except asyncio.CancelledError:
+                continue
+
+    supervisor.spawn("cooperative", cooperative)
+    supervisor.spawn("stubborn", stubborn)
+    await asyncio.sleep(0.01)
+    started = time.monotonic()
+    await supervisor.shutdown()
+    elapsed = time.monotonic() - started
+    assert cleaned == ["cooperative"] and 0.45 < elapsed < 1.0, elapsed
+    assert supervisor.spawn("late", once) is None
+    print(f"✅ Drained within the {supervisor.drain_timeout}s deadline ({elapsed:.2f}s), no spawns after shutdown")
+
+    released.set()
+    await supervisor.tasks["stubborn"]
+    print("\n✨ Task Supervisor Test Complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    asyncio.run(test_supervisor())
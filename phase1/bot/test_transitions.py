@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Test script for the deal state machine: compare-and-set transitions, races, retries and transactions
+"""
+
+import asyncio
+import copy
+import logging
+
+from pymongo import ReturnDocument
+from pymongo.errors import OperationFailure
+
+import state
+import transitions
+from state import DealManager, GroupLifecycleManager
+from transitions import StateMachine
+from events import DealFunded
+from models import Deal, Group, DealStatus, DealSummary, GroupStatus
+
+logging.basicConfig(level=logging.CRITICAL)
+
+BTC_BUYER = "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa"
+BTC_SELLER = "bc1qar0srrr7xfkvy5l643lydnw9re59gtzzwf5mdq"
+ETH_SELLER = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+
+def matches(document, query) -> bool:
+    for field, condition in query.items():
+        value = document.get(field)
+        if isinstance(condition, dict):
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+            if "$ne" in condition and value == condition["$ne"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+class Collection:
+    """Enough of a Motor collection for atomic find-and-modify"""
+
+    def __init__(self, documents=()):
+        self.documents = [dict(document) for document in documents]
+
+    def get(self, document_id):
+        return next(document for document in self.documents if document["id"] == document_id)
+
+    async def insert_one(self, document, session=None):
+        self.documents.append(dict(document))
+
+    async def insert_many(self, documents, session=None):
+        self.documents.extend(dict(document) for document in documents)
+
+    async def find_one_and_update(self, query, update, sort=None, return_document=None, session=None):
+        await asyncio.sleep(0)  # let racing writers interleave between operations
+        candidates = [document for document in self.documents if matches(document, query)]
+        if sort:
+            candidates.sort(key=lambda document: document[sort[0][0]])
+        if not candidates:
+            return None
+        before = dict(candidates[0])
+        candidates[0].update(update["$set"])
+        return before if return_document == ReturnDocument.BEFORE else dict(candidates[0])
+
+    async def update_one(self, query, update):
+        document = next((document for document in self.documents if matches(document, query)), None)
+        if document:
+            document.update(update.get("$set", {}))
+            for field in update.get("$unset", {}):
+                document.pop(field, None)
+        return type("UpdateResult", (), {"matched_count": int(document is not None)})()
+
+    async def delete_one(self, query):
+        self.documents = [document for document in self.documents if not matches(document, query)]
+
+class Session:
+    """Serialized snapshot/restore transactions; standalone servers refuse to start one"""
+
+    def __init__(self, client):
+        self.db = client.db
+        self.transactions = client.transactions
+        self.lock = client.lock
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def with_transaction(self, callback):
+        if not self.transactions:
+            raise OperationFailure("Transaction numbers are only allowed on a replica set member or mongos", 20)
+        async with self.lock:
+            snapshot = copy.deepcopy({name: collection.documents for name, collection in self.db.items()})
+            try:
+                return await callback(self)
+            except Exception:
+                for name, documents in snapshot.items():
+                    self.db[name].documents = documents
+                raise
+
+class Client:
+    def __init__(self, db, transactions: bool):
+        self.db = db
+        self.transactions = transactions
+        self.lock = asyncio.Lock()
+
+    async def start_session(self):
+        return Session(self)
+
+class Store:
+    def __init__(self, groups, transactions: bool = True):
+        self.db = {"groups": Collection(group.model_dump() for group in groups), "deals": Collection(),
+                   "outbox": Collection()}
+        self.client = Client(self.db, transactions)
+
+    async def get_deal_summary(self, deal_id):
+        deal = next((deal for deal in self.db["deals"].documents if deal["id"] == deal_id), None)
+        return DealSummary(deal) if deal else None
+
+    async def get_deal_by_id(self, deal_id):
+        deal = next((deal for deal in self.db["deals"].documents if deal["id"] == deal_id), None)
+        return Deal(**deal) if deal else None
+
+async def test_transitions():
+    print("🧪 Testing Deal State Machine...")
+    print("=" * 60)
+
+    store = Store([Group(group_number=n) for n in range(1, 4)])
+    machine = StateMachine(store=store)
+    # The lifecycle and deal managers reach the module-level machine and store
+    transitions.state_machine = machine
+    state.db_manager = store
+    groups, deals = store.db["groups"], store.db["deals"]
+
+    # Five users racing for three groups: no group is handed out twice
+    claimed = await asyncio.gather(*(GroupLifecycleManager.assign_group() for _ in range(5)))
+    claimed = [group for group in claimed if group]
+    assert sorted(group.group_number for group in claimed) == [1, 2, 3]
+    print("✅ 5 concurrent claims occupied 3 groups, none twice")
+
+    # A group holds one deal at a time
+    deal = await DealManager.create_deal(4242, claimed[0])
+    assert deal and await DealManager.create_deal(4243, claimed[0]) is None
+    assert len(deals.documents) == 1
+    assert groups.get(claimed[0].id)["current_deal_id"] == deal.id
+    print("✅ Second deal for an occupied group refused")
+
+    # Buyer and seller register at once: exactly one of them completes the pair
+    registered = await asyncio.gather(
+        DealManager.set_participant_address(deal.id, 1, BTC_BUYER, "buyer"),
+        DealManager.set_participant_address(deal.id, 2, BTC_SELLER, "seller")
+    )
+    assert all(updated for updated, _ in registered)
+    statuses = sorted(updated.status for updated, _ in registered)
+    assert statuses == [DealStatus.ADDRESSES_SET.value, DealStatus.PENDING.value], statuses
+    ready = next(updated for updated, _ in registered if updated.status == DealStatus.ADDRESSES_SET.value)
+    assert ready.buyer_address == BTC_BUYER and ready.seller_address == BTC_SELLER
+    print("✅ Concurrent registrations moved the deal to Addresses Set once")
+
+    # Addresses are locked once the pair is in; wrong networks are refused before that
+    updated, error = await DealManager.set_participant_address(deal.id, 2, BTC_BUYER, "seller")
+    assert updated is None and "locked" in error
+    other = await DealManager.create_deal(4244, claimed[1])
+    await DealManager.set_participant_address(other.id, 1, BTC_BUYER, "buyer")
+    updated, error = await DealManager.set_participant_address(other.id, 2, ETH_SELLER, "seller")
+    assert updated is None and "Network mismatch" in error
+    print("✅ Late and cross-network registrations refused")
+
+    # Until an escrow is saved, resending a registered address hands the deal back for another generation
+    retried, error = await DealManager.set_participant_address(deal.id, 2, BTC_SELLER, "seller")
+    assert error is None and retried.status == DealStatus.ADDRESSES_SET.value and not retried.escrow_address
+    print("✅ Resent address retries a failed escrow generation")
+
+    # Three escrow generations race: one wallet is saved, the group moves with it
+    results = await asyncio.gather(*(
+        machine.transition_deal(deal.id, DealStatus.ESCROW_GENERATED, {"escrow_address": f"escrow-{n}"},
+                                group_status=GroupStatus.ESCROW_CREATED)
+        for n in range(3)
+    ))
+    winners = [result for result in results if result]
+    assert len(winners) == 1
+    assert deals.get(deal.id)["escrow_address"] == winners[0]["escrow_address"]
+    assert groups.get(claimed[0].id)["status"] == GroupStatus.ESCROW_CREATED.value
+    print("✅ Racing escrow generations saved exactly one wallet")
+
+    # Moves the table does not allow are refused
+    assert await machine.transition_deal(deal.id, DealStatus.FUNDED) is None
+    assert await machine.transition_group(claimed[0].id, GroupStatus.AVAILABLE) is None
+    print("✅ Disallowed transitions refused")
+
+    # A repeated deposit report is a no-op, not an overwrite
+    assert await machine.transition_deal(deal.id, DealStatus.FUNDING_SEEN, {"amount": 0.5})
+    assert await machine.transition_deal(deal.id, DealStatus.FUNDING_SEEN, {"amount": 0.7}) is None
+    assert deals.get(deal.id)["amount"] == 0.5
+    print("✅ Retried funding report left the first sighting intact")
+
+    # Deal, group and outbox event change together or not at all
+    def funded():
+        return DealFunded(deal_id=deal.id, network="BTC", escrow_address="escrow", amount=0.5,
+                          tx_hash=None, confirmations=3)
+
+    outbox = store.db["outbox"]
+    published = len(outbox.documents)
+    groups.get(claimed[0].id)["status"] = GroupStatus.DISPUTED.value
+    assert await machine.transition_deal(deal.id, DealStatus.FUNDED, group_status=GroupStatus.FUNDED,
+                                         events=[funded()]) is None
+    assert deals.get(deal.id)["status"] == DealStatus.FUNDING_SEEN.value
+    assert len(outbox.documents) == published
+    groups.get(claimed[0].id)["status"] = GroupStatus.ESCROW_CREATED.value
+    assert await machine.transition_deal(deal.id, DealStatus.FUNDED, group_status=GroupStatus.FUNDED,
+                                         events=[funded()])
+    assert deals.get(deal.id)["status"] == groups.get(claimed[0].id)["status"] == "Funded"
+    assert outbox.documents[-1]["type"] == "DealFunded" and len(outbox.documents) == published + 1
+    assert machine.transactions is True
+    print("✅ Conflicting group rolled back deal and event; the retry applied all three")
+
+    # Standalone servers fall back to ordered writes, undone when a later one conflicts
+    store.client.transactions = False
+    fallback = StateMachine(store=store)
+    groups.get(claimed[0].id)["status"] = GroupStatus.AVAILABLE.value
+    before = dict(deals.get(deal.id))
+    assert await fallback.transition_deal(deal.id, DealStatus.COMPLETED, {"amount": 0.9, "payout_tx": "tx"},
+                                          group_status=GroupStatus.COOLDOWN, events=[funded()]) is None
+    assert deals.get(deal.id) == before and len(outbox.documents) == published + 1
+    assert fallback.transactions is False
+    print("✅ No transactions: deal write undone when the group conflicted")
+
+    groups.get(claimed[0].id)["status"] = GroupStatus.FUNDED.value
+    assert await fallback.transition_deal(deal.id, DealStatus.COMPLETED, group_status=GroupStatus.COOLDOWN)
+    assert groups.get(claimed[0].id)["status"] == GroupStatus.COOLDOWN.value
+    print("✅ No transactions: both writes applied in order")
+
+    # Cooldown reset frees the group for the next deal
+    assert await machine.transition_group(claimed[0].id, GroupStatus.AVAILABLE)
+    assert groups.get(claimed[0].id)["current_deal_id"] is None
+    assert await machine.transition_group(claimed[0].id, GroupStatus.AVAILABLE) is None
+    print("✅ Group reset once and released its deal")
+
+    print("\n✨ Deal State Machine Test Complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    asyncio.run(test_transitions())
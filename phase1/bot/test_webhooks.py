@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Test script replaying recorded provider webhooks against the receiver at high rate
+"""
+
+import argparse
+import asyncio
+import glob
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+
+import httpx
+from fastapi import FastAPI
+from pymongo import ReturnDocument
+
+import transitions
+from models import Deal, DealStatus, Group, GroupStatus, NetworkType
+from monitoring import RealTimeMonitor, WebhookHandler, CHECK_PRIORITY_CONFIRMED, CHECK_PRIORITY_PENDING
+from webhooks import create_webhook_router, WEBHOOK_CHAINS
+from events import CheckRequested, EscrowGenerated, EventBus
+from cluster import HashRing, ReplicaCoordinator
+from state import EscrowWalletGenerator
+from state import DealManager
+from supervisor import TaskSupervisor
+from transitions import StateMachine
+
+logging.basicConfig(level=logging.WARNING)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "webhooks")
+SECRET = "test-webhook-secret"
+
+# Watched escrow addresses appearing in the recorded fixtures
+WATCHED = [
+    (NetworkType.BTC, "bc1qxy2kgdygjrsqtzq2n0yrf2493p83kkfjhx0wlh"),
+    (NetworkType.ETH, "0x7853b3736edba9d7ce681f2a90264307694f97f2"),
+    (NetworkType.USDT_TRC20, "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7"),
+]
+
+def sign(body: bytes) -> str:
+    return hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+
+def load_fixtures():
+    """Recorded payloads keyed by chain, from files named <chain>_<provider>.json"""
+    fixtures = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.json"))):
+        chain = os.path.basename(path).split("_", 1)[0]
+        with open(path, "rb") as f:
+            fixtures[chain] = f.read()
+    return fixtures
+
+def with_tx_hash(chain: str, body: bytes, i: int) -> bytes:
+    """Give a replayed payload a distinct tx hash"""
+    payload = json.loads(body)
+    suffix = f"{i:08x}"
+    if chain == "btc":
+        payload["hash"] = payload["hash"][:-8] + suffix
+    elif chain == "eth":
+        for transfer in payload["event"]["activity"]:
+            transfer["hash"] = transfer["hash"][:-8] + suffix
+    else:
+        payload["transaction_id"] = payload["transaction_id"][:-8] + suffix
+    return json.dumps(payload).encode()
+
+def matches(document, query) -> bool:
+    for field, condition in query.items():
+        value = document.get(field)
+        if isinstance(condition, dict):
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+            if "$gt" in condition and not (value is not None and value > condition["$gt"]):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+class Collection:
+    """Enough of a Motor collection for state machine writes and outbox reads"""
+
+    def __init__(self, documents=()):
+        self.documents = [dict(document) for document in documents]
+
+    async def create_index(self, *args, **kwargs):
+        pass
+
+    async def insert_many(self, documents, session=None):
+        self.documents.extend(dict(document) for document in documents)
+
+    async def find_one_and_update(self, query, update, sort=None, return_document=None, session=None):
+        document = next((document for document in self.documents if matches(document, query)), None)
+        if document is None:
+            return None
+        before = dict(document)
+        document.update(update["$set"])
+        return before if return_document == ReturnDocument.BEFORE else dict(document)
+
+    def find(self, query):
+        documents = [dict(document) for document in self.documents if matches(document, query)]
+
+        class Cursor:
+            def sort(self, field, direction):
+                documents.sort(key=lambda document: document[field])
+                return self
+
+            async def to_list(self, length):
+                return documents
+        return Cursor()
+
+class Database(dict):
+    """Collections by key (state machine) and by attribute (event bus)"""
+    __getattr__ = dict.__getitem__
+
+class Store:
+    def __init__(self, deal: Deal, group: Group):
+        self.db = Database(deals=Collection([deal.dict()]), groups=Collection([group.dict()]), outbox=Collection())
+
+async def test_runtime_escrow():
+    """An escrow generated after startup is watched and matched by webhooks"""
+    print("🧪 Testing Runtime Escrow Webhooks...")
+    print("=" * 60)
+
+    deal = Deal(escrow_id="ESCROW-RUN001", group_id="group-1", network=NetworkType.BTC,
+                buyer_address=WATCHED[0][1], seller_address="1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa",
+                status=DealStatus.ADDRESSES_SET)
+    group = Group(id="group-1", group_number=1, status=GroupStatus.OCCUPIED, current_deal_id=deal.id)
+    store = Store(deal, group)
+
+    # A replica that loaded its addresses at startup, before this deal had an escrow
+    monitor = RealTimeMonitor()
+    bus = EventBus(store=store, poll_interval=0.05, supervisor=TaskSupervisor(min_backoff=0.01))
+    bus.subscribe("monitor", monitor.on_escrow_generated, EscrowGenerated, broadcast=True)
+    await bus.start(durable=False)
+    transitions.state_machine = StateMachine(store=store, bus=bus)
+    transitions.state_machine.transactions = False
+
+    app = FastAPI()
+    app.include_router(create_webhook_router(WebhookHandler(monitor), secret=SECRET))
+    transport = httpx.ASGITransport(app=app)
+
+    try:
+        escrow_deal, error = await DealManager.generate_escrow_wallet(deal)
+        assert escrow_deal and error is None, error
+        for _ in range(100):
+            if monitor.find_address(NetworkType.BTC, escrow_deal.escrow_address):
+                break
+            await asyncio.sleep(0.01)
+        key = monitor.find_address(NetworkType.BTC, escrow_deal.escrow_address)
+        assert key and monitor.monitored_addresses[key]["deal_id"] == deal.id
+        print("✅ Escrow generated at runtime indexed from its EscrowGenerated event")
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            body = json.dumps({"address": escrow_deal.escrow_address, "tx_hash": "ab" * 32}).encode()
+            response = await client.post("/webhooks/btc", content=body, headers={"X-Webhook-Signature": sign(body)})
+            assert response.status_code == 202 and response.json()["queued"] == 1, response.text
+            assert key in monitor.queued_keys
+            print("✅ Webhook for the new escrow queued a check")
+
+            # Litecoin deposits arrive on the same UTXO path
+            litecoin = (await EscrowWalletGenerator.generate_escrow_address(NetworkType.LTC, "deal-ltc"))[0]
+            await monitor.add_address(NetworkType.LTC, litecoin, "deal-ltc")
+            body = json.dumps({"address": litecoin, "tx_hash": "cd" * 32}).encode()
+            response = await client.post("/webhooks/btc", content=body, headers={"X-Webhook-Signature": sign(body)})
+            assert response.status_code == 202 and response.json()["queued"] == 1, response.text
+            assert monitor.find_address(NetworkType.LTC, litecoin) in monitor.queued_keys
+        print("✅ Litecoin webhook on the UTXO path queued a check")
+    finally:
+        await bus.stop()
+
+    print("\n✨ Runtime Escrow Webhook Test Complete!")
+    print("=" * 60)
+
+def joined(replica_id: str, members) -> ReplicaCoordinator:
+    """A coordinator that has joined a live cluster of members"""
+    coordinator = ReplicaCoordinator(store=None, replica_id=replica_id)
+    coordinator.started, coordinator.member_until = True, float("inf")
+    coordinator.ring = HashRing(members)
+    return coordinator
+
+async def test_forwarded_checks():
+    """A receiver hands checks for addresses another replica owns to that replica"""
+    print("🧪 Testing Cross-Replica Webhook Checks...")
+    print("=" * 60)
+
+    members = ["replica-a", "replica-b"]
+    store = type("Store", (), {"db": Database(outbox=Collection())})()
+    addresses = [(await EscrowWalletGenerator.generate_escrow_address(NetworkType.BTC, f"deal-{n}"))[0]
+                 for n in range(20)]
+
+    monitors, buses = {}, []
+    for replica_id in members:
+        monitor = RealTimeMonitor(joined(replica_id, members))
+        for n, address in enumerate(addresses):
+            await monitor.add_address(NetworkType.BTC, address, f"deal-{n}")
+        bus = EventBus(store=store, replica_id=replica_id, poll_interval=0.05,
+                       supervisor=TaskSupervisor(min_backoff=0.01))
+        bus.subscribe("monitor_checks", monitor.on_check_requested, CheckRequested, broadcast=True)
+        await bus.start(durable=False)
+        monitors[replica_id], buses = monitor, buses + [bus]
+
+    # Every webhook lands on replica A, as behind a sticky load balancer
+    receiver = monitors["replica-a"]
+    app = FastAPI()
+    app.include_router(create_webhook_router(WebhookHandler(receiver, bus=buses[0]), secret=SECRET))
+    transport = httpx.ASGITransport(app=app)
+
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for n, address in enumerate(addresses):
+                body = json.dumps({"address": address, "tx_hash": f"{n:064x}"}).encode()
+                response = await client.post("/webhooks/btc", content=body, headers={"X-Webhook-Signature": sign(body)})
+                assert response.status_code == 202 and response.json()["queued"] == 1, response.text
+
+        owned = {replica_id: {key for key in monitor.monitored_addresses if monitor.coordinator.owns(key)}
+                 for replica_id, monitor in monitors.items()}
+        assert owned["replica-a"] and owned["replica-b"], owned
+        for _ in range(100):
+            if set(monitors["replica-b"].queued_keys) == owned["replica-b"]:
+                break
+            await asyncio.sleep(0.01)
+        for replica_id, monitor in monitors.items():
+            assert set(monitor.queued_keys) == owned[replica_id], (replica_id, monitor.queued_keys)
+        print(f"✅ {len(addresses)} webhooks on one replica: {len(owned['replica-a'])} checked there, "
+              f"{len(owned['replica-b'])} forwarded to their owner")
+    finally:
+        for bus in buses:
+            await bus.stop()
+
+    print("\n✨ Cross-Replica Webhook Check Test Complete!")
+    print("=" * 60)
+
+async def test_webhook_receiver(requests: int, concurrency: int):
+    """Replay fixtures through the ASGI app and check signing, dedup and priorities"""
+    print("🧪 Testing Webhook Receiver...")
+    print("=" * 60)
+
+    monitor = RealTimeMonitor()
+    for network, address in WATCHED:
+        await monitor.add_address(network, address, f"deal-{network.value}")
+
+    app = FastAPI()
+    app.include_router(create_webhook_router(WebhookHandler(monitor), secret=SECRET))
+    fixtures = load_fixtures()
+    assert set(fixtures) == set(WEBHOOK_CHAINS), f"Missing fixtures: {set(WEBHOOK_CHAINS) - set(fixtures)}"
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # Signature checks
+        body = fixtures["btc"]
+        response = await client.post("/webhooks/btc", content=body, headers={"X-Webhook-Signature": "0" * 64})
+        assert response.status_code == 401, response.text
+        response = await client.post("/webhooks/doge", content=body, headers={"X-Webhook-Signature": sign(body)})
+        assert response.status_code == 404, response.text
+        print("✅ Unsigned and unknown-chain requests rejected")
+
+        # Each recorded payload queues exactly one check, priority from its confirmation state
+        for chain, body in fixtures.items():
+            response = await client.post(f"/webhooks/{chain}", content=body, headers={"X-Signature": f"sha256={sign(body)}"})
+            assert response.status_code == 202 and response.json()["queued"] == 1, (chain, response.text)
+
+        priorities = {key: priority for key, priority in monitor.queued_keys.items()}
+        assert priorities == {
+            f"BTC:{WATCHED[0][1]}": CHECK_PRIORITY_PENDING,
+            f"ETH:{WATCHED[1][1]}": CHECK_PRIORITY_CONFIRMED,
+            f"USDT-TRC20:{WATCHED[2][1]}": CHECK_PRIORITY_CONFIRMED,
+        }, priorities
+        first = monitor.check_queue.get_nowait()
+        assert first[0] == CHECK_PRIORITY_CONFIRMED, first
+        monitor.check_queue.put_nowait(first)
+        print("✅ Recorded BlockCypher/Alchemy/TRON payloads parsed; confirmed txs queued first")
+
+        # Burst replay: resends of the same tx are dropped, distinct txs coalesce per address
+        chains = list(fixtures)
+        bodies = []
+        for i in range(requests):
+            # Every other request is a provider retry of the previous delivery
+            chain = chains[(i // 2) % len(chains)]
+            body = with_tx_hash(chain, fixtures[chain], i // 2)
+            bodies.append((chain, body, sign(body)))
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def deliver(chain, body, signature):
+            async with semaphore:
+                response = await client.post(f"/webhooks/{chain}", content=body, headers={"X-Webhook-Signature": signature})
+                assert response.status_code == 202, response.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(deliver(*item) for item in bodies))
+        elapsed = time.perf_counter() - started
+
+        stats = (await client.get("/webhooks/stats")).json()
+        print(f"⚡ Replayed {requests} webhooks in {elapsed:.2f}s ({requests / elapsed:.0f} req/s)")
+        print(f"🔁 Duplicates dropped: {stats['duplicates']}  Pending checks: {stats['pending_checks']}")
+
+        # Every event in a retried delivery is dropped
+        retried_events = sum(len(WEBHOOK_CHAINS[chain][0](json.loads(body))) for chain, body, _ in bodies[1::2])
+        assert stats["duplicates"] == retried_events, stats
+        # Queue stays bounded by monitored addresses, not by webhook volume
+        assert len(monitor.queued_keys) == len(WATCHED), monitor.queued_keys
+
+    print("\n✨ Webhook Receiver Test Complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(test_webhook_receiver(args.requests, args.concurrency))
+    asyncio.run(test_runtime_escrow())
+    asyncio.run(test_forwarded_checks())
@@ -0,0 +1,250 @@
+"""
+Deal State Machine for Rahu Escrow Bot
+Allowed deal and group transitions applied as compare-and-set updates
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import OperationFailure
+
+from models import Deal, DealStatus, GroupStatus, db_manager
+from events import Event, EventBus, event_bus as default_bus
+
+logger = logging.getLogger(__name__)
+
+# Server error code for a transaction started on a standalone mongod
+ILLEGAL_OPERATION = 20
+GROUP_OCCUPANCY = timedelta(hours=12)
+GROUP_COOLDOWN = timedelta(hours=12)
+
+DEAL_TRANSITIONS = {
+    DealStatus.PENDING: {DealStatus.ADDRESSES_SET, DealStatus.CANCELLED, DealStatus.DISPUTED},
+    DealStatus.ADDRESSES_SET: {DealStatus.ESCROW_GENERATED, DealStatus.CANCELLED, DealStatus.DISPUTED},
+    DealStatus.ESCROW_GENERATED: {DealStatus.FUNDING_SEEN, DealStatus.CANCELLED, DealStatus.DISPUTED},
+    DealStatus.FUNDING_SEEN: {DealStatus.FUNDED, DealStatus.DISPUTED},
+    DealStatus.FUNDED: {DealStatus.COMPLETED, DealStatus.DISPUTED},
+    DealStatus.DISPUTED: {DealStatus.COMPLETED, DealStatus.CANCELLED},
+    DealStatus.COMPLETED: set(),
+    DealStatus.CANCELLED: set()
+}
+
+GROUP_TRANSITIONS = {
+    GroupStatus.AVAILABLE: {GroupStatus.OCCUPIED},
+    GroupStatus.OCCUPIED: {GroupStatus.ESCROW_CREATED, GroupStatus.DISPUTED, GroupStatus.COOLDOWN},
+    GroupStatus.ESCROW_CREATED: {GroupStatus.FUNDED, GroupStatus.DISPUTED, GroupStatus.COOLDOWN},
+    GroupStatus.FUNDED: {GroupStatus.DISPUTED, GroupStatus.COOLDOWN},
+    GroupStatus.DISPUTED: {GroupStatus.COOLDOWN},
+    GroupStatus.COOLDOWN: {GroupStatus.AVAILABLE}
+}
+
+def source_statuses(transitions: Dict, new_status) -> List[str]:
+    """Every stored status allowed to move to new_status"""
+    return [status.value for status, targets in transitions.items() if new_status in targets]
+
+def group_status_fields(status: GroupStatus) -> Dict:
+    """Fields set together with a group's status"""
+    now = datetime.utcnow()
+    if status == GroupStatus.OCCUPIED:
+        return {"occupied_at": now, "expires_at": now + GROUP_OCCUPANCY}
+    if status == GroupStatus.ESCROW_CREATED:
+        return {"created_at": now}
+    if status == GroupStatus.FUNDED:
+        return {"funded_at": now}
+    if status == GroupStatus.COOLDOWN:
+        return {"cooldown_until": now + GROUP_COOLDOWN}
+    if status == GroupStatus.AVAILABLE:
+        return {
+            "current_deal_id": None,
+            "occupied_at": None,
+            "expires_at": None,
+            "cooldown_until": None,
+            "creator_user_id": None,
+            "participant_ids": []
+        }
+    return {}
+
+class TransitionConflict(Exception):
+    """A document was not in a state the change may start from"""
+
+Undo = Callable[[], Awaitable[None]]
+Step = Callable[[Optional[object], Optional[List[Undo]]], Awaitable[Dict]]
+
+class StateMachine:
+    """Deal and group status changes that only apply from an allowed current status
+
+    Every write matches on the statuses the move may start from, so a retry or a
+    racing writer finds nothing to update instead of overwriting newer state.
+    When a deal and its group change together, or a change comes with outbox
+    events, all writes share one transaction; a standalone server without
+    transactions gets them applied in order, and the writes already made are
+    undone when a later one conflicts.
+    """
+
+    def __init__(self, store=db_manager, bus: EventBus = default_bus):
+        self.store = store
+        self.bus = bus
+        self.transactions: Optional[bool] = None  # unknown until the first two-document change
+
+    async def transition_deal(self, deal_id: str, new_status: DealStatus, updates: Optional[Dict] = None,
+                              match: Optional[Dict] = None, group_status: Optional[GroupStatus] = None,
+                              group_updates: Optional[Dict] = None, events: Iterable[Event] = ()) -> Optional[Dict]:
+        """Move a deal, and with group_status the group it occupies, to a new status
+
+        Returns the updated deal, or None when the deal (or its group) was not in a
+        status that may make this move: another writer got there first, or this is
+        a retry of a change already made. events are published only with the change.
+        """
+        steps = [self._transition(
+            "deals", DEAL_TRANSITIONS, {"id": deal_id, **(match or {})}, new_status, updates
+        )]
+        if group_status:
+            steps.append(self._transition(
+                "groups", GROUP_TRANSITIONS, {"current_deal_id": deal_id}, group_status,
+                {**group_status_fields(group_status), **(group_updates or {})}
+            ))
+        return await self._apply(steps, events)
+
+    async def transition_group(self, group_id: str, new_status: GroupStatus, updates: Optional[Dict] = None,
+                               match: Optional[Dict] = None, events: Iterable[Event] = ()) -> Optional[Dict]:
+        """Move a group to a new status; the updated group, or None when not allowed from its current one"""
+        return await self._apply([self._transition(
+            "groups", GROUP_TRANSITIONS, {"id": group_id, **(match or {})}, new_status,
+            {**group_status_fields(new_status), **(updates or {})}
+        )], events)
+
+    async def update_deal(self, deal_id: str, updates: Dict, statuses: List[DealStatus],
+                          match: Optional[Dict] = None) -> Optional[Dict]:
+        """Change deal fields without moving its status, only while it is in one of statuses"""
+        query = {"id": deal_id, "status": {"$in": [status.value for status in statuses]}, **(match or {})}
+        return await self._apply([self._write("deals", query, updates)])
+
+    async def claim_group(self, **updates) -> Optional[Dict]:
+        """Occupy the lowest-numbered available group; concurrent claims never share one"""
+        return await self._apply([self._transition(
+            "groups", GROUP_TRANSITIONS, {}, GroupStatus.OCCUPIED,
+            {**group_status_fields(GroupStatus.OCCUPIED), **updates}, sort=[("group_number", 1)]
+        )])
+
+    async def bind_chat(self, group_id: str, chat_id: int, events: Iterable[Event] = ()) -> Optional[Dict]:
+        """Attach a group to its Telegram chat; the updated group"""
+        return await self._apply([self._write("groups", {"id": group_id}, {"telegram_chat_id": chat_id})], events)
+
+    async def set_frozen(self, deal_id: str, frozen: bool, events: Iterable[Event] = ()) -> Optional[Dict]:
+        """Freeze or unfreeze a deal; None when it already was"""
+        return await self._apply([self._write("deals", {"id": deal_id, "is_frozen": {"$ne": frozen}},
+                                              {"is_frozen": frozen})], events)
+
+    async def open_deal(self, deal: Deal, events: Iterable[Event] = ()) -> bool:
+        """Save a new deal as the current deal of the group it was created in"""
+        async def insert(session, journal=None):
+            document = deal.dict()
+            await self.store.db["deals"].insert_one(document, session=session)
+            if journal is not None:
+                journal.append(lambda: self.store.db["deals"].delete_one({"id": deal.id}))
+            return document
+
+        claimed = self._write(
+            "groups",
+            {"id": deal.group_id, "status": GroupStatus.OCCUPIED.value, "current_deal_id": None},
+            {"current_deal_id": deal.id}
+        )
+        return await self._apply([claimed, insert], events) is not None
+
+    def _transition(self, collection: str, transitions: Dict, query: Dict, new_status, updates: Optional[Dict],
+                    sort: Optional[List] = None) -> Step:
+        query = {**query, "status": {"$in": source_statuses(transitions, new_status)}}
+        return self._write(collection, query, {**(updates or {}), "status": new_status.value}, sort)
+
+    def _write(self, collection: str, query: Dict, updates: Dict, sort: Optional[List] = None) -> Step:
+        async def step(session, journal=None):
+            # Millisecond precision, as stored, so an undo can match on it
+            now = datetime.utcnow()
+            changes = {**updates, "updated_at": now.replace(microsecond=now.microsecond // 1000 * 1000)}
+            before = await self.store.db[collection].find_one_and_update(
+                query,
+                {"$set": changes},
+                sort=sort,
+                return_document=ReturnDocument.BEFORE,
+                session=session
+            )
+            if before is None:
+                raise TransitionConflict(f"no {collection} document matches {query}")
+            if journal is not None:
+                journal.append(self._restore(collection, before, changes))
+            return {**before, **changes}
+        return step
+
+    def _restore(self, collection: str, before: Dict, changes: Dict) -> Undo:
+        """Put back the fields a write changed, unless a newer write has touched the document since"""
+        async def undo():
+            restore = {field: before[field] for field in changes if field in before}
+            unset = {field: "" for field in changes if field not in before}
+            result = await self.store.db[collection].update_one(
+                {"id": before["id"], "updated_at": changes["updated_at"]},
+                {"$set": restore, **({"$unset": unset} if unset else {})}
+            )
+            if not result.matched_count:
+                logger.error(f"❌ Could not undo {collection} {before['id']}: changed again before the rollback")
+        return undo
+
+    def _record(self, events: List[Event]) -> Step:
+        async def step(session, journal=None):
+            documents = [event.document() for event in events]
+            await self.store.db["outbox"].insert_many(documents, session=session)
+            return documents[0]
+        return step
+
+    async def _apply(self, steps: List[Step], events: Iterable[Event] = ()) -> Optional[Dict]:
+        """Run steps all-or-nothing; the first step's document, or None on a conflict"""
+        events = list(events)
+        if events:
+            steps = steps + [self._record(events)]
+
+        try:
+            if len(steps) > 1 and self.transactions is not False:
+                try:
+                    document = await self._run_transaction(steps)
+                except OperationFailure as e:
+                    if e.code != ILLEGAL_OPERATION:
+                        raise
+                    self.transactions = False
+                    logger.warning("⚠️ MongoDB has no transactions (standalone server), applying transitions in order")
+                    document = await self._run_in_order(steps)
+            else:
+                document = await self._run_in_order(steps)
+        except TransitionConflict as e:
+            logger.info(f"Transition not applied: {e}")
+            return None
+
+        self.bus.committed(events)
+        return document
+
+    async def _run_transaction(self, steps: List[Step]) -> Dict:
+        async with await self.store.client.start_session() as session:
+            # with_transaction retries transient write conflicts; a TransitionConflict aborts
+            document = await session.with_transaction(lambda session: self._run(steps, session))
+        self.transactions = True
+        return document
+
+    async def _run_in_order(self, steps: List[Step]) -> Dict:
+        """Without a transaction: when a step fails, undo the ones before it, newest first"""
+        journal: List[Undo] = []
+        try:
+            return await self._run(steps, None, journal)
+        except Exception:
+            for undo in reversed(journal):
+                try:
+                    await undo()
+                except Exception as e:
+                    logger.error(f"❌ Failed to undo a partial transition: {e}")
+            raise
+
+    async def _run(self, steps: List[Step], session, journal: Optional[List[Undo]] = None) -> Dict:
+        documents = [await step(session, journal) for step in steps]
+        return documents[0]
+
+# Global state machine
+state_machine = StateMachine()
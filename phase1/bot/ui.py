@@ -3,12 +3,88 @@ Luxury UI Components for Rahu Escrow Bot Phase 1
 Premium message formatting and inline keyboards
 """
 
-from typing import List, Optional, Dict, Any
+import re
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Union
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from datetime import datetime
 
-from models import NetworkType, GroupStatus, DealStatus, User, Group, Deal
+from models import NetworkType, GroupStatus, DealStatus, User, Group, Deal, DealSummary
 from state import NetworkDetector
+from config import config_cache
+
+# Legacy Markdown (ParseMode.MARKDOWN) entity delimiters; "[" only needs escaping
+MARKDOWN_ENTITIES = "*_`"
+PLACEHOLDER_PATTERN = re.compile(r"\{(\w+)(?::([^{}]*))?\}")
+
+def markdown_context(text: str, context: Optional[str] = None) -> Optional[str]:
+    """Entity still open at the end of text, starting from context"""
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if context is None:
+            if char == "\\":
+                i += 2
+                continue
+            if char in MARKDOWN_ENTITIES:
+                context = char
+        elif char == context:
+            context = None
+        i += 1
+    return context
+
+@lru_cache(maxsize=4096)
+def escape_markdown(text: str, context: Optional[str] = None) -> str:
+    """Escape a value for legacy Markdown at a position inside or outside an entity"""
+    if context is None:
+        return re.sub(r"([_*`\[])", r"\\\1", text)
+    # Entities cannot nest or escape their own delimiter: close, escape, reopen
+    return text.replace(context, f"{context}\\{context}{context}")
+
+class MessageTemplate:
+    """Markdown message compiled once into literal chunks and escaped placeholders
+    
+    Placeholders are {name} or {name:spec}; values are escaped for the entity they
+    sit in unless the spec is "raw" (trusted Markdown). Names a render does not
+    supply are kept literally, so admin-written texts can contain braces.
+    """
+    __slots__ = ("source", "parts", "static")
+    
+    def __init__(self, source: str):
+        self.source = source
+        parts = []
+        position, context = 0, None
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            literal = source[position:match.start()]
+            context = markdown_context(literal, context)
+            parts.append((literal, match.group(1), match.group(2), context, match.group(0)))
+            position = match.end()
+        parts.append((source[position:], None, None, None, None))
+        self.parts = tuple(parts)
+        self.static = source if len(parts) == 1 else None
+    
+    def render(self, **values) -> str:
+        if self.static is not None:
+            return self.static
+        
+        out = []
+        for literal, name, spec, context, placeholder in self.parts:
+            out.append(literal)
+            if name is None:
+                continue
+            if name not in values:
+                out.append(placeholder)
+            elif spec == "raw":
+                out.append(str(values[name]))
+            else:
+                value = values[name]
+                out.append(escape_markdown(format(value, spec) if spec else str(value), context))
+        return "".join(out)
+
+@lru_cache(maxsize=256)
+def compile_template(source: str) -> MessageTemplate:
+    """Shared compiled template for a source text, from code or bot_config"""
+    return MessageTemplate(source)
 
 class LuxuryFormatter:
     """Premium message formatting with luxury aesthetics"""
@@ -30,17 +106,12 @@ class LuxuryFormatter:
         NetworkType.USDT_TRC20: "USDT-TRC20 (TRON)"
     }
     
-    @staticmethod
-    def format_welcome_message(user_name: str, is_returning: bool = False) -> str:
-        """Luxury welcome message with multi-chain support"""
-        greeting = "Welcome back" if is_returning else "Welcome"
-        
-        return f"""
-✨ *{greeting} to Rahu Escrow* ✨
+    WELCOME_TEMPLATE = MessageTemplate(f"""
+✨ *{{greeting}} to Rahu Escrow* ✨
 
 🌟 *Premium Multi-Crypto Escrow Service* 🌟
 
-Greetings, {user_name}! You've entered the most sophisticated escrow ecosystem on Telegram.
+Greetings, {{user_name}}! You've entered the most sophisticated escrow ecosystem on Telegram.
 
 🔰 *Your Elite Features:*
 • Multi-cryptocurrency support
@@ -49,31 +120,24 @@ Greetings, {user_name}! You've entered the most sophisticated escrow ecosystem o
 • Premium customer support
 
 💰 *Supported Cryptocurrencies:*
-• {LuxuryFormatter.NETWORK_SYMBOLS[NetworkType.BTC]} Bitcoin (BTC)
-• {LuxuryFormatter.NETWORK_SYMBOLS[NetworkType.ETH]} Ethereum (ETH) 
-• {LuxuryFormatter.NETWORK_SYMBOLS[NetworkType.LTC]} Litecoin (LTC)
-• {LuxuryFormatter.NETWORK_SYMBOLS[NetworkType.USDT_TRC20]} USDT (TRC-20)
-• {LuxuryFormatter.NETWORK_SYMBOLS[NetworkType.USDT_BEP20]} USDT (BEP-20)
+• {NETWORK_SYMBOLS[NetworkType.BTC]} Bitcoin (BTC)
+• {NETWORK_SYMBOLS[NetworkType.ETH]} Ethereum (ETH) 
+• {NETWORK_SYMBOLS[NetworkType.LTC]} Litecoin (LTC)
+• {NETWORK_SYMBOLS[NetworkType.USDT_TRC20]} USDT (TRC-20)
+• {NETWORK_SYMBOLS[NetworkType.USDT_BEP20]} USDT (BEP-20)
 
 💎 *Status:* Verified Member
 🛡️ *Security:* Military-grade encryption
 ⚡ *Response:* Instant processing
 
 *Ready to create your first luxury deal?*
-        """
+        """)
     
-    @staticmethod
-    def format_rules_message() -> str:
-        """Premium rules with multi-chain fee structure"""
-        return """
+    RULES_TEMPLATE = MessageTemplate("""
 📋 *Rahu Escrow - Premium Rules* 📋
 
 💰 **Fee Structure:**
-• **Bitcoin (BTC):** $5 or 5% + gas deducted on release
-• **Litecoin (LTC):** $5 or 5% + gas deducted on release  
-• **Ethereum (ETH):** $5 or 5% + gas deducted on release
-• **USDT-BEP20:** $5 or 5% 
-• **USDT-TRC20:** $5 or 5% + $2 gas fee
+{fee_structure:raw}
 
 🌐 **Supported Networks:**
 • **₿ Bitcoin (BTC)** - Native blockchain
@@ -108,12 +172,29 @@ Greetings, {user_name}! You've entered the most sophisticated escrow ecosystem o
 • **USDT-BEP20:** ~$0.50 network fee
 
 *Your security is our luxury promise.*
-        """
+        """)
     
-    @staticmethod
-    def format_deal_created_message(escrow_id: str, group_number: int) -> str:
-        """Luxury deal creation confirmation"""
-        return f"""
+    HELP_TEMPLATE = MessageTemplate("""
+🎯 *Rahu Escrow - Elite Support* 🎯
+
+🌟 *For Premium Assistance:*
+
+👨‍💼 **Elite Moderators:**
+• @RahuMod1 - Senior Arbitrator
+• @RahuMod2 - Dispute Specialist  
+• @RahuMod3 - Technical Support
+
+📞 *Contact Priority:*
+• VIP Members: < 5 minutes
+• Premium: < 15 minutes
+• Standard: < 1 hour
+
+⚡ *Emergency Support:* @RahuAdmin
+
+*We're here to serve your escrow needs with luxury service.*
+        """)
+    
+    DEAL_CREATED_TEMPLATE = MessageTemplate("""
 ✨ *Creating Your Escrow Suite...* ✨
 
 🔄 *Processing...*
@@ -136,27 +217,18 @@ Greetings, {user_name}! You've entered the most sophisticated escrow ecosystem o
 • Dispute protection
 
 *Enter your private escrow suite to begin.*
-        """
+        """)
     
-    @staticmethod
-    def format_network_selection_message(role: str) -> str:
-        """Premium network selection interface"""
-        return f"""
-🔘 *{role.upper()} Registration* 🔘
+    NETWORK_SELECTION_TEMPLATE = MessageTemplate("""
+🔘 *{role} Registration* 🔘
 
 Please select your preferred cryptocurrency:
 
 💰 *Choose your network:*
-        """
+        """)
     
-    @staticmethod
-    def format_address_registered_message(role: str, address: str, network: NetworkType) -> str:
-        """Luxury address registration confirmation"""
-        symbol = LuxuryFormatter.NETWORK_SYMBOLS.get(network, "💰")
-        network_name = LuxuryFormatter.NETWORK_NAMES.get(network, network.value)
-        
-        return f"""
-🔘 *Role Assignment: {role.upper()}*
+    ADDRESS_REGISTERED_TEMPLATE = MessageTemplate("""
+🔘 *Role Assignment: {role}*
 
 ✅ **Address Registered:**
 `{address}`
@@ -166,19 +238,13 @@ Please select your preferred cryptocurrency:
 ⚡ **Status:** Ready for escrow
 
 *Waiting for other participant to register their address...*
-        """
+        """)
     
-    @staticmethod
-    def format_escrow_active_message(deal: Deal, buyer_address: str, seller_address: str) -> str:
-        """Luxury escrow activation message"""
-        symbol = LuxuryFormatter.NETWORK_SYMBOLS.get(NetworkType(deal.network), "💰")
-        network_name = LuxuryFormatter.NETWORK_NAMES.get(NetworkType(deal.network), deal.network)
-        
-        return f"""
+    ESCROW_ACTIVE_TEMPLATE = MessageTemplate("""
 🏛️ **ESCROW SUITE ACTIVE** 🏛️
 
 📋 *Deal Details:*
-• **Escrow ID:** {deal.escrow_id}
+• **Escrow ID:** {escrow_id}
 • **Network:** {symbol} {network_name}
 • **Status:** Awaiting funding
 
@@ -187,58 +253,74 @@ Please select your preferred cryptocurrency:
 • **Seller:** `{seller_address}`
 
 🏦 **Escrow Address:**
-`{deal.escrow_address}`
+`{escrow_address}`
 
-💎 *Send {deal.network.split('-')[0] if 'USDT' in deal.network else deal.network} to the escrow address above*
+💎 *Send {coin} to the escrow address above*
 
 ⚠️ **Important:** Only send the exact amount agreed upon. Funds will be held securely until release.
-        """
+        """)
     
-    @staticmethod
-    def format_funded_message(deal: Deal, amount: float, tx_hash: str, confirmations: int = 3) -> str:
-        """Luxury funding confirmation message"""
-        symbol = LuxuryFormatter.NETWORK_SYMBOLS.get(NetworkType(deal.network), "💰")
-        network_name = LuxuryFormatter.NETWORK_NAMES.get(NetworkType(deal.network), deal.network)
-        
-        return f"""
+    FUNDED_TEMPLATE = MessageTemplate("""
 🚨 **THE ESCROW HAS BEEN FUNDED!** 🚨
 
-💰 **Amount:** {amount} {deal.network.split('-')[0] if 'USDT' in deal.network else deal.network}
-💵 **USD Value:** ${deal.amount_usd:.2f} USD
+💰 **Amount:** {amount} {coin}
+💵 **USD Value:** {usd_value}
 🌐 **Network:** {symbol} {network_name}
 🔗 **TX Hash:** `{tx_hash}`
-⏰ **Confirmed:** {confirmations}/3 blocks
+⏰ **Confirmed:** {confirmations}/{required_confirmations} blocks
 
 🎯 **Next Steps:**
 • Buyer: Complete your side of the deal
 • Seller: Await buyer confirmation
 
 *Funds are secure in escrow. Choose your action below.*
-        """
+        """)
     
-    @staticmethod
-    def format_error_message(error_type: str, network: str = None) -> str:
-        """Luxury error messages"""
-        if error_type == "invalid_address":
-            return f"🛑 Invalid {network} address — please check and retry."
-        elif error_type == "network_mismatch":
-            return f"🛑 Network mismatch — please use same network as other participant."
-        elif error_type == "no_groups":
-            return "🚫 All escrow suites are currently occupied — please try again in a few minutes."
-        elif error_type == "permission_denied":
-            return "❌ *Access Denied* - Insufficient privileges for this action."
-        elif error_type == "user_banned":
-            return "🚫 Your account has been suspended from premium services."
-        else:
-            return "⚠️ An unexpected error occurred — our premium support team has been notified."
+    QR_CAPTION_TEMPLATE = MessageTemplate("""
+📱 **{escrow_id} Payment QR**
+
+🌐 **Network:** {symbol} {network_name}
+🏦 **Escrow Address:**
+`{escrow_address}`
+
+*Scan with your wallet to send {coin} to escrow*
+        """)
     
-    @staticmethod
-    def format_moderation_action(action: str, target: str, moderator: str) -> str:
-        """Luxury moderation action confirmation"""
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        if action == "ban":
-            return f"""
+    BALANCE_TEMPLATE = MessageTemplate("""
+💰 **REAL BLOCKCHAIN BALANCE**
+
+🌐 **Network:** {symbol} {network_name}
+📍 **Address:** `{address}`
+💵 **Balance:** {balance} {coin}
+📥 **Deposits:** {deposits}
+⏰ **Last updated:** {time}
+
+*This is live data from the blockchain*
+        """)
+    
+    BALANCE_ERROR_TEMPLATE = MessageTemplate("""
+💰 **Balance Check**
+
+❌ **Error:** Unable to fetch real balance
+🔧 **Reason:** {reason}
+⏰ **Time:** {time}
+
+*Please try again in a moment*
+        """)
+    
+    ERROR_TEMPLATES = {
+        "invalid_address": MessageTemplate("🛑 Invalid {network} address — please check and retry."),
+        "network_mismatch": MessageTemplate("🛑 Network mismatch — please use same network as other participant."),
+        "no_groups": MessageTemplate("🚫 All escrow suites are currently occupied — please try again in a few minutes."),
+        "permission_denied": MessageTemplate("❌ *Access Denied* - Insufficient privileges for this action."),
+        "user_banned": MessageTemplate("🚫 Your account has been suspended from premium services."),
+        "no_deal": MessageTemplate("🔍 No active escrow in this chat — use /create to open an escrow suite."),
+        "no_escrow": MessageTemplate("📱 No escrow address yet — both participants must register their addresses first."),
+    }
+    UNKNOWN_ERROR_TEMPLATE = MessageTemplate("⚠️ An unexpected error occurred — our premium support team has been notified.")
+    
+    MODERATION_TEMPLATES = {
+        "ban": MessageTemplate("""
 🔨 **MODERATION ACTION**
 
 ✅ User {target} has been banned
@@ -246,41 +328,202 @@ Please select your preferred cryptocurrency:
 ⏰ Timestamp: {timestamp}
 
 *User removed from all active escrow deals.*
-            """
-        elif action == "freeze":
-            return f"""
+            """),
+        "freeze": MessageTemplate("""
 ❄️ **DEAL FROZEN**
 
 🆔 **Target:** {target}
 🛡️ **Action by:** @{moderator}
-⏰ **Time:** {timestamp.split()[1]}
+⏰ **Time:** {time}
 
 *All transactions suspended pending investigation.*
-            """
-        elif action == "unfreeze":
-            return f"""
+            """),
+        "unfreeze": MessageTemplate("""
 🔥 **DEAL UNFROZEN**
 
 🆔 **Target:** {target}
 🛡️ **Action by:** @{moderator}
-⏰ **Time:** {timestamp.split()[1]}
+⏰ **Time:** {time}
 
 *Transactions resumed.*
-            """
-        else:
-            return f"""
+            """),
+    }
+    ADMIN_ACTION_TEMPLATE = MessageTemplate("""
 ⚖️ **ADMINISTRATIVE ACTION**
 
 🎯 **Action:** {action}
 🎯 **Target:** {target}
 🛡️ **By:** @{moderator}
 ⏰ **Time:** {timestamp}
-            """
+            """)
+    
+    @staticmethod
+    def coin_symbol(network: str) -> str:
+        """Ticker shown next to amounts: USDT for both USDT networks"""
+        return network.split('-')[0] if 'USDT' in network else network
+    
+    @staticmethod
+    def format_welcome_message(user_name: str, is_returning: bool = False) -> str:
+        """Luxury welcome message with multi-chain support"""
+        configured = config_cache.welcome_message()
+        template = compile_template(configured) if configured else LuxuryFormatter.WELCOME_TEMPLATE
+        
+        greeting = "Welcome back" if is_returning else "Welcome"
+        return template.render(greeting=greeting, user_name=user_name)
+    
+    @staticmethod
+    def format_rules_message() -> str:
+        """Premium rules with multi-chain fee structure"""
+        return _render_rules(config_cache.config)
+    
+    @staticmethod
+    def format_help_message() -> str:
+        """Elite support contacts"""
+        return LuxuryFormatter.HELP_TEMPLATE.render()
+    
+    # Fee lines used until God Mode publishes a fee table
+    DEFAULT_FEE_LINES = {
+        NetworkType.BTC: "$5 or 5% + gas deducted on release",
+        NetworkType.LTC: "$5 or 5% + gas deducted on release",
+        NetworkType.ETH: "$5 or 5% + gas deducted on release",
+        NetworkType.USDT_BEP20: "$5 or 5%",
+        NetworkType.USDT_TRC20: "$5 or 5% + $2 gas fee"
+    }
+    
+    @staticmethod
+    def format_fee_structure() -> str:
+        """Fee lines from the live fee table, falling back to the defaults"""
+        lines = []
+        for network in [NetworkType.BTC, NetworkType.LTC, NetworkType.ETH, NetworkType.USDT_BEP20, NetworkType.USDT_TRC20]:
+            fee = config_cache.network_fee(network.value)
+            if fee:
+                line = f"$5 or {fee.get('fee_percentage', 5.0):g}%"
+                if fee.get("gas_fee_usd"):
+                    line += f" + ${fee['gas_fee_usd']:g} gas fee"
+                elif fee.get("gas_deduction"):
+                    line += " + gas deducted on release"
+            else:
+                line = LuxuryFormatter.DEFAULT_FEE_LINES[network]
+            label = network.value if "USDT" in network.value else LuxuryFormatter.NETWORK_NAMES[network]
+            lines.append(f"• **{label}:** {line}")
+        return "\n".join(lines)
+    
+    @staticmethod
+    def format_deal_created_message(escrow_id: str, group_number: int) -> str:
+        """Luxury deal creation confirmation"""
+        return LuxuryFormatter.DEAL_CREATED_TEMPLATE.render(escrow_id=escrow_id, group_number=group_number)
+    
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def format_network_selection_message(role: str) -> str:
+        """Premium network selection interface"""
+        return LuxuryFormatter.NETWORK_SELECTION_TEMPLATE.render(role=role.upper())
+    
+    @staticmethod
+    def format_address_registered_message(role: str, address: str, network: NetworkType) -> str:
+        """Luxury address registration confirmation"""
+        return LuxuryFormatter.ADDRESS_REGISTERED_TEMPLATE.render(
+            role=role.upper(),
+            address=address,
+            symbol=LuxuryFormatter.NETWORK_SYMBOLS.get(network, "💰"),
+            network_name=LuxuryFormatter.NETWORK_NAMES.get(network, network.value)
+        )
+    
+    @staticmethod
+    def format_escrow_active_message(deal: Deal, buyer_address: str, seller_address: str) -> str:
+        """Luxury escrow activation message"""
+        return LuxuryFormatter.ESCROW_ACTIVE_TEMPLATE.render(
+            escrow_id=deal.escrow_id,
+            symbol=LuxuryFormatter.NETWORK_SYMBOLS.get(NetworkType(deal.network), "💰"),
+            network_name=LuxuryFormatter.NETWORK_NAMES.get(NetworkType(deal.network), deal.network),
+            buyer_address=buyer_address,
+            seller_address=seller_address,
+            escrow_address=deal.escrow_address,
+            coin=LuxuryFormatter.coin_symbol(deal.network)
+        )
+    
+    @staticmethod
+    def format_funded_message(deal: Union[Deal, DealSummary], amount: float, tx_hash: str, confirmations: int = 3, required_confirmations: int = 3) -> str:
+        """Luxury funding confirmation message"""
+        return LuxuryFormatter.FUNDED_TEMPLATE.render(
+            amount=amount,
+            coin=LuxuryFormatter.coin_symbol(deal.network),
+            usd_value=f"${deal.amount_usd:.2f} USD" if deal.amount_usd is not None else "Pending",
+            symbol=LuxuryFormatter.NETWORK_SYMBOLS.get(NetworkType(deal.network), "💰"),
+            network_name=LuxuryFormatter.NETWORK_NAMES.get(NetworkType(deal.network), deal.network),
+            tx_hash=tx_hash,
+            confirmations=confirmations,
+            required_confirmations=required_confirmations
+        )
+    
+    @staticmethod
+    def format_qr_caption(deal: Union[Deal, DealSummary]) -> str:
+        """Caption under the escrow address QR code"""
+        return LuxuryFormatter.QR_CAPTION_TEMPLATE.render(
+            escrow_id=deal.escrow_id,
+            symbol=LuxuryFormatter.NETWORK_SYMBOLS.get(NetworkType(deal.network), "💰"),
+            network_name=LuxuryFormatter.NETWORK_NAMES.get(NetworkType(deal.network), deal.network),
+            escrow_address=deal.escrow_address,
+            coin=LuxuryFormatter.coin_symbol(deal.network)
+        )
+    
+    @staticmethod
+    def format_balance_message(balance: Dict[str, Any]) -> str:
+        """Live escrow balance from DealManager.check_escrow_balance"""
+        time = datetime.now().strftime('%H:%M:%S')
+        if balance.get("error"):
+            return LuxuryFormatter.BALANCE_ERROR_TEMPLATE.render(reason=str(balance["error"])[:100], time=time)
+        
+        network = NetworkType(balance["network"])
+        return LuxuryFormatter.BALANCE_TEMPLATE.render(
+            symbol=LuxuryFormatter.NETWORK_SYMBOLS.get(network, "💰"),
+            network_name=LuxuryFormatter.NETWORK_NAMES.get(network, network.value),
+            address=balance["address"],
+            balance=balance["balance"],
+            coin=LuxuryFormatter.coin_symbol(network.value),
+            deposits=len(balance.get("deposits", [])),
+            time=time
+        )
+    
+    @staticmethod
+    def format_error_message(error_type: str, network: str = None) -> str:
+        """Luxury error messages"""
+        return _render_error(config_cache.config, error_type, network)
+    
+    @staticmethod
+    def format_moderation_action(action: str, target: str, moderator: str) -> str:
+        """Luxury moderation action confirmation"""
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        template = LuxuryFormatter.MODERATION_TEMPLATES.get(action, LuxuryFormatter.ADMIN_ACTION_TEMPLATE)
+        return template.render(action=action, target=target, moderator=moderator,
+                               timestamp=timestamp, time=timestamp.split()[1])
+
+# Renders that depend only on the config snapshot are cached per snapshot;
+# a reload swaps the snapshot, so edits show up on the next render
+
+@lru_cache(maxsize=4)
+def _render_rules(config) -> str:
+    if config.rules_message:
+        return config.rules_message
+    return LuxuryFormatter.RULES_TEMPLATE.render(fee_structure=LuxuryFormatter.format_fee_structure())
+
+@lru_cache(maxsize=256)
+def _render_error(config, error_type: str, network: Optional[str]) -> str:
+    configured = config.error_messages.get(error_type)
+    if configured:
+        template = compile_template(configured)
+    else:
+        template = LuxuryFormatter.ERROR_TEMPLATES.get(error_type, LuxuryFormatter.UNKNOWN_ERROR_TEMPLATE)
+    return template.render(network=str(network))
 
 class KeyboardBuilder:
-    """Premium inline keyboard builder"""
+    """Premium inline keyboard builder
+    
+    Markups are immutable in python-telegram-bot, so each one is built once and shared.
+    """
     
     @staticmethod
+    @lru_cache(maxsize=None)
     def build_main_menu() -> InlineKeyboardMarkup:
         """Main menu keyboard"""
         keyboard = [
@@ -296,6 +539,7 @@ class KeyboardBuilder:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @lru_cache(maxsize=None)
     def build_network_selection(role: str) -> InlineKeyboardMarkup:
         """Network selection keyboard"""
         keyboard = [
@@ -314,6 +558,7 @@ class KeyboardBuilder:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @lru_cache(maxsize=None)
     def build_escrow_actions() -> InlineKeyboardMarkup:
         """Escrow action buttons"""
         keyboard = [
@@ -326,6 +571,7 @@ class KeyboardBuilder:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @lru_cache(maxsize=None)
     def build_funded_actions() -> InlineKeyboardMarkup:
         """Post-funding action buttons"""
         keyboard = [
@@ -338,6 +584,7 @@ class KeyboardBuilder:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @lru_cache(maxsize=256)
     def build_deal_creation_keyboard(escrow_id: str) -> InlineKeyboardMarkup:
         """Deal creation result keyboard"""
         keyboard = [
@@ -350,6 +597,7 @@ class MessageBuilder:
     """Premium message construction utilities"""
     
     @staticmethod
+    @lru_cache(maxsize=16)
     def build_network_instruction(crypto: str) -> str:
         """Build network-specific address instruction"""
         crypto_clean = crypto.replace("_", "-")
@@ -429,7 +677,7 @@ Please send your {crypto_clean} address using:
             status = " ".join(status_indicators) if status_indicators else "✅"
             username = f"@{user.username}" if user.username else f"User_{user.user_id}"
             
-            message += f"{status} **{username}** - {user.deals_count} deals\n"
+            message += f"{status} **{escape_markdown(username)}** - {user.deals_count} deals\n"
         
         if len(users) > 15:
             message += f"\n*... and {len(users) - 15} more users*"
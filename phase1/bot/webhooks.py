@@ -0,0 +1,253 @@
+"""
+Webhook Receiver for Rahu Escrow Bot
+Signed provider webhooks turned into prioritized monitor checks
+"""
+
+import os
+import hmac
+import json
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+from monitoring import WebhookHandler, webhook_handler, CHECK_PRIORITY_CONFIRMED, CHECK_PRIORITY_PENDING
+from supervisor import TaskSupervisor, supervisor as default_supervisor
+from events import EventBus, EventMetrics, event_bus as default_bus, event_metrics as default_metrics
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+WEBHOOK_MAX_BODY = 256 * 1024  # bytes
+WEBHOOK_DEDUP_SIZE = 100_000
+WEBHOOK_DEDUP_TTL = 3600  # seconds
+
+# Cluster roles of the bot-side receivers and of the one mounted in the API process;
+# only one kind may run, or both would feed monitors for the same addresses
+RECEIVER_ROLE = "webhooks"
+API_RECEIVER_ROLE = "api_webhooks"
+
+# Header names used by supported providers, checked in order
+SIGNATURE_HEADERS = ("X-Webhook-Signature", "X-Alchemy-Signature", "X-Signature")
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """Check a hex HMAC-SHA256 of the raw request body"""
+    if not signature:
+        return False
+
+    if signature.startswith("sha256="):
+        signature = signature[len("sha256="):]
+
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature.strip().lower())
+
+class TxDeduplicator:
+    """Bounded, expiring set of recently seen transaction keys"""
+
+    def __init__(self, max_size: int = WEBHOOK_DEDUP_SIZE, ttl: float = WEBHOOK_DEDUP_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+
+    def seen(self, key: str) -> bool:
+        """Return True if key was seen recently, recording it otherwise"""
+        now = time.monotonic()
+
+        # Entries are in insertion order, so expired ones sit at the front
+        while self._seen:
+            if now - next(iter(self._seen.values())) < self.ttl:
+                break
+            self._seen.popitem(last=False)
+
+        if key in self._seen:
+            return True
+
+        self._seen[key] = now
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+        return False
+
+def _as_list(payload) -> List[Dict]:
+    if isinstance(payload, list):
+        return [item for item in payload if isinstance(item, dict)]
+    return [payload] if isinstance(payload, dict) else []
+
+def parse_bitcoin_payload(payload) -> List[Dict]:
+    """BlockCypher tx webhooks or flat {address, tx_hash} events"""
+    events = []
+    for item in _as_list(payload):
+        tx_hash = item.get("hash") or item.get("tx_hash") or item.get("txid")
+        confirmed = bool(item.get("confirmations")) or (item.get("block_height") or -1) > 0
+
+        if "outputs" in item:
+            for output in item["outputs"]:
+                for address in output.get("addresses") or []:
+                    events.append({"address": address, "tx_hash": tx_hash, "confirmed": confirmed})
+        elif item.get("address"):
+            events.append({"address": item["address"], "tx_hash": tx_hash, "confirmed": confirmed})
+    return events
+
+def parse_ethereum_payload(payload) -> List[Dict]:
+    """Alchemy address-activity webhooks or flat {to, hash} events"""
+    events = []
+    for item in _as_list(payload):
+        activity = (item.get("event") or {}).get("activity")
+        if activity is not None:
+            # Address activity is only emitted for mined transactions
+            for transfer in activity:
+                if transfer.get("toAddress"):
+                    events.append({"to": transfer["toAddress"], "tx_hash": transfer.get("hash"), "confirmed": True})
+        elif item.get("to"):
+            tx_hash = item.get("hash") or item.get("tx_hash")
+            events.append({"to": item["to"], "tx_hash": tx_hash, "confirmed": bool(item.get("blockNumber"))})
+    return events
+
+def parse_tron_payload(payload) -> List[Dict]:
+    """TRON event-service transfers or flat {to_address, transaction_id} events"""
+    events = []
+    for item in _as_list(payload):
+        result = item.get("result") or {}
+        to_address = item.get("to_address") or item.get("to") or result.get("to")
+        if to_address:
+            tx_hash = item.get("transaction_id") or item.get("transactionId") or item.get("tx_hash")
+            confirmed = bool(item.get("block_number") or item.get("blockNumber"))
+            events.append({"to_address": to_address, "tx_hash": tx_hash, "confirmed": confirmed})
+    return events
+
+# chain path segment -> (payload parser, WebhookHandler method name)
+WEBHOOK_CHAINS = {
+    "btc": (parse_bitcoin_payload, "handle_bitcoin_webhook"),
+    "eth": (parse_ethereum_payload, "handle_ethereum_webhook"),
+    "tron": (parse_tron_payload, "handle_tron_webhook"),
+}
+
+def create_webhook_router(handler: WebhookHandler = webhook_handler, secret: Optional[str] = None) -> APIRouter:
+    """Router accepting POST /webhooks/{btc,eth,tron} and feeding the monitor"""
+    secret = secret or WEBHOOK_SECRET
+    if not secret:
+        raise ValueError("WEBHOOK_SECRET must be set to receive webhooks")
+
+    router = APIRouter(prefix="/webhooks")
+    deduplicator = TxDeduplicator()
+    stats = {"received": 0, "rejected": 0, "duplicates": 0, "queued": 0}
+
+    @router.post("/{chain}")
+    async def receive_webhook(chain: str, request: Request):
+        if chain not in WEBHOOK_CHAINS:
+            raise HTTPException(status_code=404, detail="Unknown chain")
+
+        body = await request.body()
+        if len(body) > WEBHOOK_MAX_BODY:
+            raise HTTPException(status_code=413, detail="Payload too large")
+
+        signature = next((request.headers[h] for h in SIGNATURE_HEADERS if h in request.headers), None)
+        if not verify_signature(secret, body, signature):
+            stats["rejected"] += 1
+            raise HTTPException(status_code=401, detail="Invalid signature")
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON")
+
+        parse, method = WEBHOOK_CHAINS[chain]
+        handle = getattr(handler, method)
+        stats["received"] += 1
+        queued = 0
+
+        for event in parse(payload):
+            address = event.get("address") or event.get("to") or event.get("to_address")
+            # A confirmed resend may still upgrade a pending check's priority
+            dedup_key = f"{chain}:{event['tx_hash']}:{address.lower()}:{event['confirmed']}"
+            if event["tx_hash"] and deduplicator.seen(dedup_key):
+                stats["duplicates"] += 1
+                continue
+
+            priority = CHECK_PRIORITY_CONFIRMED if event["confirmed"] else CHECK_PRIORITY_PENDING
+            if await handle(event, priority):
+                queued += 1
+
+        stats["queued"] += queued
+        # Acknowledge immediately; the monitor's worker does the chain lookups
+        return JSONResponse({"queued": queued}, status_code=202)
+
+    @router.get("/stats")
+    async def webhook_stats():
+        return {**stats, "pending_checks": handler.monitor.check_queue.qsize()}
+
+    return router
+
+def create_health_router(supervisor: TaskSupervisor = default_supervisor, bus: EventBus = default_bus,
+                         metrics: EventMetrics = default_metrics) -> APIRouter:
+    """GET /health/tasks: supervised task liveness and loop timings; 503 when any task is down
+    GET /health/events: outbox backlog, per-subscriber deliveries and lifecycle event counts
+
+    Failed one-shot tasks are listed under /health/tasks without counting as down.
+    """
+    router = APIRouter(prefix="/health")
+
+    @router.get("/tasks")
+    async def task_health():
+        tasks = supervisor.stats()
+        healthy = all(task["alive"] for task in tasks.values())
+        return JSONResponse({"healthy": healthy, "tasks": tasks, "failed_one_shots": supervisor.failed_stats()},
+                            status_code=200 if healthy else 503)
+
+    @router.get("/events")
+    async def event_health():
+        return {**bus.stats(), "backlog": await bus.backlog(), "events": metrics.snapshot()}
+
+    return router
+
+def create_webhook_app() -> FastAPI:
+    """Standalone receiver that also runs the monitoring service"""
+    from models import db_manager
+    from monitoring import start_monitoring_service, stop_monitoring_service
+    from cluster import coordinator
+
+    app = FastAPI(title="Rahu Escrow Webhooks")
+    app.include_router(create_webhook_router())
+    app.include_router(create_health_router())
+
+    # Lifecycle events published here are delivered by the bot replicas' event buses;
+    # this process only follows them to keep its monitored addresses current
+    @app.on_event("startup")
+    async def start_monitor():
+        await db_manager.connect()
+        coordinator.roles.add(RECEIVER_ROLE)
+        await coordinator.start()
+        await start_monitoring_service()
+        await default_bus.start(durable=False)
+
+    @app.on_event("shutdown")
+    async def stop_monitor():
+        await default_bus.stop()
+        await stop_monitoring_service()
+        await default_supervisor.shutdown()
+        await coordinator.stop()
+        await db_manager.disconnect()
+
+    return app
+
+async def serve_webhooks(host: str = "0.0.0.0", port: int = 8080):
+    """Serve the receiver inside an already running event loop"""
+    import uvicorn
+
+    app = FastAPI(title="Rahu Escrow Webhooks")
+    app.include_router(create_webhook_router())
+    app.include_router(create_health_router())
+
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    # Leave signal handling to the host application
+    server.install_signal_handlers = lambda: None
+    logger.info(f"🔔 Webhook receiver listening on {host}:{port}")
+    await server.serve()
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(create_webhook_app(), host="0.0.0.0", port=int(os.getenv("WEBHOOK_PORT", "8080")))